@@ -0,0 +1,65 @@
+"""Measure memory used by Expression nodes
+
+Run as::
+
+    python benchmarks/memory.py
+
+For each measured expression type, prints the average number of bytes
+allocated per node (as seen by :mod:`tracemalloc`),
+including the cost of the node listening for replacements of its operand.
+"""
+
+import gc
+import tracemalloc
+
+from gillcup.clocks import Clock
+from gillcup.expressions import Constant, Value, Neg, Sum, Product, Slice
+from gillcup.expressions import Concat, Map, Interpolation, Time, Progress
+
+
+NUM_NODES = 10000
+
+CLOCK = Clock()
+
+NODE_FACTORIES = {
+    'Constant': lambda operand: Constant(1),
+    'Value': lambda operand: Value(1),
+    'Neg': lambda operand: Neg(operand),
+    'Sum': lambda operand: Sum([operand, operand]),
+    'Product': lambda operand: Product([operand, operand]),
+    'Map': lambda operand: Map(abs, operand),
+    'Slice': lambda operand: Slice(operand, 0),
+    'Concat': lambda operand: Concat(operand, operand),
+    'Interpolation': lambda operand: Interpolation(operand, operand,
+                                                   operand[0]),
+    'Time': lambda operand: Time(CLOCK),
+    'Progress': lambda operand: Progress(CLOCK, 1),
+}
+
+
+def measure(factory, num_nodes=NUM_NODES):
+    """Return the average number of bytes allocated per node
+
+    Each node is created by calling *factory* with a separate
+    :class:`~gillcup.expressions.Value` operand.
+    """
+    operands = [Value(1, 2) for i in range(num_nodes)]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        nodes = [factory(operand) for operand in operands]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del nodes
+    return (after - before) / num_nodes
+
+
+def main():
+    for name, factory in NODE_FACTORIES.items():
+        print('{:>14}: {:8.1f} bytes/node'.format(name, measure(factory)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Measure the cost of switching between coroutines run on a Clock
+
+Run as::
+
+    python benchmarks/tasks.py
+
+Starts a number of coroutines that repeatedly sleep for one time unit,
+advances the clock until they are all done, and prints the average time
+per task switch (one sleep and the corresponding resumption).
+
+Measured are:
+
+* generator-based coroutines run with
+  :meth:`~gillcup.clocks.Clock.task`, yielding numbers,
+* native coroutines run with :meth:`~gillcup.clocks.Clock.task`,
+  awaiting :meth:`~gillcup.clocks.Clock.sleep`,
+* native coroutines run as :class:`asyncio.Task`,
+  awaiting :meth:`~gillcup.clocks.Clock.sleep`.
+"""
+
+import asyncio
+import time
+
+from gillcup.clocks import Clock, coroutine
+
+
+NUM_TASKS = 1000
+NUM_SWITCHES = 20
+
+
+@coroutine
+def generator_task(clock):
+    for i in range(NUM_SWITCHES):
+        yield 1
+
+
+async def native_task(clock):
+    for i in range(NUM_SWITCHES):
+        await clock.sleep(1)
+
+
+def start_clock_tasks(clock, coroutine_function):
+    for i in range(NUM_TASKS):
+        clock.task(coroutine_function(clock))
+
+
+def start_asyncio_tasks(clock, coroutine_function):
+    for i in range(NUM_TASKS):
+        asyncio.ensure_future(coroutine_function(clock))
+
+
+BENCHMARKS = {
+    'generator, Clock.task': (start_clock_tasks, generator_task),
+    'native, Clock.task': (start_clock_tasks, native_task),
+    'native, asyncio.Task': (start_asyncio_tasks, native_task),
+}
+
+
+def measure(start_tasks, coroutine_function):
+    """Return the average number of seconds per task switch"""
+    clock = Clock()
+    start = time.perf_counter()
+    start_tasks(clock, coroutine_function)
+    clock.advance_sync(None)
+    end = time.perf_counter()
+    return (end - start) / (NUM_TASKS * NUM_SWITCHES)
+
+
+def main():
+    for name, (start_tasks, coroutine_function) in BENCHMARKS.items():
+        seconds = measure(start_tasks, coroutine_function)
+        print('{:>22}: {:8.2f} µs/switch'.format(name, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,13 +7,18 @@ Reference
 ---------
 
 .. autofunction:: anim
+.. autoclass:: Keyframes
 
 """
 
-import asyncio
+import bisect
+import math
+import weakref
 
-from gillcup.expressions import Interpolation, Progress, Map
-from gillcup.expressions import Expression
+import gillcup.futures
+from gillcup.expressions import Interpolation, Progress, Map, Constant
+from gillcup.expressions import Expression, coerce, _evaluate, _coerce_all
+from gillcup.expressions import _bounds_of_samples
 from gillcup import easings
 
 
@@ -21,15 +26,26 @@ class _Anim(Expression):
     """An expression with a "done" future
 
     An :class:`~gillcup.expressions.Expression` with a :attr:`done` attribute,
-    which is a :class:`~asyncio.Future` that becomes done when an animation
-    is finished.
+    which is a :class:`~gillcup.futures.Future` that becomes done when an
+    animation is finished.
     """
+    __slots__ = ('done', )
+
     def __init__(self, parent, done):
         self.done = done
         self.replacement = parent
 
-    def get(self):
-        return self.replacement.get()
+    def __len__(self):
+        return len(self.replacement)
+
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self.replacement,
+
+    def _eval_combine(self, values):
+        [value] = values
+        return value
 
     @property
     def children(self):
@@ -37,7 +53,7 @@ class _Anim(Expression):
 
 
 def anim(start, end, duration, clock, *,
-         delay=0, easing=None, infinite=False, strength=1):
+         delay=0, easing=None, infinite=False, strength=1, retarget=False):
     """Create an animated expression
 
     Returns an expression that morphs between :token:`start` and :token:`end`
@@ -84,26 +100,243 @@ def anim(start, end, duration, clock, *,
     :param strength: The strength of the effect:
                      if 0, the value always stays at :token:`start`;
                      if 1, it is animated normally.
+    :param retarget: If true, :token:`start` is evaluated immediately,
+                     and the animation starts from that (constant) value.
+
+                     This is useful when an animation is retargeted
+                     often (for example, to follow the mouse pointer):
+                     normally the previous, still-running animation
+                     becomes the start of the new one, so the expression
+                     grows with each retarget.
+                     With :token:`retarget`, any superseded animation
+                     is dropped, and evaluating the result costs
+                     the same however many times it was retargeted.
+                     The price is that the velocity of the previous
+                     animation is not carried over.
 
     :return: An expression with a :attr:`~Anim.done` attribute, which
              contains a future that is done when this animation finishes.
              The future is tied to the :token:`clock`.
+
+    Animations created at the same clock time with the same
+    :token:`delay`, :token:`duration` and :token:`infinite` arguments
+    share a single :class:`~gillcup.expressions.Progress`,
+    and their :attr:`~Anim.done` futures are completed together.
+    So, animating many values together only schedules one action on
+    the clock, and the progress is only computed once per evaluation.
+    Each animation still gets its own :attr:`~Anim.done` future,
+    which can be cancelled independently.
     """
+    if retarget:
+        start = Constant(*coerce(start).get())
+
     if duration < 0:
         start, end = end, start
         duration = -duration
         delay -= duration
 
-    if delay + duration < 0:
-        future = asyncio.Future()
-        future.set_result(True)
-        done = clock.wait_for(future)
-    else:
-        done = clock.sleep(delay + duration)
-
-    progress = Progress(clock, duration, delay=delay, clamp=not infinite)
+    progress, done = _get_progress(clock, duration, delay, not infinite)
     if easing:
         easing_func = easings.get(easing)
         progress = Map(easing_func, progress)
     interp = Interpolation(start, end, progress * strength)
     return _Anim(interp, done)
+
+
+class _SharedProgress:
+    """A Progress shared by anim() calls, with their pending done futures
+
+    Kept alive by the callback on its *shared_done* future;
+    the cache in :data:`_shared_progress` only refers to it weakly.
+    """
+    __slots__ = ('progress', 'shared_done', 'group', '__weakref__')
+
+    def __init__(self, progress, shared_done):
+        self.progress = progress
+        self.shared_done = shared_done
+        self.group = []
+        shared_done.add_done_callback(self._finish)
+
+    def _finish(self, shared_done):
+        for done in self.group:
+            if not done.done():
+                done.set_result(True)
+        self.group.clear()
+
+
+# Clock -> (time, {timing key: weakref to _SharedProgress}) for anim() calls
+# made at that time.
+# Neither the values nor the dicts refer to the clock strongly.
+_shared_progress = weakref.WeakKeyDictionary()
+
+
+def _get_progress(clock, duration, delay, clamp):
+    """Return a Progress and a new done future for anim()
+
+    The Progress is shared with anim() calls made at the same clock time
+    with the same timing; the done futures of all these calls are
+    completed by a single callback.
+    """
+    key = float(duration), float(delay), clamp
+    try:
+        time, cache = _shared_progress[clock]
+    except KeyError:
+        time = None
+    if time != clock._time_value:
+        cache = {}
+        _shared_progress[clock] = clock._time_value, cache
+    try:
+        shared = cache[key]()
+    except KeyError:
+        shared = None
+    if shared is None:
+        progress = Progress(clock, duration, delay=delay, clamp=clamp)
+        if clamp:
+            # The progress is done (and fixed) when the animation ends
+            shared_done = progress.done
+        elif delay + duration < 0:
+            shared_done = gillcup.futures.Future(clock)
+            shared_done.set_result(True)
+        else:
+            shared_done = clock.sleep(delay + duration)
+        shared = _SharedProgress(progress, shared_done)
+        cache[key] = weakref.ref(shared)
+    done = gillcup.futures.Future(clock)
+    if shared.shared_done.done():
+        done.set_result(True)
+    else:
+        shared.group.append(done)
+    return shared.progress, done
+
+
+class Keyframes(Expression):
+    """An expression that passes through a sequence of keyframes
+
+    :param clock: The :class:`~gillcup.clock.Clock` that controls the
+                  animation's time
+    :param keyframes: An iterable of ``(time, value)`` or
+                      ``(time, value, easing)`` entries.
+
+                      The times are given in time units from now.
+                      Entries are sorted by time; entries for the same time
+                      keep their order, so the value can jump abruptly.
+                      The values must all have the same size
+                      (plain numbers are repeated to fit the others).
+                      The easing, if given, applies to the motion
+                      *towards* the entry's value; it is looked up with
+                      :func:`easings.get <gillcup.easings.get>`.
+                      By default, motion is linear.
+
+    Before the first keyframe, the value is the first value.
+    After the last keyframe, it is the last value, and the expression
+    is replaced by a :class:`~gillcup.expressions.Constant`.
+
+    Unlike a chain of :func:`anim` calls, this is a single expression
+    that finds the current segment by binary search,
+    and schedules a single event (at its end) on the clock.
+
+        >>> from gillcup.clocks import Clock
+        >>> clock = Clock()
+        >>> exp = Keyframes(clock, [(0, 0), (1, 10), (3, 0, 'quad'), (4, 5)])
+        >>> for i in range(6):
+        ...     print(i / 2, exp)
+        ...     clock.advance_sync(0.5)
+        0.0 <0.0>
+        0.5 <5.0>
+        1.0 <10.0>
+        1.5 <9.375>
+        2.0 <7.5>
+        2.5 <4.375>
+
+    Attributes:
+
+        .. attribute:: done
+
+            A future that is done when the last keyframe is reached.
+            The future is tied to the :token:`clock`.
+    """
+    __slots__ = ('_clock', '_times', '_values', '_size', '_easings',
+                 'done')
+
+    def __init__(self, clock, keyframes):
+        keyframes = sorted((_as_keyframe(k) for k in keyframes),
+                           key=lambda k: k[0])
+        if not keyframes:
+            raise ValueError('no keyframes')
+        now = float(clock.time)
+        self._clock = clock
+        self._times = [now + time for time, value, easing in keyframes]
+        self._values = [exp.get() for exp in _coerce_all(
+            value for time, value, easing in keyframes)]
+        self._size = len(self._values[0])
+        self._easings = [easing and easings.get(easing)
+                         for time, value, easing in keyframes]
+        self.done = gillcup.futures.Future(clock)
+        end_time = self._times[-1] - now
+        if end_time >= 0:
+            clock.schedule(end_time, self._fix)
+        else:
+            self._fix()
+
+    def __len__(self):
+        return self._size
+
+    def get(self):
+        return self._value_at(float(self._clock.time))
+
+    def _sample(self, clock_times):
+        return [self._value_at(t) for t in clock_times(self._clock)]
+
+    def _next_change(self, to_time):
+        # Skip segments between equal values
+        clock = self._clock
+        times = self._times
+        values = self._values
+        time = clock._time_value
+        index = bisect.bisect_right(times, time)
+        while index < len(times):
+            if values[index] != values[max(index - 1, 0)]:
+                return to_time(clock, time)
+            time = times[index]
+            index += 1
+        return math.inf
+
+    def _time_bounds(self, clock_times):
+        start, end = clock_times(self._clock)
+        times = self._times
+        first = bisect.bisect_right(times, start)
+        last = bisect.bisect_left(times, end)
+        # Eased segments that overlap the window must stay between
+        # their keyframes' values
+        for easing in self._easings[first:last + 1]:
+            if easing and not getattr(easing, 'monotonic', False):
+                return ((-math.inf, math.inf), ) * self._size
+        return _bounds_of_samples(self._values[first:last],
+                                  self._value_at(start), self._value_at(end))
+
+    def _value_at(self, time):
+        times = self._times
+        index = bisect.bisect_right(times, time)
+        if index == 0:
+            return self._values[0]
+        elif index == len(times):
+            return self._values[-1]
+        start_time = times[index - 1]
+        t = (time - start_time) / (times[index] - start_time)
+        easing = self._easings[index]
+        if easing:
+            t = easing(t)
+        nt = 1 - t
+        return tuple(a * nt + b * t for a, b in zip(self._values[index - 1],
+                                                    self._values[index]))
+
+    def _fix(self):
+        self.replacement = Constant(*self._values[-1])
+        self.done.set_result(True)
+
+
+def _as_keyframe(entry):
+    time, value, *rest = entry
+    if len(rest) > 1:
+        raise ValueError('keyframe must be (time, value[, easing])')
+    return float(time), value, rest[0] if rest else None
@@ -27,7 +27,7 @@ it can be slowed down or sped up,
 or an entire simulation can be run at once to get simulation results quickly.
 
 The Clock runs inside an asyncio event loop,
-using the future, callback, and coroutine mechanisms familiar to asyncio users.
+using future, callback, and coroutine mechanisms familiar to asyncio users.
 Gillcup uses its own :class:`~gillcup.futures.Future` objects that are tied
 to a clock that handles them.
 Any callbacks on a Gillcup future are handled by that future's clock;
@@ -36,6 +36,9 @@ and the callback execution.
 
 A coroutine can be scheduled on a Gillcup clock using
 :meth:`~gillcup.clocks.Clock.task`; see the corresponding docs for details.
+Such coroutines are run by the clock itself:
+they are resumed directly by the clock's scheduled actions,
+without going through asyncio's event loop.
 
 
 Reference
@@ -46,22 +49,47 @@ Reference
 .. autoclass:: gillcup.clocks.Subclock
 """
 
+import array
 import collections
 import heapq
 import asyncio
+import types
+import warnings
 
 import gillcup.futures
+from gillcup.signals import signal
 from gillcup.util.signature import fix_public_signature
 from gillcup import expressions
 
 
 def coroutine(func):
-    """Mark a function as a Gillcup coroutine.
+    """Mark a generator function as a Gillcup coroutine.
 
-    Direct equivalent of :func:`asyncio.coroutine` -- also does nothing
-    (unless asyncio debugging is enabled).
+    Native coroutines (``async def``) do not need this.
+    For generator-based coroutines, this is :func:`types.coroutine`:
+    it allows native coroutines to ``await`` the generator,
+    and the generator to ``yield from`` native coroutines.
     """
-    return asyncio.coroutine(func)
+    return types.coroutine(func)
+
+
+@types.coroutine
+def _run_event_loop_once():
+    """Let asyncio's event loop run the callbacks that are ready"""
+    yield
+
+
+def _get_event_loop():
+    """Return asyncio's current event loop, setting a new one if needed"""
+    with warnings.catch_warnings():
+        # Newer Pythons warn when get_event_loop() creates a loop
+        warnings.simplefilter('ignore', DeprecationWarning)
+        try:
+            return asyncio.get_event_loop()
+        except RuntimeError:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            return loop
 
 
 _Event = collections.namedtuple('_Event',
@@ -116,10 +144,32 @@ class Clock:
             Arguments to :meth:`advance` are multiplied by this value.
             Usefull mainly for :class:`Subclock`.
 
+        .. attribute:: ticked
+
+            A :class:`~gillcup.signals.Signal` emitted after the clock's
+            time has moved forward, once all actions scheduled for the new
+            time are done.
+            Subclocks emit it whenever their parent clock does.
+
+        .. attribute:: coalesce_replacements
+
+            If true, simplification of expressions is deferred
+            while :meth:`advance` runs the actions scheduled for
+            a particular time.
+            When all actions for that time are done, each affected
+            expression is simplified once (see
+            :func:`~gillcup.expressions.deferred_replacements`).
+            This helps when many animations end at the same time.
+
+            For a :class:`Subclock`, the setting of the clock on which
+            :meth:`advance` is called applies.
+
     Methods:
 
         .. automethod:: schedule
 
+        .. automethod:: schedule_many
+
         .. automethod:: wait_for
 
         .. automethod:: sleep
@@ -128,6 +178,8 @@ class Clock:
 
         .. automethod:: advance_sync
 
+        .. automethod:: frames
+
         .. automethod:: task
     """
     def __init__(self):
@@ -143,7 +195,15 @@ class Clock:
         # Set of dependent clocks
         self._subclocks = set()
 
+        # True if expression replacements are being deferred by advance()
+        self._coalescing = False
+
     speed = 1
+    coalesce_replacements = False
+
+    @signal
+    def ticked():
+        """Notify that the clock's time has moved forward"""
 
     @property
     def time(self):
@@ -177,9 +237,7 @@ class Clock:
         except ValueError:
             return None
 
-    @asyncio.coroutine
-    @fix_public_signature
-    def advance(self, delay, *, _continuing=False):
+    async def advance(self, delay):
         """Advance the clock's time
 
         Moves the clock's time forward, pausing at times when
@@ -198,45 +256,85 @@ class Clock:
             Otherwise :token:`delay` should be a Future; in this case Clock
             will advance until either that future is done, or no more actions
             are scheduled.
+
+        Before the time moves forward (and before ``advance`` finishes),
+        asyncio's event loop is given a chance to run callbacks,
+        such as those of asyncio futures completed by the actions.
         """
-        if not _continuing:
-            if self.advancing:
-                raise RuntimeError('Clock.advance called recursively')
-            if delay is None:
-                delay = asyncio.Future()
+        if self.advancing:
+            raise RuntimeError('Clock.advance called recursively')
+        if delay is None:
+            target = None
+        else:
             try:
                 float(delay)
             except TypeError:
                 # We want to wait for a *Gillcup* future on *this* clock,
                 # with category 1
-                delay = gillcup.futures.Future(self, delay, _category=1)
+                target = gillcup.futures.Future(self, delay, _category=1)
             else:
                 if delay < 0:
                     raise ValueError('Moving backwards in time')
-                delay = self.sleep(delay * self.speed, _category=1)
+                target = self.sleep(delay * self.speed, _category=1)
         self.advancing = True
-
-        if delay.done():
-            self.advancing = False
-            return
-
-        event = self._get_next_event()
-        if event is None:
+        try:
+            ran_event_loop = False
+            moved = False
+            while True:
+                if target is not None and target.done():
+                    event = None
+                else:
+                    event = self._get_next_event()
+
+                if event is None or event[0]:
+                    # Done with all events for the current time
+                    self._stop_coalescing()
+                    if moved and (ran_event_loop or target is not None and
+                                  target.done()):
+                        # The tick listeners might schedule more actions
+                        moved = False
+                        self._tick()
+                        continue
+
+                if event is None and (ran_event_loop or target is not None and
+                                      target.done()):
+                    return
+
+                if (event is None or event[0] or event[1]) and (
+                        not ran_event_loop):
+                    # Let asyncio callbacks run before time moves on
+                    # (or before the end of advance() at the current time);
+                    # they might finish the target or schedule more events.
+                    # Replacements are deferred globally, so other code
+                    # must not run while they are.
+                    self._stop_coalescing()
+                    await _run_event_loop_once()
+                    ran_event_loop = True
+                    continue
+                ran_event_loop = False
+
+                event_dt, _cat, _index, clock, event = event
+                if event_dt:
+                    self._advance(event_dt)
+                    moved = True
+                _evt = heapq.heappop(clock.events)
+                assert _evt is event and clock._time_value == event.time
+                # jump to the event's time
+                clock._time_value = event.time
+                if self.coalesce_replacements and not self._coalescing:
+                    self._coalescing = True
+                    expressions._defer_replacements()
+                # Handle the event (synchronously!)
+                event.callback(*event.args)
+        finally:
             self.advancing = False
-            return
-
-        event_dt, _cat, _index, clock, event = event
-        if event_dt:
-            self._advance(event_dt)
-        _evt = heapq.heappop(clock.events)
-        assert _evt is event and clock._time_value == event.time
-        # jump to the event's time
-        clock._time_value = event.time
-        # Handle the event (synchronously!)
-        event.callback(*event.args)
+            self._stop_coalescing()
 
-        # finish jumping
-        yield from asyncio.Task(self.advance(delay, _continuing=True))
+    def _stop_coalescing(self):
+        """Apply replacements deferred by advance(), if any"""
+        if self._coalescing:
+            self._coalescing = False
+            expressions._apply_deferred_replacements()
 
     def advance_sync(self, delay):
         """Call (and wait for) :meth:`advance` outside of an event loop
@@ -245,23 +343,118 @@ class Clock:
 
         Useful in testing or in some non-realtime applications.
         """
-        loop = asyncio.get_event_loop()
+        loop = _get_event_loop()
         loop.run_until_complete(self.advance(delay))
 
+    def frames(self, fps, exps, start=None, end=None, *, copy=False):
+        """Advance the clock frame by frame, yielding values of expressions
+
+        For each frame, yields an :class:`array.array` of floats
+        with the values of all the given expressions *exps*,
+        one after another.
+        Between frames, the clock is advanced by ``1 / fps``,
+        as :meth:`advance_sync` would::
+
+            >>> from gillcup.expressions import Progress
+            >>> clock = Clock()
+            >>> exps = [Progress(clock, 1), clock.time]
+            >>> for buffer in clock.frames(4, exps):
+            ...     print(list(buffer))
+            [0.0, 0.0]
+            [0.25, 0.25]
+            [0.5, 0.5]
+            [0.75, 0.75]
+            [1.0, 1.0]
+
+        The same array is reused for all frames.
+        If *copy* is true, a new one is yielded for each frame instead.
+
+        If *start* is given, the clock is first advanced to that time.
+        If *end* is given, no frames after that time are generated.
+        Otherwise, frames are generated until no more actions are scheduled
+        on the clock.
+
+        As with :meth:`advance_sync`, this runs asyncio's main event
+        loop to process scheduled actions, so it can not be used from a
+        running event loop.
+        However, after the first frame, the event loop is only run
+        when actions are scheduled before the next frame.
+        Otherwise the time is simply moved forward,
+        so frames without any scheduled actions cost only the evaluation
+        of the expressions.
+        Since the clock's time does not change while frames are consumed,
+        the consumer can set values or schedule actions between frames.
+        """
+        if self.advancing:
+            raise RuntimeError('Clock.frames called while advancing')
+        exps = [expressions.coerce(e) for e in exps]
+        if start is not None:
+            if start < self._time_value:
+                raise ValueError('Moving backwards in time')
+            self.advance_sync((start - self._time_value) / self.speed)
+        origin = self._time_value
+        # Allowance for rounding errors when comparing with end
+        tolerance = 1e-9 * self.speed / fps
+        buffer = None
+        frame = 0
+        while True:
+            if copy or buffer is None:
+                buffer = array.array('d')
+                for exp in exps:
+                    buffer.extend(exp.get())
+            else:
+                i = 0
+                for exp in exps:
+                    for value in exp.get():
+                        buffer[i] = value
+                        i += 1
+            yield buffer
+            frame += 1
+            # Computed from the origin to avoid accumulating errors
+            target = origin + frame * self.speed / fps
+            if end is None:
+                if self._get_next_event() is None:
+                    return
+            elif target > end:
+                if target - end > tolerance:
+                    return
+                target = end
+            self._advance_frame(target - self._time_value,
+                                run_loop=(frame == 1))
+
+    def _advance_frame(self, dt, run_loop):
+        """Move the time forward by *dt*, for frames()
+
+        Unless *run_loop* is true, the event loop is only run if actions
+        are scheduled in the meantime.
+        """
+        if not run_loop:
+            event = self._get_next_event()
+            if event is None or event[0] > dt:
+                self._advance(dt)
+                self._tick()
+                return
+        self.advance_sync(dt / self.speed if dt else 0)
+
     def _advance(self, dt):
         self._time_value += dt
         for subclock in self._subclocks:
             subclock._advance(dt * subclock.speed)
 
+    def _tick(self):
+        self.ticked()
+        for subclock in self._subclocks:
+            subclock._tick()
+
     @fix_public_signature
     def sleep(self, delay, *, _category=0):
         """Return a future that will complete after "delay" time units
 
         Scheduling for the past (delay<0) will raise an error.
         """
-        future = asyncio.Future()
+        future = gillcup.futures.Future(self)
         self.schedule(delay, future.set_result, None, _category=_category)
-        return gillcup.futures.Future(self, future)
+        return future
 
     def wait_for(self, future):
         """Wrap a future so that its calbacks are scheduled on this Clock
@@ -289,42 +482,164 @@ class Clock:
         event = _Event(scheduled_time, _category, _next_index, callback, args)
         heapq.heappush(self.events, event)
 
-    def task(self, coro):
-        """Run an asyncio-style coroutine on this clock
+    def schedule_many(self, entries):
+        """Schedule several callbacks at once
 
-        Futures yielded by the coroutine will be handled by this Clock.
+        :param entries: An iterable of ``(delay, callback, args)`` triples,
+            where :token:`args` is a sequence of positional arguments
+            for :token:`callback`.
 
-        In addition to futures, the coroutine may yield real numbers,
-        which are translated to :meth:`sleep`.
+        This is equivalent to calling :meth:`schedule` for each entry in
+        order; in particular, callbacks scheduled for the same time are
+        called in the order of the entries.
+        However, a large number of entries is added to the queue at once,
+        which is faster than adding them one by one.
+
+        If any delay is negative, an error is raised and nothing is
+        scheduled.
         """
-        @asyncio.coroutine
-        def coro_wrapper():
-            iterator = iter(coro)
-            value = exception = None
-            while True:
-                try:
-                    if exception is None:
-                        value = iterator.send(value)
-                    else:
-                        value = iterator.throw(exception)
-                except StopIteration as exc:
-                    return exc.value
-                if value is None:
-                    value = 0
-                try:
-                    try:
-                        value = float(value)
-                    except TypeError:
-                        yield from self.wait_for(value)
-                    else:
-                        yield from self.sleep(value)
-                except Exception as exc:
-                    value = None
-                    exception = exc
-                except BaseException as exc:
-                    iterator.throw(exc)
-                    raise
-        return asyncio.Task(coro_wrapper())
+        global _next_index
+        now = self._time_value
+        index = _next_index
+        new_events = []
+        for delay, callback, args in entries:
+            if delay < 0:
+                raise ValueError('Scheduling an action in the past')
+            index += 1
+            new_events.append(_Event(now + delay, 0, index, callback,
+                                     tuple(args)))
+        _next_index = index
+        events = self.events
+        if len(new_events) * len(events).bit_length() < len(events):
+            # Few new events: pushing them one by one is cheaper
+            for event in new_events:
+                heapq.heappush(events, event)
+        else:
+            events.extend(new_events)
+            heapq.heapify(events)
+
+    def task(self, coro):
+        """Run a coroutine on this clock
+
+        The coroutine is started by an action scheduled for the current time.
+        It is then run by the clock:
+        when it awaits a future, it is resumed by an action scheduled on
+        this clock when the future is done.
+        This does not involve asyncio tasks or the event loop
+        (unless the future is an asyncio one).
+
+        Native coroutines (``async def``) can ``await`` futures,
+        including those from :meth:`sleep` and asyncio futures::
+
+            >>> clock = Clock()
+            >>> async def countdown(lst):
+            ...     for i in range(3, 0, -1):
+            ...         lst.append(i)
+            ...         await clock.sleep(1)
+            ...     return 'done'
+            >>> lst = []
+            >>> future = clock.task(countdown(lst))
+            >>> clock.advance_sync(1.5)
+            >>> lst
+            [3, 2]
+            >>> clock.advance_sync(5)
+            >>> future.result()
+            'done'
+
+        Generator-based coroutines (see :func:`coroutine`) may also yield
+        real numbers, which are translated to :meth:`sleep`, or
+        None, which is the same as zero.
+
+        Returns a :class:`~gillcup.futures.Future` with the
+        coroutine's result.
+        If that future is cancelled, :class:`asyncio.CancelledError` is
+        raised in the coroutine when it is next resumed.
+        """
+        return _Task(self, coro).future
+
+
+class _Task:
+    """Runs a coroutine on a Clock; see :meth:`Clock.task`"""
+    def __init__(self, clock, coro):
+        if not hasattr(coro, 'send'):
+            coro = coro.__await__()
+        self._clock = clock
+        self._coro = coro
+        self.future = gillcup.futures.Future(clock)
+        clock.schedule(0, self._step)
+
+    def _step(self, value=None, exception=None):
+        future = self.future
+        if future.cancelled() and exception is None:
+            exception = asyncio.CancelledError()
+        while True:
+            previous = gillcup.futures._in_clock_task
+            gillcup.futures._in_clock_task = True
+            try:
+                if exception is None:
+                    yielded = self._coro.send(value)
+                else:
+                    yielded = self._coro.throw(exception)
+            except StopIteration as exc:
+                if not future.done():
+                    future.set_result(exc.value)
+                return
+            except asyncio.CancelledError:
+                future.cancel()
+                return
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+                return
+            except BaseException as exc:
+                if not future.done():
+                    future.set_exception(exc)
+                raise
+            finally:
+                gillcup.futures._in_clock_task = previous
+            try:
+                self._wait(yielded)
+            except Exception as exc:
+                value = None
+                exception = exc
+            else:
+                return
+
+    def _wait(self, yielded):
+        """Arrange for the coroutine to be resumed after what it yielded"""
+        if yielded is None:
+            self._clock.schedule(0, self._step)
+            return
+        try:
+            add_done_callback = yielded.add_done_callback
+        except AttributeError:
+            try:
+                delay = float(yielded)
+            except (TypeError, ValueError):
+                raise TypeError('coroutine yielded {!r}, which is neither '
+                                'a number nor a future'.format(yielded))
+            self._clock.schedule(delay, self._step)
+            return
+        if (isinstance(yielded, gillcup.futures.Future) and
+                yielded.clock is self._clock):
+            # The callback will be called from an action on our clock
+            add_done_callback(self._resume)
+            return
+        if getattr(yielded, '_asyncio_future_blocking', False):
+            # Protocol of asyncio futures: the awaiter resets the flag
+            yielded._asyncio_future_blocking = False
+        add_done_callback(self._wakeup)
+
+    def _wakeup(self, future):
+        self._clock.schedule(0, self._resume, future)
+
+    def _resume(self, future):
+        try:
+            result = future.result()
+        except (Exception, asyncio.CancelledError) as exc:
+            self._step(None, exc)
+        else:
+            self._step(result)
 
 
 class Subclock(Clock):
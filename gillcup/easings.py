@@ -165,6 +165,19 @@ class Easing:
     Easing objects display as a graph when viewed in IPython Notebook,
     using :func:`format_svg`.
 
+    .. attribute:: monotonic
+
+        True if the easing is known to never decrease for arguments
+        between 0 and 1 (so it never overshoots).
+        This is given by the *monotonic* argument,
+        and it is kept by :meth:`parametrized` and the variants
+        (:attr:`out`, :attr:`in_out`, :attr:`out_in`).
+        If that depends on the parameters, *monotonic* can be a function
+        that is called with the parameters (including defaults)
+        as keyword arguments, and returns whether the easing is monotonic.
+        It allows :func:`gillcup.expressions.bounds` to compute bounds
+        of eased values.
+
     .. autospecialmethod:: __call__
 
     .. automethod:: parametrized
@@ -176,7 +189,8 @@ class Easing:
 
     """
     @fix_public_signature
-    def __init__(self, func, *, kwargs=None, _filters=(_normalize,)):
+    def __init__(self, func, *, kwargs=None, monotonic=False,
+                 _filters=(_normalize,)):
 
         orig_func = func
 
@@ -189,6 +203,14 @@ class Easing:
             name_parts.append(')')
 
         kwargs = kwargs or {}
+        self._monotonic = monotonic
+        if callable(monotonic):
+            parameters = inspect.signature(orig_func).parameters
+            params = {p.name: p.default
+                      for p in list(parameters.values())[1:]
+                      if p.default is not p.empty}
+            params.update(kwargs)
+            monotonic = bool(monotonic(**params))
         for filt in _filters:
             func, name_part = filt(func)
             name_parts.append(name_part)
@@ -196,6 +218,7 @@ class Easing:
         self.orig_func = orig_func
         self.func = func
         self.kwargs = kwargs
+        self.monotonic = monotonic
 
         self.__name__ = ''.join(name_parts)
 
@@ -259,7 +282,7 @@ class Easing:
                 else:
                     new_kwargs[param.name] = arg
             return Easing(self.orig_func, _filters=self.filters,
-                          kwargs=new_kwargs)
+                          kwargs=new_kwargs, monotonic=self._monotonic)
 
         parametrized.__signature__ = signature
         parametrized.__doc__ = type(self).parametrized.__doc__
@@ -300,6 +323,7 @@ class Easing:
             f.out(t) = 1 - f(1 - t)
         """
         rval = Easing(self.orig_func, kwargs=self.kwargs,
+                      monotonic=self._monotonic,
                       _filters=self.filters + (_ease_out_filter,))
         rval.out = self
         return rval
@@ -324,6 +348,7 @@ class Easing:
             \end{cases}
         """
         return Easing(self.orig_func, kwargs=self.kwargs,
+                      monotonic=self._monotonic,
                       _filters=self.filters + (_ease_in_out_filter,))
 
     @reify
@@ -344,6 +369,7 @@ class Easing:
             \end{cases}
         """
         return Easing(self.orig_func, kwargs=self.kwargs,
+                      monotonic=self._monotonic,
                       _filters=self.filters + (_ease_out_in_filter,))
 
     def _repr_svg_(self):
@@ -375,10 +401,13 @@ class Easing:
         return self.p(*args, **kwargs)
 
 
-def easing(func):
+def easing(func=None, *, monotonic=False):
     """Decorator for easing functions.
 
     Wraps the given function in :class:`Easing`.
+    Use ``@easing(monotonic=True)`` for functions that never decrease
+    between 0 and 1, or pass a function of the parameters
+    (see :attr:`Easing.monotonic`).
 
     .. easing_graph:: staircase
 
@@ -388,11 +417,15 @@ def easing(func):
         ...     return ((t * steps) // 1) / steps
 
     """
-    return Easing(func)
+    if func is None:
+        return functools.partial(easing, monotonic=monotonic)
+    return Easing(func, monotonic=monotonic)
 
 
-def _easing(func=None):
-    func = easing(func)
+def _easing(func=None, *, monotonic=False):
+    if func is None:
+        return functools.partial(_easing, monotonic=monotonic)
+    func = easing(func, monotonic=monotonic)
     standard_easings[func.__name__] = func
     for variant in ['in_', 'out', 'in_out', 'out_in']:
         name = '{}.{}'.format(func.__name__, variant)
@@ -400,7 +433,7 @@ def _easing(func=None):
     return func
 
 
-@_easing
+@_easing(monotonic=True)
 def linear(t):
     r"""Linear interpolation
 
@@ -409,7 +442,7 @@ def linear(t):
     return t
 
 
-@_easing
+@_easing(monotonic=True)
 def quad(t):
     r"""Quadratic easing
 
@@ -418,7 +451,7 @@ def quad(t):
     return t * t
 
 
-@_easing
+@_easing(monotonic=True)
 def cubic(t):
     r"""Cubic easing
 
@@ -427,7 +460,7 @@ def cubic(t):
     return t ** 3
 
 
-@_easing
+@_easing(monotonic=True)
 def quart(t):
     r"""Quartic easing
 
@@ -436,7 +469,7 @@ def quart(t):
     return t ** 4
 
 
-@_easing
+@_easing(monotonic=True)
 def quint(t):
     r"""Quintic easing
 
@@ -445,7 +478,7 @@ def quint(t):
     return t ** 5
 
 
-@_easing
+@_easing(monotonic=lambda exponent: exponent > 0)
 def power(t, exponent=2):
     r"""Power interpolation
 
@@ -457,7 +490,7 @@ def power(t, exponent=2):
     return t ** exponent
 
 
-@_easing
+@_easing(monotonic=True)
 def sine(t):
     r"""Sinusoidal easing: Quarter of a cosine wave
 
@@ -466,7 +499,7 @@ def sine(t):
     return 1 - math.cos(t * tau / 4)
 
 
-@_easing
+@_easing(monotonic=True)
 def expo(t, exponent=10):
     r"""Exponential easing
 
@@ -477,7 +510,7 @@ def expo(t, exponent=10):
     return 2 ** (exponent * (t - 1))
 
 
-@_easing
+@_easing(monotonic=True)
 def circ(t):
     r"""Circular easing: Quarter of a circle
 
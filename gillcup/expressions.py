@@ -120,6 +120,7 @@ Basic Expressions
 .. autoclass:: gillcup.expressions.Constant
 .. autoclass:: gillcup.expressions.Value
 .. autoclass:: gillcup.expressions.Progress
+.. autoclass:: gillcup.expressions.Track
 
 Compound Expressions
 ....................
@@ -127,6 +128,8 @@ Compound Expressions
 .. autoclass:: gillcup.expressions.Reduce
 .. autoclass:: gillcup.expressions.Map
 .. autoclass:: gillcup.expressions.Interpolation
+.. autoclass:: gillcup.expressions.CatmullRom
+.. autoclass:: gillcup.expressions.Bezier
 .. autoclass:: gillcup.expressions.Box
 
 Arithmetic Expressions
@@ -156,6 +159,18 @@ Debugging helpers
 .................
 
 .. autofunction:: gillcup.expressions.dump
+.. autofunction:: gillcup.expressions.profiling
+.. autoclass:: gillcup.expressions.Profile
+.. autofunction:: gillcup.expressions.stats
+.. autoclass:: gillcup.expressions.GraphStats
+
+Performance helpers
+...................
+
+.. autofunction:: gillcup.expressions.deferred_replacements
+.. autofunction:: gillcup.expressions.interning
+.. autofunction:: gillcup.expressions.intern
+.. autofunction:: gillcup.expressions.compact
 
 
 Helpers
@@ -163,6 +178,10 @@ Helpers
 
 .. autofunction:: gillcup.expressions.simplify
 .. autofunction:: gillcup.expressions.coerce
+.. autofunction:: gillcup.expressions.sample
+.. autofunction:: gillcup.expressions.bake
+.. autofunction:: gillcup.expressions.next_change
+.. autofunction:: gillcup.expressions.bounds
 
 Safe Arithmetic
 ~~~~~~~~~~~~~~~~~~~~~~
@@ -176,11 +195,20 @@ Safe Arithmetic
 
 import operator
 import functools
-import itertools
+import array
+import bisect
+import struct
+import sys
+import time
+import collections
+import contextlib
+import inspect
 import math
-import asyncio
+import weakref
 
-from gillcup.signals import signal
+import gillcup.futures
+from gillcup.signals import signal, _hashable_identity, _ref
+from gillcup.backports.weakref import WeakMethod
 from gillcup.util.slice import get_slice_indices
 
 
@@ -224,6 +252,9 @@ def simplify(exp):
         >>> print(dump(simplify(Value(1))))
         Value <1.0>
 
+    Inside an :func:`interning` block, the result is also passed through
+    :func:`intern`.
+
     Some expressions can be simplified at some time after initialization,
     for example after calling :meth:`Value.fix` or when a :class:`Progress`
     reaches its end time.
@@ -231,6 +262,8 @@ def simplify(exp):
     :meth:`~Expression.replacement_available` signal is triggered,
     and :func:`simplify` will start returning the new replacement.
     """
+    if _interning_depth:
+        return intern(exp)
     return exp.replacement
 
 
@@ -274,18 +307,616 @@ def coerce(value, *, size=None, strict=True):
         value.get  # See if this quacks like an Expression
     except AttributeError:
         tup = _nonexpression_as_tuple(value, size, strict)
-        return Constant(*tup)
+        return _new_constant(tup)
     else:
         if strict and size is not None:
             _check_len(value, size)
         return simplify(value)
 
 
+# Nesting level of interning()
+_interning_depth = 0
+
+# Interned expressions: key -> (weakref to expression, its children)
+# The children are kept alive so that their ids (which are part of the key)
+# are not reused.
+_intern_table = {}
+
+# Interned all-zero and all-one constants, referenced strongly
+_common_constants = {}
+
+
+def intern(exp):
+    """Return a shared expression structurally identical to *exp*
+
+    Two expressions are structurally identical if they are of the same
+    type, use the same operation, and have the *same* (not just equal)
+    operands.
+    Mutable expressions such as :class:`Value` or :class:`Box` are never
+    shared, but expressions built from the same mutable expressions can be:
+
+        >>> a = Value(1)
+        >>> two = Constant(2)
+        >>> first = intern(a * two)
+        >>> first is intern(a * two)
+        True
+
+    Constants with the same value are shared as well.
+    All-zero and all-one constants are kept alive once interned;
+    other expressions are only shared while something else references them.
+
+    The given expression is simplified first.
+    If it is not already interned, it becomes the shared instance.
+
+    See also :func:`interning`.
+    """
+    exp = exp.replacement
+    intern_key = exp._intern_key()
+    if intern_key is None:
+        return exp
+    key, children = intern_key
+    try:
+        ref, _children = _intern_table[key]
+    except KeyError:
+        pass
+    else:
+        existing = ref()
+        if existing is not None:
+            return existing.replacement
+
+    def _remove(ref, key=key):
+        entry = _intern_table.get(key)
+        if entry is not None and entry[0] is ref:
+            del _intern_table[key]
+
+    _intern_table[key] = weakref.ref(exp, _remove), children
+    if isinstance(exp, Constant) and (all(v == 0 for v in exp._value) or
+                                      all(v == 1 for v in exp._value)):
+        _common_constants[key] = exp
+    return exp
+
+
+def _new_constant(value):
+    """Create a Constant, interning it if :func:`interning` is active"""
+    if _interning_depth:
+        return intern(Constant(*value))
+    return Constant(*value)
+
+
+@contextlib.contextmanager
+def interning():
+    """Context manager that shares structurally identical expressions
+
+    Within this context manager, results of :func:`simplify`
+    and :func:`coerce` are passed through :func:`intern`.
+    Since expression operators use these, identical subexpressions
+    built in the block are shared,
+    saving both memory and evaluation work::
+
+        >>> a, b = Value(1), Value(2)
+        >>> with interning():
+        ...     first = a * 2 + b
+        ...     second = a * 2 + b
+        >>> first is second
+        True
+
+    Constants such as ``0`` and ``1`` are also shared,
+    so :func:`dump` of expressions built this way will
+    mark them as repeated.
+    """
+    global _interning_depth
+    _interning_depth += 1
+    try:
+        yield
+    finally:
+        _interning_depth -= 1
+
+
+def _connect_replacement(exp, listener, weak=None, arg_adapter=None,
+                         with_sender=False):
+    """Connect a listener to the replacement_available signal of exp
+
+    The listener list is stored directly on the expression,
+    in the ``_replacement_listeners`` attribute.
+    Entries are
+    ``(key, listener, is_weak, arg_adapter, is_signal, with_sender)`` tuples,
+    where *listener* is a weak reference if *is_weak* is true.
+    Dead weak references are pruned lazily.
+
+    Semantics match :meth:`gillcup.signals.Signal.connect`,
+    except if *with_sender* is true, the listener is called with
+    the replaced expression as the only argument.
+    """
+    try:
+        connect_override = listener._gillcup_signal_connect_override
+    except AttributeError:
+        pass
+    else:
+        if connect_override(_ReplacementSignal(exp), weak, arg_adapter):
+            return
+    key = _hashable_identity(listener), arg_adapter
+    if weak is None:
+        weak = inspect.ismethod(listener)
+    listeners = getattr(exp, '_replacement_listeners', None)
+    if listeners is None:
+        listeners = exp._replacement_listeners = []
+    for i, entry in enumerate(listeners):
+        if entry[0] == key:
+            if weak or not entry[2]:
+                return
+            del listeners[i]
+            break
+    else:
+        size = len(listeners)
+        if size >= 8 and not size & (size - 1):
+            listeners[:] = [e for e in listeners if not e[2] or e[1]()]
+    is_signal = getattr(listener, '_is_gillcup_signal', False)
+    if weak:
+        listener = _ref(listener)
+    listeners.append(
+        (key, listener, weak, arg_adapter, is_signal, with_sender))
+
+
+def _listen_for_replacement(exp, method, with_sender=False):
+    """Fast version of :func:`_connect_replacement` for internal use
+
+    *method* must be a bound method that is not yet connected to *exp*.
+    It is referenced weakly.
+    """
+    listeners = getattr(exp, '_replacement_listeners', None)
+    if listeners is None:
+        listeners = exp._replacement_listeners = []
+    else:
+        size = len(listeners)
+        if size >= 8 and not size & (size - 1):
+            listeners[:] = [e for e in listeners if not e[2] or e[1]()]
+    key = (id(method.__func__), id(method.__self__)), None
+    listeners.append((key, WeakMethod(method), True, None, False, with_sender))
+
+
+def _disconnect_replacement(exp, listener, arg_adapter=None):
+    """Disconnect a listener connected by :func:`_connect_replacement`
+
+    Return false if the listener was not found.
+    """
+    listeners = getattr(exp, '_replacement_listeners', None)
+    if listeners:
+        key = _hashable_identity(listener), arg_adapter
+        for i, entry in enumerate(listeners):
+            if entry[0] == key:
+                del listeners[i]
+                return True
+    return False
+
+
+def _notify_replacement(exp):
+    """Call the replacement_available listeners of exp
+
+    Returns a list of results, like :meth:`gillcup.signals.Signal.__call__`.
+    If replacements are being deferred, the listeners are queued instead,
+    and the result is empty.
+
+    Replacements often cascade: a listener simplifies its expression,
+    which notifies that expression's listeners, and so on.
+    To avoid deep recursion, notifications sent while listeners are
+    being called are queued, and handled (in order) after the current
+    listener returns. Their results are not returned.
+
+    If a listener raises an exception, the queued notifications are still
+    handled; the first exception is re-raised afterwards.
+    """
+    global _notification_queue
+    if _deferral_depth:
+        _queue_replacement(exp)
+        return []
+    if _notification_queue is not None:
+        _notification_queue.append(exp)
+        return []
+    _notification_queue = queue = collections.deque()
+    error = None
+    try:
+        try:
+            result = _call_replacement_listeners(exp)
+        except Exception as e:
+            error = e
+        while queue:
+            try:
+                _call_replacement_listeners(queue.popleft())
+            except Exception as e:
+                if error is None:
+                    error = e
+    finally:
+        _notification_queue = None
+    if error is not None:
+        raise error
+    return result
+
+
+# Expressions waiting for their replacement_available listeners to be called
+# (None if no listeners are being called)
+_notification_queue = None
+
+
+def _call_replacement_listeners(exp):
+    result = []
+    listeners = getattr(exp, '_replacement_listeners', None)
+    if listeners:
+        dead = False
+        for entry in tuple(listeners):
+            _k, listener, is_weak, arg_adapter, is_signal, with_sender = entry
+            if is_weak:
+                listener = listener()
+                if listener is None:
+                    dead = True
+                    continue
+            if is_signal and not listener:
+                continue
+            if with_sender:
+                partial_result = listener(exp)
+            elif arg_adapter is None:
+                partial_result = listener()
+            else:
+                args, kwargs = arg_adapter()
+                partial_result = listener(*args, **kwargs)
+            if is_signal:
+                result.extend(partial_result)
+            else:
+                result.append(partial_result)
+        if dead:
+            listeners[:] = [e for e in listeners if not e[2] or e[1]()]
+    class_signal = _class_replacement_signals.get(type(exp))
+    if class_signal:
+        result.extend(class_signal(sender=exp))
+    return result
+
+
+_class_replacement_signals = weakref.WeakKeyDictionary()
+
+# Nesting level of deferred_replacements(), and the listeners it has queued
+_deferral_depth = 0
+_pending_listeners = {}
+
+
+def _queue_replacement(exp):
+    """Queue the replacement_available listeners of exp
+
+    Each listener is queued at most once (keyed by its identity
+    and argument adapter), regardless of how many notifications it gets.
+    Listeners that take the sender are queued once per sender.
+    """
+    listeners = getattr(exp, '_replacement_listeners', None)
+    if listeners:
+        for key, listener, is_weak, arg_adapter, is_signal, with_sender in (
+                listeners):
+            if with_sender:
+                key = key, id(exp)
+                sender = exp
+            else:
+                sender = None
+            _pending_listeners[key] = (
+                listener, is_weak, arg_adapter, is_signal, sender)
+    class_signal = _class_replacement_signals.get(type(exp))
+    if class_signal:
+        key = id(class_signal), id(exp)
+        listener = functools.partial(class_signal, sender=exp)
+        _pending_listeners[key] = listener, False, None, False, None
+
+
+def _defer_replacements():
+    global _deferral_depth
+    _deferral_depth += 1
+
+
+def _apply_deferred_replacements():
+    """End one level of deferral; at the outermost level, call listeners
+
+    Queued listeners are called in waves: notifications sent from the
+    listeners are themselves coalesced and run in the next wave.
+
+    If a listener raises an exception, the remaining listeners are still
+    called; the first exception is re-raised afterwards.
+    """
+    global _deferral_depth
+    error = None
+    try:
+        if _deferral_depth == 1:
+            while _pending_listeners:
+                batch = list(_pending_listeners.values())
+                _pending_listeners.clear()
+                for entry in batch:
+                    try:
+                        _call_pending_listener(*entry)
+                    except Exception as e:
+                        if error is None:
+                            error = e
+    finally:
+        _deferral_depth -= 1
+        if not _deferral_depth:
+            # Only left over if interrupted by a BaseException
+            _pending_listeners.clear()
+    if error is not None:
+        raise error
+
+
+def _call_pending_listener(listener, is_weak, arg_adapter, is_signal, sender):
+    if is_weak:
+        listener = listener()
+        if listener is None:
+            return
+    if is_signal and not listener:
+        return
+    if sender is not None:
+        listener(sender)
+    elif arg_adapter is None:
+        listener()
+    else:
+        args, kwargs = arg_adapter()
+        listener(*args, **kwargs)
+
+
+@contextlib.contextmanager
+def deferred_replacements():
+    """Context manager that coalesces replacement notifications
+
+    Normally, when an expression gets a :attr:`~Expression.replacement`,
+    its :meth:`~Expression.replacement_available` listeners are called
+    immediately, and compound expressions simplify themselves
+    right away.
+    If many of an expression's operands are replaced one by one,
+    it is re-simplified many times.
+
+    Within this context manager, the listeners are only queued.
+    They are called at the end of the outermost ``with`` block,
+    once per listener no matter how many notifications it got:
+
+        >>> values = [Value(i) for i in range(100)]
+        >>> total = Sum(values)
+        >>> with deferred_replacements():
+        ...     for value in values:
+        ...         value.fix()
+        ...     print(type(total.replacement).__name__)
+        Sum
+        >>> total.replacement
+        <4950.0>
+
+    Since a replacement always has the same value as the original,
+    values of expressions are not affected by deferring.
+
+    See also :attr:`Clock.coalesce_replacements
+    <gillcup.clocks.Clock.coalesce_replacements>`.
+    """
+    _defer_replacements()
+    try:
+        yield
+    finally:
+        _apply_deferred_replacements()
+
+
+# The Profile being recorded by profiling(), or None
+_profile = None
+
+
+@contextlib.contextmanager
+def profiling():
+    """Context manager that records evaluation statistics
+
+    Returns a :class:`Profile` that records, for each expression
+    evaluated in the ``with`` block,
+    the number of evaluations and the time they took::
+
+        >>> exp = Value(1) + Value(2)
+        >>> with profiling() as profile:
+        ...     for i in range(10):
+        ...         value = exp.get()
+        >>> profile.calls(exp)
+        10
+
+    The results can be shown with :func:`dump`.
+
+    Only evaluations of compound expressions (and their direct inputs)
+    are recorded, not direct calls to :meth:`~Expression.get` of
+    basic expressions such as :class:`Value`.
+    When not profiling, the overhead is a single check per evaluation.
+    """
+    global _profile
+    outer_profile = _profile
+    profile = _profile = Profile()
+    try:
+        yield profile
+    finally:
+        _profile = outer_profile
+
+
+class Profile:
+    """Evaluation statistics recorded by :func:`profiling`
+
+    Keeps references to all the recorded expressions.
+
+    Methods:
+        .. automethod:: calls
+        .. automethod:: time
+        .. automethod:: by_type
+    """
+    def __init__(self):
+        # Records keyed by id(exp): [exp, number of calls, total time]
+        self._records = {}
+
+    def _record(self, exp, elapsed):
+        try:
+            record = self._records[id(exp)]
+        except KeyError:
+            self._records[id(exp)] = [exp, 1, elapsed]
+        else:
+            record[1] += 1
+            record[2] += elapsed
+
+    def calls(self, exp):
+        """Return the number of times *exp* was evaluated"""
+        record = self._records.get(id(exp))
+        return record[1] if record else 0
+
+    def time(self, exp):
+        """Return the time spent evaluating *exp*, in seconds
+
+        This includes time spent evaluating the inputs of *exp*.
+        """
+        record = self._records.get(id(exp))
+        return record[2] if record else 0
+
+    def by_type(self):
+        """Return statistics per expression type
+
+        Returns a dict mapping types to ``(calls, time)`` tuples.
+        Since times include the inputs,
+        nested expressions of the same type are counted more than once.
+        """
+        result = {}
+        for exp, calls, elapsed in self._records.values():
+            total_calls, total_time = result.get(type(exp), (0, 0))
+            result[type(exp)] = total_calls + calls, total_time + elapsed
+        return result
+
+
+def compact(exp):
+    """Release the parts of an expression graph that are no longer needed
+
+    When an expression is simplified, its parents switch to the
+    :attr:`~Expression.replacement`, but anything else that references
+    the original keeps it, and everything it was built from, alive.
+    For example, a finished animation stored in a variable still holds on to
+    its :class:`Interpolation`, :class:`Progress` and start value:
+
+        >>> t = Value(0.5)
+        >>> exp = Interpolation(Value(1), Value(3), t)
+        >>> t.fix(1)
+        >>> print(dump(exp))
+        Interpolation <3.0>:
+          start <1.0>:
+            Value <1.0>
+          end <3.0>:
+            Value <3.0>
+          t <1.0>:
+            Constant <1.0>
+
+    This function walks the graph starting at *exp*.
+    Expressions that have been replaced drop references to their former
+    inputs, and disconnect the listeners they connected to them.
+    They continue to evaluate to the same value, using the replacement:
+
+        >>> compact(exp)
+        <3.0>
+        >>> print(dump(exp))
+        Interpolation <3.0>:
+          start <3.0>:
+            Value <3.0>  (&1)
+          end <3.0>:
+            Value <3.0>  (*1)
+          t <0.0>:
+            Constant <0.0>
+
+    Chains of replacements are shortened, and dead listeners are pruned.
+    The simplified expression is returned.
+
+    Values of properties (see :mod:`gillcup.properties`) are compacted
+    automatically.
+    """
+    # Expressions seen so far, keyed by id
+    # (they are kept alive so that the ids are not reused)
+    seen = {}
+    stack = [exp]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen[id(node)] = node
+        listeners = getattr(node, '_replacement_listeners', None)
+        if listeners:
+            listeners[:] = [e for e in listeners if not e[2] or e[1]()]
+        replacement = node.replacement
+        if replacement is not node:
+            node._compact()
+            stack.append(replacement)
+        else:
+            inputs = node._eval_inputs()
+            if inputs:
+                stack.extend(inputs)
+    return simplify(exp)
+
+
+class _ReplacementSignal:
+    """The replacement_available signal of a particular Expression
+
+    This presents the :class:`~gillcup.signals.Signal` API,
+    but, unlike a full Signal, it is a transient object: the listeners
+    are stored in a plain list on the expression itself.
+    Expression graphs can have very many nodes, so this saves memory.
+    """
+    __slots__ = ('_exp', )
+    _is_gillcup_signal = True
+    name = 'replacement_available'
+
+    def __init__(self, exp):
+        self._exp = exp
+
+    @property
+    def owner(self):
+        return self._exp
+
+    @property
+    def _gillcup_hashable_identity(self):
+        return (id(type(self)), id(self._exp))
+
+    def connect(self, listener, *, weak=None, arg_adapter=None):
+        _connect_replacement(self._exp, listener, weak, arg_adapter)
+
+    def disconnect(self, listener, *, arg_adapter=None):
+        if not _disconnect_replacement(self._exp, listener, arg_adapter):
+            raise LookupError(listener)
+
+    def __call__(self):
+        return _notify_replacement(self._exp)
+
+    def __bool__(self):
+        return bool(getattr(self._exp, '_replacement_listeners', None) or
+                    _class_replacement_signals.get(type(self._exp)))
+
+    def __repr__(self):
+        return '<Signal replacement_available() of {!r}>'.format(self._exp)
+
+
+class _ReplacementSignalDescriptor:
+    """Descriptor for Expression.replacement_available
+
+    On the class, this gives an ordinary class-level
+    :class:`~gillcup.signals.Signal` (with a *sender* argument).
+    On instances, it gives a :class:`_ReplacementSignal`.
+    """
+    def __init__(self, func):
+        self._signal = signal(func)
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            try:
+                return _class_replacement_signals[owner]
+            except KeyError:
+                class_signal = self._signal.__get__(None, owner)
+                _class_replacement_signals[owner] = class_signal
+                return class_signal
+        else:
+            return _ReplacementSignal(instance)
+
+
 class Expression:
     """A dynamic numeric value.
 
     This is a base class, subclass it but do not use it directly.
 
+    To save memory, the expression classes in Gillcup use
+    :token:`__slots__`.
+    Subclasses that do not set :token:`__slots__` get a per-instance
+    :token:`__dict__` as usual.
+
     Subclassing reference:
 
         Overridable members:
@@ -356,8 +987,9 @@ class Expression:
         .. autospecialmethod:: __pos__
         .. autospecialmethod:: __neg__
     """
+    __slots__ = ('__replacement', '_replacement_listeners', '__weakref__')
 
-    @signal
+    @_ReplacementSignalDescriptor
     def replacement_available():
         """Notifies that a simplified replacement is available"""
 
@@ -401,11 +1033,7 @@ class Expression:
                              'use `all` or `any` to clarify')
 
     def __repr__(self):
-        try:
-            value = tuple(self)
-        except Exception as e:
-            return '<%s while getting value>' % type(e).__name__
-        return '<{}>'.format(', '.join(str(n) for n in value))
+        return _format_value(self.get)
 
     def get(self):
         """Return the current value of this expression, as a tuple.
@@ -438,7 +1066,110 @@ class Expression:
     def replacement(self, new_exp):
         if new_exp is not self.replacement:
             self.__replacement = new_exp
-            self.replacement_available()
+            _notify_replacement(self)
+
+    def _intern_key(self):
+        """Key for :func:`intern`
+
+        Return a ``(key, children)`` tuple, or None if this expression
+        must not be shared.
+        The key must identify the structure of the expression;
+        any child expressions in it should be given by :func:`id`
+        and also listed in *children*.
+
+        The base implementation returns None.
+        """
+        return None
+
+    def _eval_inputs(self):
+        """Inputs for non-recursive evaluation (see :func:`_evaluate`)
+
+        Return a sequence of the expressions whose values are needed
+        to compute the value of this one, or None if :meth:`get`
+        should be called directly.
+        The inputs must be existing expressions (referenced from this one),
+        not new temporary objects.
+
+        The base implementation returns None.
+        """
+        return None
+
+    def _eval_combine(self, values):
+        """Compute the value from the values of :meth:`_eval_inputs`
+
+        Only called if :meth:`_eval_inputs` does not return None.
+        """
+        raise NotImplementedError()
+
+    def _sample(self, clock_times):
+        """Values at several clock times, for :func:`sample`
+
+        Expressions that depend on clock time directly (rather than through
+        their inputs) return a list of values, one for each time.
+        *clock_times* is a function that, given a clock, returns the
+        list of that clock's times to sample at.
+
+        The base implementation returns None, meaning the expression does
+        not depend on time directly.
+        """
+        return None
+
+    def _next_change(self, to_time):
+        """Earliest time the value may change, for :func:`next_change`
+
+        Expressions that depend on clock time directly (rather than through
+        their inputs) return the earliest time at which their value may
+        change, or :data:`math.inf` if it never changes.
+        *to_time* is a function that, given a clock and a time on that
+        clock, converts the time to the time returned by
+        :func:`next_change`.
+
+        The base implementation returns None, meaning the result should be
+        computed from the inputs given by :meth:`_eval_inputs`.
+        Expressions without such inputs are assumed to change at
+        an unknown time.
+        """
+        return None
+
+    def _time_bounds(self, clock_times):
+        """Bounds over a time window, for :func:`bounds`
+
+        Expressions that depend on clock time directly (rather than through
+        their inputs) return a tuple with a ``(low, high)`` pair for each
+        component of their value.
+        *clock_times* is a function that, given a clock, returns the
+        start and end of the window on that clock.
+
+        The base implementation returns None, meaning the bounds should be
+        computed by :meth:`_bounds`.
+        """
+        return None
+
+    def _bounds(self, input_bounds):
+        """Bounds computed from bounds of inputs, for :func:`bounds`
+
+        *input_bounds* has the bounds of each of the expressions given by
+        :meth:`_eval_inputs`, in the format returned by :func:`bounds`.
+
+        The base implementation evaluates the expression if all
+        inputs are known exactly; otherwise the value is unbounded.
+        """
+        if all(low == high for b in input_bounds for low, high in b):
+            values = [tuple(low for low, high in b) for b in input_bounds]
+            return tuple((v, v) for v in self._eval_combine(values))
+        return _UNBOUNDED * len(self)
+
+    def _compact(self):
+        """Release references that are not needed after replacement
+
+        Called by :func:`compact` on expressions that have a
+        :attr:`replacement`.
+        The expression must keep evaluating to the same value,
+        but it can compute it from the replacement, drop its other
+        inputs, and disconnect the listeners it connected to them.
+
+        The base implementation does nothing.
+        """
 
     @property
     def children(self):
@@ -585,7 +1316,16 @@ class Expression:
         return simplify(Concat(self[:start], replacement, self[stop:]))
 
 
-def dump(exp, show_ids=False):
+def _format_value(get_value):
+    """Format the result of get_value() for repr() of an expression"""
+    try:
+        value = tuple(get_value())
+    except Exception as e:
+        return '<%s while getting value>' % type(e).__name__
+    return '<{}>'.format(', '.join(str(n) for n in value))
+
+
+def dump(exp, show_ids=False, profile=None):
     """Return a pretty-printed tree of an Expression and its children
 
     Formats the value, :attr:`~Expression.pretty_name`, and, recursively,
@@ -636,7 +1376,24 @@ def dump(exp, show_ids=False):
     Here the ``start``, ``end``, and ``t`` are dynamically generated
     :class:`Box` expressions whose only purpose is to provide the name to make
     the dump more readable.
+
+    If *profile* is given, each evaluated expression is annotated with
+    the number of times it was evaluated, and the total time spent
+    evaluating it (including its inputs).
+    The *profile* can be a :class:`Profile` from :func:`profiling`,
+    or True to profile a single evaluation of *exp*::
+
+        >>> exp = Value(0) + Value(1) / Value(2)
+        >>> print(dump(exp, profile=True))  # doctest: +ELLIPSIS
+        + <0.5>:  [1 call, ... ms]
+          Value <0.0>  [1 call, ... ms]
+          / <0.5>:  [1 call, ... ms]
+            Value <1.0>  [1 call, ... ms]
+            Value <2.0>  [1 call, ... ms]
     """
+    if profile is True:
+        with profiling() as profile:
+            exp.get()
 
     # Value of next marker to be assigned
     counter = 1
@@ -646,57 +1403,70 @@ def dump(exp, show_ids=False):
     # a number → print the number as a marker
     memo = {}
 
-    def gen(exp, indent):
-        """Generate the lines of the dump
-
-        Yields records suitable for fmt() below, tuples of:
-        - indent: the indentation level, as int
-        - exp: the expression itself
-        - sigil: '&' if this is the first time we see this exp, '*' otherwise
-            (this is used in the YAML-style markers: '&' means definition,
-            '*' is reference)
-        - children_follow: True if exp's children are listed after this line.
-            If exp has no children, this is False
-            (used to display ':' if an indented block follows)
-        """
-        nonlocal counter
+    # The lines of the dump, as records suitable for fmt() below, tuples of:
+    # - indent: the indentation level, as int
+    # - exp: the expression itself
+    # - sigil: '&' if this is the first time we see this exp, '*' otherwise
+    #     (this is used in the YAML-style markers: '&' means definition,
+    #     '*' is reference)
+    # - children_follow: True if exp's children are listed after this line.
+    #     If exp has no children, this is False
+    #     (used to display ':' if an indented block follows)
+    entries = []
+
+    # Expressions yet to be listed, with their indentation level
+    # (an explicit stack is used so deep expressions can be dumped)
+    stack = [(exp, 0)]
+    while stack:
+        exp, indent = stack.pop()
         try:
             # Have we seen exp before?
             entry = memo[id(exp)]
         except KeyError:
-            # No! Record it, and yield it, along with any children
+            # No! Record it, and list it, along with any children
             memo[id(exp)] = None
             children = list(exp.children)
-            yield indent, exp, '&', bool(children)
-            for child in children:
-                yield from gen(child, indent + 1)
+            entries.append((indent, exp, '&', bool(children)))
+            stack.extend((child, indent + 1) for child in reversed(children))
         else:
-            # Yes! Yield it, but don't bother listing children again
-            yield indent, exp, '*', False
+            # Yes! List it, but don't bother listing children again
+            entries.append((indent, exp, '*', False))
             # If this is the second (but not third, etc.) time we've seen it,
             # assign a marker value
             if entry is None:
                 memo[id(exp)] = counter
                 counter += 1
 
-    # Running exp() to exhaustion will fill up `memo`
-    entries = list(gen(exp, 0))
+    # Values of expressions evaluated so far, shared between the lines
+    # so that each node is only evaluated once
+    values = {}
+
+    def get_value(exp):
+        if exp._eval_inputs() is None:
+            return exp.get()
+        else:
+            return _evaluate_iteratively(exp, values)
 
     def fmt(indent, exp, sigil, children_follow):
         """Format a single line of the dump
 
-        See gen() for the input
+        See `entries` above for the input
         """
         marker = memo.get(id(exp))
         if marker is None:
             postfix = ''
         else:
             postfix = '  (%s%s)' % (sigil, marker)
+        if profile is not None and profile.calls(exp):
+            calls = profile.calls(exp)
+            postfix += '  [{} call{}, {:.4f} ms]'.format(
+                calls, '' if calls == 1 else 's', profile.time(exp) * 1000)
         if show_ids:
             postfix += ' \t-- id=' + str(id(exp))
-        return '{indent}{exp.pretty_name} {exp}{colon}{postfix}'.format(
+        return '{indent}{exp.pretty_name} {value}{colon}{postfix}'.format(
             indent='  ' * indent,
             exp=exp,
+            value=_format_value(functools.partial(get_value, exp)),
             colon=':' if children_follow else '',
             postfix=postfix,
         )
@@ -704,6 +1474,660 @@ def dump(exp, show_ids=False):
     return '\n'.join(fmt(*entry) for entry in entries)
 
 
+GraphStats = collections.namedtuple(
+    'GraphStats', 'nodes types max_depth shared listeners bytes')
+GraphStats.__doc__ = """
+    Statistics about an expression graph, as returned by :func:`stats`
+
+    Namedtuple elements:
+
+        .. attribute:: nodes
+
+            The number of distinct expressions in the graph
+
+        .. attribute:: types
+
+            A dict mapping expression types to the number of expressions
+            of that type
+
+        .. attribute:: max_depth
+
+            The length of the longest chain of expressions,
+            each an input of the previous one
+            (the depth of a single expression is 1)
+
+        .. attribute:: shared
+
+            The number of expressions that are inputs of more than one
+            other expression, or are reachable from more than one root
+
+        .. attribute:: listeners
+
+            The total number of connected
+            :meth:`~Expression.replacement_available` listeners
+
+        .. attribute:: bytes
+
+            Approximate memory retained by the expressions
+            (see :func:`stats`)
+"""
+
+
+def stats(root_or_roots):
+    """Return statistics about an expression graph
+
+    Takes an expression, or an iterable of expressions,
+    and returns a :class:`GraphStats` describing all expressions
+    reachable from them (through their inputs, and through replacements
+    they keep a reference to):
+
+        >>> a = Value(1)
+        >>> exp = a * 2 + a
+        >>> info = stats(exp)
+        >>> info.nodes, info.max_depth, info.shared
+        (4, 3, 1)
+        >>> sorted(t.__name__ for t in info.types)
+        ['Constant', 'Product', 'Sum', 'Value']
+
+    The :attr:`~GraphStats.bytes` figure is the size of the expression
+    objects themselves, their attribute dicts (if any), and containers held
+    in the attributes (including listener lists, and the numbers in value
+    tuples).
+    Shared objects such as functions, clocks and listeners
+    are not included.
+
+    See :func:`gillcup.properties.census` for statistics about all
+    animated properties.
+    """
+    if isinstance(root_or_roots, Expression):
+        roots = [root_or_roots]
+    else:
+        roots = list(root_or_roots)
+
+    # Depths of the expressions, keyed by id;
+    # _PENDING for expressions whose inputs are being walked
+    depths = {}
+    types = collections.Counter()
+    parent_counts = collections.Counter()
+    listeners = 0
+    size = 0
+    for root in roots:
+        parent_counts[id(root)] += 1
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            if id(node) not in depths:
+                depths[id(node)] = _PENDING
+                types[type(node)] += 1
+                listeners += len(
+                    getattr(node, '_replacement_listeners', None) or ())
+                size += _node_size(node)
+                edges = _graph_edges(node)
+                for edge in edges:
+                    parent_counts[id(edge)] += 1
+                stack.extend(e for e in edges if id(e) not in depths)
+                continue
+            stack.pop()
+            if depths[id(node)] is _PENDING:
+                depths[id(node)] = 1 + max(
+                    (depths[id(e)] for e in _graph_edges(node)
+                     if depths[id(e)] is not _PENDING),
+                    default=0)
+    return GraphStats(
+        nodes=len(depths),
+        types=dict(types),
+        max_depth=max(depths.values(), default=0),
+        shared=sum(1 for c in parent_counts.values() if c > 1),
+        listeners=listeners,
+        bytes=size,
+    )
+
+
+def _graph_edges(exp):
+    """Return expressions referenced by exp, for stats()"""
+    edges = list(exp._eval_inputs() or ())
+    replacement = exp.replacement
+    if replacement is not exp:
+        edges.append(replacement)
+    return edges
+
+
+def _node_size(exp):
+    """Return the approximate size of an expression, for stats()"""
+    size = sys.getsizeof(exp)
+    values = []
+    for cls in type(exp).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_{}{}'.format(cls.__name__.lstrip('_'), name)
+            try:
+                values.append(getattr(exp, name))
+            except AttributeError:
+                pass
+    attrs = getattr(exp, '__dict__', None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+        values.extend(attrs.values())
+    for value in values:
+        if isinstance(value, (tuple, list, dict, array.array)):
+            size += sys.getsizeof(value)
+            if isinstance(value, (tuple, list)):
+                size += sum(sys.getsizeof(item) for item in value
+                            if isinstance(item, (float, tuple)))
+    return size
+
+
+# Depth of nested _evaluate() calls that are using recursion
+_eval_depth = 0
+
+# Depth at which _evaluate() switches to an explicit stack
+_MAX_EVAL_DEPTH = 50
+
+# Placeholder in _evaluate_iteratively (and _walk_graph) for expressions
+# whose inputs are being evaluated
+_PENDING = object()
+
+# Marker for results not computed yet in _walk_graph
+_MISSING = object()
+
+
+def _evaluate(exp):
+    """Return the value of a compound expression
+
+    Used to implement :meth:`~Expression.get` for expressions that
+    provide :meth:`~Expression._eval_inputs`.
+    Shallow expressions are evaluated recursively, which is fastest.
+    Past a certain depth, this switches to
+    :func:`_evaluate_iteratively`, so arbitrarily deep expressions can be
+    evaluated.
+    """
+    global _eval_depth
+    if _profile is not None:
+        return _evaluate_profiled(exp)
+    if _eval_depth >= _MAX_EVAL_DEPTH:
+        return _evaluate_iteratively(exp)
+    _eval_depth += 1
+    try:
+        return exp._eval_combine([i.get() for i in exp._eval_inputs()])
+    finally:
+        _eval_depth -= 1
+
+
+def _evaluate_profiled(exp):
+    """Like :func:`_evaluate`, but record the time taken to :data:`_profile`
+
+    Inputs that don't use :func:`_evaluate` are timed here.
+    Past the recursion limit, the whole subtree is timed as one node.
+    """
+    global _eval_depth
+    profile = _profile
+    clock = time.perf_counter
+    start = clock()
+    if _eval_depth >= _MAX_EVAL_DEPTH:
+        value = _evaluate_iteratively(exp)
+    else:
+        _eval_depth += 1
+        try:
+            values = []
+            for inp in exp._eval_inputs():
+                if inp._eval_inputs() is None:
+                    inp_start = clock()
+                    values.append(inp.get())
+                    profile._record(inp, clock() - inp_start)
+                else:
+                    values.append(inp.get())
+            value = exp._eval_combine(values)
+        finally:
+            _eval_depth -= 1
+    profile._record(exp, clock() - start)
+    return value
+
+
+def _evaluate_iteratively(exp, values=None):
+    """Return the value of a compound expression, without recursion
+
+    The expression graph is walked depth-first using an explicit stack.
+    Nodes that provide :meth:`~Expression._eval_inputs` are computed
+    from their inputs' values; other nodes are evaluated with
+    :meth:`~Expression.get`.
+    Each node shared within the graph is only evaluated once.
+
+    A cycle in the graph raises :class:`RecursionError`,
+    as a recursive evaluation would.
+
+    If given, *values* is a dict of values of already evaluated
+    expressions, keyed by :func:`id`.
+    It is updated with the newly evaluated ones.
+    """
+    if values is None:
+        values = {}
+    stack = [(exp, exp._eval_inputs())]
+    while stack:
+        node, inputs = stack[-1]
+        if values.get(id(node), _PENDING) is not _PENDING:
+            # Shared node, already evaluated
+            stack.pop()
+            continue
+        args = []
+        complete = True
+        for inp in inputs:
+            value = values.get(id(inp))
+            if value is None:
+                inp_inputs = inp._eval_inputs()
+                if inp_inputs is None:
+                    value = values[id(inp)] = inp.get()
+                else:
+                    stack.append((inp, inp_inputs))
+                    complete = False
+                    continue
+            elif value is _PENDING:
+                raise RecursionError('cycle in expression graph')
+            args.append(value)
+        if complete:
+            stack.pop()
+            values[id(node)] = node._eval_combine(args)
+        else:
+            values[id(node)] = _PENDING
+    return values[id(exp)]
+
+
+def _walk_graph(exp, expand):
+    """Compute a result for each node of an expression graph, bottom-up
+
+    This is like :func:`_evaluate_iteratively`, but computes
+    arbitrary results.
+    *expand* is called once for each node, and returns either
+    ``(None, result)`` for nodes whose result is known directly,
+    or ``(inputs, combine)``; *combine* is then called with a list of
+    the results of *inputs* to get the node's result.
+
+    Returns the result for *exp*.
+    A cycle in the graph raises :class:`RecursionError`.
+    """
+    inputs, combine = expand(exp)
+    if inputs is None:
+        return combine
+    results = {}
+    stack = [(exp, inputs, combine)]
+    while stack:
+        node, inputs, combine = stack[-1]
+        if results.get(id(node), _PENDING) is not _PENDING:
+            # Shared node, already computed
+            stack.pop()
+            continue
+        args = []
+        complete = True
+        # Inputs are visited last to first; this order determines which
+        # clock is "first" in functions that default to the first clock
+        for inp in reversed(inputs):
+            result = results.get(id(inp), _MISSING)
+            if result is _MISSING:
+                inp_inputs, inp_combine = expand(inp)
+                if inp_inputs is None:
+                    result = results[id(inp)] = inp_combine
+                else:
+                    stack.append((inp, inp_inputs, inp_combine))
+                    complete = False
+                    continue
+            elif result is _PENDING:
+                raise RecursionError('cycle in expression graph')
+            args.append(result)
+        if complete:
+            stack.pop()
+            args.reverse()
+            results[id(node)] = combine(args)
+        else:
+            results[id(node)] = _PENDING
+    return results[id(exp)]
+
+
+def sample(exp, times, clock=None):
+    """Evaluate an expression at several clock times
+
+    Returns a tuple with the value of *exp* (a tuple) for each of the given
+    *times* on *clock*,
+    as if the clock was advanced to each of those times in turn:
+
+        >>> from gillcup.clocks import Clock
+        >>> clock = Clock()
+        >>> exp = Value(10) * Progress(clock, 4)
+        >>> sample(exp, [0, 1, 2, 5])
+        ((0.0,), (2.5,), (5.0,), (10.0,))
+
+    The clock is not actually advanced, and no scheduled actions are run,
+    so the current value does not change:
+
+        >>> exp
+        <0.0>
+
+    The expression graph is walked only once.
+    Parts of the graph that do not depend on time are evaluated only once.
+
+    If *clock* is not given, all clock-dependent expressions in *exp*
+    must use the same clock.
+    Expressions that use subclocks of *clock*, are sampled at the
+    corresponding subclock times, assuming subclock speeds do not change.
+
+    Times before the clock's current time can not be sampled,
+    since expressions may already have been simplified using the fact that
+    time can not go backwards.
+    Since scheduled actions are not run, any change to the graph they
+    would make (for example, a property being animated) is not reflected.
+    Custom expressions that read the clock's time directly
+    (rather than through :class:`Time` or :class:`Progress`)
+    are evaluated at the current time.
+    """
+    times = [float(t) for t in times]
+    time_map = {}
+
+    def clock_times(exp_clock):
+        if not time_map:
+            _map_clock_times(exp_clock if clock is None else clock,
+                             times, time_map)
+        try:
+            return time_map[exp_clock]
+        except KeyError:
+            raise ValueError('expression uses a clock that is not the '
+                             'sampled clock or its subclock')
+
+    num_times = len(times)
+
+    # The result for each node is a (varying, value) tuple:
+    # if varying is true, value is a list with one value for each time;
+    # otherwise it's a value that doesn't depend on time.
+    def expand(node):
+        sampled = node._sample(clock_times)
+        if sampled is not None:
+            return None, (True, sampled)
+        inputs = node._eval_inputs()
+        if inputs is None:
+            return None, (False, node.get())
+        return inputs, functools.partial(combine, node._eval_combine)
+
+    def combine(eval_combine, input_values):
+        if any(varying for varying, value in input_values):
+            columns = [value if varying else [value] * num_times
+                       for varying, value in input_values]
+            return True, [eval_combine(list(args)) for args in zip(*columns)]
+        else:
+            return False, eval_combine(
+                [value for varying, value in input_values])
+
+    varying, value = _walk_graph(exp, expand)
+    if varying:
+        return tuple(value)
+    else:
+        return (value, ) * num_times
+
+
+def bake(exp, clock, start, end, rate):
+    """Sample an expression into a :class:`Track`
+
+    The value of *exp* is sampled on *clock* from *start* to *end*
+    (both given in time units from the clock's current time),
+    at least *rate* times per time unit.
+    The returned :class:`Track` replays these values on the same clock,
+    interpolating linearly between the samples:
+
+        >>> from gillcup.clocks import Clock
+        >>> clock = Clock()
+        >>> exp = Value(10) * Progress(clock, 4) ** 2
+        >>> track = bake(exp, clock, 0, 4, rate=2)
+        >>> track
+        <0.0>
+        >>> clock.advance_sync(3)
+        >>> exp, track
+        (<5.625>, <5.625>)
+
+    Note that unlike :func:`sample` and :func:`bounds`, which take
+    absolute clock times, *start* and *end* are relative to the clock's
+    current time (as *delay* is elsewhere), since the resulting Track
+    starts playing relative to the current time as well.
+
+    *rate* must be a positive number.
+
+    The samples are taken with :func:`sample`, so the same restrictions
+    apply.
+    """
+    start = float(start)
+    duration = float(end) - start
+    if duration < 0:
+        raise ValueError('negative duration')
+    if not 0 < rate < math.inf:
+        raise ValueError('rate must be a positive number')
+    segments = math.ceil(duration * rate)
+    now = float(clock.time)
+    times = [now + start + duration * i / segments
+             for i in range(segments)]
+    times.append(now + start + duration)
+    return Track(clock, sample(exp, times, clock=clock), duration,
+                 delay=start)
+
+
+def next_change(exp, clock=None):
+    """Return the earliest clock time at which the value of exp may change
+
+    The result is a time on *clock*:
+
+    * the current time, if the value is changing right now,
+    * a later time, if the value will stay the same until then,
+    * :data:`math.inf`, if the value never changes, or
+    * None, if the value can change at any time due to outside
+      influence, e.g. it depends on a :class:`Value`.
+
+    For example:
+
+        >>> from gillcup.clocks import Clock
+        >>> clock = Clock()
+        >>> next_change(Constant(3))
+        inf
+        >>> next_change(Progress(clock, 2, delay=1) * 5 + 2)
+        1.0
+        >>> clock.advance_sync(1.5)
+        >>> next_change(Progress(clock, 2) + Value(3))
+        1.5
+        >>> print(next_change(Value(3) * Constant(2)))
+        None
+
+    A real-time driver can use this to avoid redrawing frames in which
+    nothing changes.
+    Note that actions scheduled on the clock may also change values
+    (for example, by calling :meth:`Value.set`); these are not predicted.
+
+    If *clock* is not given, all clock-dependent expressions in *exp*
+    must use the same clock.
+    Expressions that use subclocks of *clock* are converted to *clock*'s
+    time, assuming subclock speeds do not change.
+
+    The expression graph is walked only once.
+    """
+    clock_map = {}
+
+    def to_time(exp_clock, time):
+        if not clock_map:
+            _map_clock_scales(exp_clock if clock is None else clock,
+                              clock_map)
+        try:
+            now, ref_now, scale = clock_map[exp_clock]
+        except KeyError:
+            raise ValueError('expression uses a clock that is not the '
+                             'queried clock or its subclock')
+        if time <= now:
+            return ref_now
+        return ref_now + (time - now) * scale
+
+    def earliest(times):
+        known = [t for t in times if t is not None]
+        result = min(known) if known else math.inf
+        if len(known) < len(times):
+            # An unknown change time can only be superseded by a change
+            # happening right now
+            if not clock_map or result > clock_map[None]:
+                return None
+        return result
+
+    def expand(node):
+        replacement = node.replacement
+        if replacement is not node:
+            return [replacement], earliest
+        result = node._next_change(to_time)
+        if result is not None:
+            return None, result
+        inputs = node._eval_inputs()
+        if inputs is None:
+            return None, None
+        return inputs, earliest
+
+    return _walk_graph(exp, expand)
+
+
+def bounds(exp, start, end, clock=None):
+    """Return bounds of the values an expression can take in a time window
+
+    Returns a tuple with a ``(low, high)`` pair for each component of *exp*.
+    While *clock*'s time is between *start* and *end*, each component of
+    the value stays between the corresponding *low* and *high*:
+
+        >>> from gillcup.clocks import Clock
+        >>> clock = Clock()
+        >>> x = Progress(clock, 4) * 100 + Value(5)
+        >>> bounds(x, 1, 2)
+        ((30.0, 55.0),)
+        >>> bounds(Concat(x, clock.time), 0, 1)
+        ((5.0, 30.0), (0.0, 1.0))
+
+    The bounds are computed using interval arithmetic,
+    without evaluating the expression at the times in between.
+    They are exact for simple expressions, but may be wider than
+    the actual range when the same input is used several times
+    (e.g. in ``t * (1 - t)``).
+    Where the bounds can not be determined, they are
+    ``(-inf, inf)``.
+
+    Bounds are known for :class:`Sum`, :class:`Difference`,
+    :class:`Product`, :class:`Quotient`, :class:`Neg`,
+    :class:`Interpolation`, :class:`Progress`, :class:`Track`,
+    :class:`~gillcup.animations.Keyframes`, :class:`Slice`, :class:`Concat`,
+    and :class:`Map` with a monotonic easing
+    (see :attr:`Easing.monotonic <gillcup.easings.Easing.monotonic>`)
+    for values between 0 and 1.
+    Other expressions get bounds only if all their inputs have a
+    single possible value.
+
+    As with :func:`sample`, the clock is not advanced.
+    Other values (e.g. of :class:`Value`) are assumed to stay the same,
+    and the same restrictions on clocks apply.
+    """
+    start = float(start)
+    end = float(end)
+    if end < start:
+        raise ValueError('end of time window is before its start')
+    time_map = {}
+
+    def clock_times(exp_clock):
+        if not time_map:
+            _map_clock_times(exp_clock if clock is None else clock,
+                             [start, end], time_map)
+        try:
+            return time_map[exp_clock]
+        except KeyError:
+            raise ValueError('expression uses a clock that is not the '
+                             'given clock or its subclock')
+
+    def expand(node):
+        replacement = node.replacement
+        if replacement is not node:
+            return [replacement], _first_bounds
+        result = node._time_bounds(clock_times)
+        if result is not None:
+            return None, result
+        inputs = node._eval_inputs()
+        if inputs is None:
+            return None, tuple((v, v) for v in node.get())
+        return inputs, node._bounds
+
+    return _walk_graph(exp, expand)
+
+
+_UNBOUNDED = ((-math.inf, math.inf), )
+
+
+def _first_bounds(input_bounds):
+    return input_bounds[0]
+
+
+def _interval_add(a, b):
+    return a[0] + b[0], a[1] + b[1]
+
+
+def _interval_sub(a, b):
+    return a[0] - b[1], a[1] - b[0]
+
+
+def _interval_mul(a, b):
+    products = [x * y for x in a for y in b]
+    if any(math.isnan(p) for p in products):
+        return _UNBOUNDED[0]
+    return min(products), max(products)
+
+
+def _interval_div(a, b):
+    if b[0] <= 0 <= b[1]:
+        return _UNBOUNDED[0]
+    return _interval_mul(a, (1 / b[1], 1 / b[0]))
+
+
+def _bounds_of_samples(values, low_value, high_value):
+    """Bounds of values, given as a sequence of tuples"""
+    return tuple((min(column), max(column))
+                 for column in zip(low_value, high_value, *values))
+
+
+def _map_clock_scales(clock, scales):
+    """Fill scales with times and speeds of clock and its subclocks
+
+    For each clock, the entry is ``(clock's time, time of *clock*,
+    time units of *clock* per time unit of the subclock)``.
+    The entry for None holds the time of *clock*.
+    """
+    ref_now = float(clock._time_value)
+    scales[None] = ref_now
+    scales[clock] = clock._time_value, ref_now, 1
+    stack = [clock]
+    while stack:
+        parent = stack.pop()
+        parent_scale = scales[parent][2]
+        for subclock in parent._subclocks:
+            if subclock not in scales:
+                if subclock.speed:
+                    scale = parent_scale / subclock.speed
+                else:
+                    scale = math.inf
+                scales[subclock] = subclock._time_value, ref_now, scale
+                stack.append(subclock)
+
+
+def _map_clock_times(clock, times, time_map):
+    """Fill time_map with times for clock and its subclocks
+
+    *times* are times of *clock*.
+    """
+    now = clock._time_value
+    if any(t < now for t in times):
+        raise ValueError('Cannot sample before the current time')
+    time_map[clock] = times
+    stack = [clock]
+    while stack:
+        parent = stack.pop()
+        parent_now = parent._time_value
+        for subclock in parent._subclocks:
+            if subclock not in time_map:
+                time_map[subclock] = [
+                    subclock._time_value + (t - parent_now) * subclock.speed
+                    for t in time_map[parent]]
+                stack.append(subclock)
+
+
 def _replace_child(exp, listener):
     """Move listener from an expression to its replacement, return replacement
     """
@@ -711,9 +2135,9 @@ def _replace_child(exp, listener):
     if replacement is exp:
         return exp
     else:
-        exp.replacement_available.disconnect(listener)
+        _disconnect_replacement(exp, listener)
         if not isinstance(replacement, Constant):
-            replacement.replacement_available.connect(listener)
+            _connect_replacement(replacement, listener)
         return replacement
 
 
@@ -748,12 +2172,22 @@ class Constant(Expression):
 
     The value of this expression cannot be changed.
     """
+    __slots__ = ('_value', )
+
     def __init__(self, *value):
         self._value = tuple(float(v) for v in value)
 
     def get(self):
         return self._value
 
+    def _intern_key(self):
+        # The signs tell 0.0 and -0.0 apart
+        signs = tuple(math.copysign(1, v) for v in self._value)
+        return (Constant, self._value, signs), ()
+
+    def _next_change(self, to_time):
+        return math.inf
+
     def __getitem__(self, index):
         start, end = get_slice_indices(len(self), index)
         return Constant(*self._value[slice(start, end)])
@@ -766,6 +2200,8 @@ class Value(Expression):
         .. automethod:: set
         .. automethod:: fix
     """
+    __slots__ = ('_value', '_size', '_fixed')
+
     def __init__(self, *value):
         self._value = tuple(float(v) for v in value)
         self._size = len(self._value)
@@ -874,21 +2310,36 @@ class Reduce(Expression):
             can be ignored if it's not the first operand).
             For example, 0 for ``+`` or ``-``, 1 for ``*`` or ``/``.
     """
+    __slots__ = ('_op', '_operands', '_positions', '_shift', '_size')
     commutative = False
     identity_element = None
+    # Interval arithmetic version of the operation, for bounds()
+    _interval_op = None
 
     def __init__(self, op, operands):
         self._op = op
-        self._operands = tuple(_coerce_all(operands))
-        for i, oper in enumerate(self._operands):
-            oper.replacement_available.connect(self._replace_operands)
-        self._replace_operands()
+        self._operands = []
+        self._positions = None
+        self._shift = 0
+        operands = _coerce_all(operands)
+        self._size = len(operands[0])
+        self._simplify_operands(operands)
 
-    def get(self):
-        return _reduce_tuples(self._operands, self._op)
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self._operands
+
+    def _eval_combine(self, values):
+        return _reduce_tuples(values, self._op)
+
+    def _bounds(self, input_bounds):
+        if self._interval_op is None:
+            return super()._bounds(input_bounds)
+        return _reduce_tuples(input_bounds, self._interval_op)
 
     def __len__(self):
-        return len(self._operands[0])
+        return self._size
 
     @property
     def pretty_name(self):
@@ -898,46 +2349,143 @@ class Reduce(Expression):
     def children(self):
         return self._operands
 
-    def _replace_operands(self, commutative=False):
+    def _intern_key(self):
+        operands = tuple(self._operands)
+        return (type(self), self._op, tuple(map(id, operands))), operands
+
+    def _compact(self):
+        listener = self._operand_replaced
+        for oper in self._operands:
+            _disconnect_replacement(oper, listener)
+        self._operands = [self.replacement]
+        self._positions = None
+
+    def _is_flattenable(self, oper):
+        return type(oper) == type(self) and oper._op == self._op
+
+    def _replace_operands(self):
+        """Simplify all operands at once"""
+        self._simplify_operands(self._operands)
+
+    def _simplify_operands(self, operands):
+        listener = self._operand_replaced
+        for oper in self._operands:
+            _disconnect_replacement(oper, listener)
+
         new = []
-        size = len(self._operands[0])
+        size = self._size
 
         def _generate_operands(operands):
-            for i, oper in enumerate(operands):
-                oper = _replace_child(oper.replacement, self._replace_operands)
-                if ((self.commutative or i == 0) and
-                        type(oper) == type(self) and
-                        oper._op == self._op):
-                    yield from _generate_operands(oper._operands)
+            # Flatten nested operations (an explicit stack of
+            # operand iterators is used, rather than recursion)
+            stack = [enumerate(operands)]
+            while stack:
+                for i, oper in stack[-1]:
+                    oper = oper.replacement
+                    if ((self.commutative or i == 0) and
+                            self._is_flattenable(oper)):
+                        stack.append(enumerate(oper._operands))
+                        break
+                    else:
+                        yield oper
                 else:
-                    yield oper
-
-        for oper in _generate_operands(self._operands):
-            if (new and isinstance(oper, Constant) and
-                    (self.commutative or len(new) == 1) and
-                    isinstance(new[-1], Constant)):
-                new[-1] = Constant(*tuple(map(self._op,
-                                              tuple(new[-1]),
-                                              tuple(oper))))
+                    stack.pop()
+
+        # Only constants at the start are folded, so that the operations
+        # are done in the same order, and the value does not change
+        # (with floats, (x + a) + b may differ from x + (a + b)).
+        for oper in _generate_operands(operands):
+            if (len(new) == 1 and isinstance(oper, Constant) and
+                    isinstance(new[0], Constant)):
+                new[0] = _new_constant(tuple(map(self._op, tuple(new[0]),
+                                                 tuple(oper))))
             else:
                 new.append(oper)
-            if (new and isinstance(oper, Constant) and
+            if (isinstance(oper, Constant) and
                     (self.commutative or len(new) > 1) and
                     all(x == self.identity_element for x in new[-1])):
                 new.pop()
         if not new:
             new.append(Constant(*[self.identity_element] * size))
         self._operands = new
-        if len(self._operands) == 1:
-            [self.replacement] = self._operands
+
+        positions = {}
+        for i, oper in enumerate(new):
+            if not isinstance(oper, Constant):
+                _listen_for_replacement(oper, listener, with_sender=True)
+                positions[id(oper)] = i
+        if self.commutative and len(positions) == sum(
+                not isinstance(oper, Constant) for oper in new):
+            self._positions = positions
+            self._shift = 0
+        else:
+            self._positions = None
+
+        if len(new) == 1:
+            [self.replacement] = new
+
+    def _operand_replaced(self, operand):
+        """Handle replacement of a single operand
+
+        For commutative operations, only the replaced operand is updated,
+        in place.
+        Constants at the start are folded together, as in a full pass.
+        A full pass is done if the structure changes in a more complex way,
+        or for non-commutative operations.
+
+        The positions of operands are stored increased by ``_shift``,
+        so that removing operands from the start does not need to update
+        all of them.
+        """
+        replacement = operand.replacement
+        if replacement is operand:
+            return
+        operands = self._operands
+        positions = self._positions
+        if positions is None:
+            return self._replace_operands()
+        index = positions.get(id(operand))
+        if index is not None:
+            index -= self._shift
+        if (index is None or operands[index] is not operand or
+                self._is_flattenable(replacement) or
+                id(replacement) in positions):
+            return self._replace_operands()
+
+        listener = self._operand_replaced
+        _disconnect_replacement(operand, listener)
+        del positions[id(operand)]
+        operands[index] = replacement
+        if not isinstance(replacement, Constant):
+            _listen_for_replacement(replacement, listener, with_sender=True)
+            positions[id(replacement)] = index + self._shift
+            return
+        if index > 1 or not isinstance(operands[0], Constant):
+            return
+
+        # Fold the constants at the start (all other operands move one
+        # position towards the start for each removed one)
+        while len(operands) > 1 and isinstance(operands[1], Constant):
+            operands[0] = _new_constant(tuple(map(self._op, operands[0],
+                                                  operands[1])))
+            del operands[1]
+            self._shift += 1
+        if len(operands) > 1 and all(x == self.identity_element
+                                     for x in operands[0]):
+            del operands[0]
+            self._shift += 1
+        if len(operands) == 1:
+            [self.replacement] = operands
 
 
 class Sum(Reduce):
     """Element-wise sum
     """
+    __slots__ = ()
     pretty_name = '+'
     commutative = True
     identity_element = 0
+    _interval_op = staticmethod(_interval_add)
 
     def __init__(self, operands):
         super().__init__(operator.add, operands)
@@ -949,9 +2497,11 @@ class Sum(Reduce):
 class Product(Reduce):
     """Element-wise product
     """
+    __slots__ = ()
     pretty_name = '*'
     commutative = True
     identity_element = 1
+    _interval_op = staticmethod(_interval_mul)
 
     def __init__(self, operands):
         super().__init__(operator.mul, operands)
@@ -960,6 +2510,7 @@ class Product(Reduce):
 class _Compare(Reduce):
     """Element-wise comparison
     """
+    __slots__ = ('_symbol', )
 
     @property
     def pretty_name(self):
@@ -973,8 +2524,10 @@ class _Compare(Reduce):
 class Difference(Reduce):
     """Element-wise difference
     """
+    __slots__ = ()
     pretty_name = '-'
     identity_element = 0
+    _interval_op = staticmethod(_interval_sub)
 
     def __init__(self, operands):
         super().__init__(operator.sub, operands)
@@ -1001,8 +2554,10 @@ class Quotient(Reduce):
     Division by zero will result in NaN or infinity, rather than raising
     an exception -- see :func:`safediv`.
     """
+    __slots__ = ()
     pretty_name = '/'
     identity_element = 1
+    _interval_op = staticmethod(_interval_div)
 
     def __init__(self, operands):
         super().__init__(safediv, operands)
@@ -1031,6 +2586,7 @@ class FloorQuotient(Reduce):
     Division by zero will result in NaN or infinity, rather than raising
     an exception -- see :func:`safefloordiv`.
     """
+    __slots__ = ()
     pretty_name = '//'
 
     def __init__(self, operands):
@@ -1054,6 +2610,7 @@ class Modulus(Reduce):
     Division by zero will result in NaN or infinity, rather than raising
     an exception -- see :func:`safemod`.
     """
+    __slots__ = ()
     pretty_name = '%'
 
     def __init__(self, operands):
@@ -1073,6 +2630,7 @@ class Power(Reduce):
 
     Math domain errors will result in NaN, rather than raising an exception.
     """
+    __slots__ = ()
     pretty_name = '**'
     identity_element = 1
 
@@ -1088,11 +2646,15 @@ class Map(Expression):
 
     All operands must be the same size.
     """
+    __slots__ = ('_operands', '_size', '_op')
+
     def __init__(self, op, *operands):
         self._operands = tuple(_coerce_all(operands))
+        self._size = len(self._operands[0])
         self._op = op
-        for i, oper in enumerate(self._operands):
-            oper.replacement_available.connect(self._replace_operands)
+        for oper in self._operands:
+            if not isinstance(oper, Constant):
+                _listen_for_replacement(oper, self._replace_operands)
         self._replace_operands()
 
     @property
@@ -1100,15 +2662,41 @@ class Map(Expression):
         return 'Map {}'.format(self._op.__name__)
 
     def __len__(self):
-        return len(self._operands[0])
+        return self._size
 
-    def get(self):
-        return tuple(map(self._op, *(op.get() for op in self._operands)))
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self._operands
+
+    def _eval_combine(self, values):
+        return tuple(map(self._op, *values))
+
+    def _bounds(self, input_bounds):
+        op = self._op
+        if op is _identity:
+            return input_bounds[0]
+        if len(input_bounds) == 1 and getattr(op, 'monotonic', False):
+            [operand_bounds] = input_bounds
+            if all(0 <= low and high <= 1 for low, high in operand_bounds):
+                return tuple((op(low), op(high))
+                             for low, high in operand_bounds)
+        return super()._bounds(input_bounds)
 
     @property
     def children(self):
         yield from self._operands
 
+    def _intern_key(self):
+        operands = self._operands
+        return (type(self), self._op, tuple(map(id, operands))), operands
+
+    def _compact(self):
+        for oper in self._operands:
+            _disconnect_replacement(oper, self._replace_operands)
+        self._operands = self.replacement,
+        self._op = _identity
+
     def _replace_operands(self, commutative=False):
         self._operands = tuple(_replace_child(op, self._replace_operands)
                                for op in self._operands)
@@ -1116,19 +2704,33 @@ class Map(Expression):
             self.replacement = Constant(*self)
 
 
+def _identity(value):
+    """Operation of a compacted :class:`Map`"""
+    return value
+
+
 class Neg(Map):
     """Element-wise negation"""
+    __slots__ = ()
     pretty_name = 'Neg'
 
     def __init__(self, operand):
         super().__init__(operator.neg, operand)
 
+    def _bounds(self, input_bounds):
+        if self._op is _identity:
+            return input_bounds[0]
+        [operand_bounds] = input_bounds
+        return tuple((-high, -low) for low, high in operand_bounds)
+
 
 class Slice(Expression):
     """Slice of an Expression
 
     Typical result of an ``exp[start:stop]`` operation
     """
+    __slots__ = ('_source', '_start', '_stop', '_len')
+
     def __init__(self, source, index):
         self._source = simplify(source)
         self._start, self._stop = get_slice_indices(len(source), index)
@@ -1139,7 +2741,7 @@ class Slice(Expression):
         elif self._start <= 0 and self._stop >= len(source):
             self.replacement = source
         else:
-            source.replacement_available.connect(self._replace_source)
+            _listen_for_replacement(source, self._replace_source)
             self._replace_source()
 
     def __len__(self):
@@ -1153,8 +2755,27 @@ class Slice(Expression):
     def children(self):
         yield self._source
 
-    def get(self):
-        return self._source.get()[self._start:self._stop]
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self._source,
+
+    def _eval_combine(self, values):
+        [value] = values
+        return value[self._start:self._stop]
+
+    # Bounds have one entry per component, like values
+    _bounds = _eval_combine
+
+    def _intern_key(self):
+        source = self._source
+        return (Slice, id(source), self._start, self._stop), (source, )
+
+    def _compact(self):
+        _disconnect_replacement(self._source, self._replace_source)
+        self._source = self.replacement
+        self._start = 0
+        self._stop = self._len
 
     def _replace_source(self):
         self._source = src = _replace_child(self._source, self._replace_source)
@@ -1165,34 +2786,7 @@ class Slice(Expression):
             self._start = self._start + src._start
             self._stop = self._stop + src._start
         elif isinstance(src, Concat):
-            start = self._start
-            new_children = []
-            children_iter = iter(list(src._children))
-            for child in children_iter:
-                if start > len(child):
-                    start -= len(child)
-                else:
-                    if start:
-                        first_child = child[start:]
-                    else:
-                        first_child = child
-                    break
-            else:
-                raise AssertionError('out of children (at start)')
-            length_remaining = self._len
-            for child in itertools.chain([first_child], children_iter):
-                if not length_remaining:
-                    break
-                assert length_remaining > 0
-                if length_remaining > len(child):
-                    new_children.append(child)
-                    length_remaining -= len(child)
-                else:
-                    new_children.append(child[:length_remaining])
-                    break
-            else:
-                raise AssertionError('out of children (at end)')
-            self.replacement = Concat(*new_children)
+            self.replacement = src[self._start:self._stop]
 
 
 class Concat(Expression):
@@ -1202,72 +2796,282 @@ class Concat(Expression):
     <1.0, 2.0, 3.0>
 
     Usually created as a result of :meth:`~Expression.replace`.
+
+    Internally, a Concat is a balanced binary tree (a "rope")
+    of its pieces, so that getting the value takes linear time,
+    and slicing, concatenation and :meth:`~Expression.replace`
+    take time logarithmic in the number of pieces.
+    Trees are persistent: parts are shared between Concats
+    rather than copied.
     """
+    __slots__ = ('_left', '_right', '_len', '_height')
+
     def __init__(self, *children):
-        children_gen = (coerce(c) for c in children)
-        self._children = tuple(c for c in children_gen if len(c))
-        self._len = sum(len(c) for c in self._children)
-        self._simplify_children()
-        for child in self._children:
-            child.replacement_available.connect(self._simplify_children)
+        tree = None
+        for child in children:
+            child = coerce(child)
+            if len(child):
+                tree = _rope_join_merged(tree, child)
+        self._left = self._right = None
+        self._set_tree(tree)
+
+    @classmethod
+    def _node(cls, left, right):
+        """Create a tree node with the given (non-empty) subtrees"""
+        node = cls.__new__(cls)
+        node._left = node._right = None
+        node._set_children(left, right)
+        return node
+
+    def _set_children(self, left, right):
+        old_left, old_right = self._left, self._right
+        if left is not old_left:
+            if old_left is not None:
+                _disconnect_replacement(old_left, self._replace_left)
+            if not isinstance(left, Constant):
+                _listen_for_replacement(left, self._replace_left)
+        if right is not old_right:
+            if old_right is not None:
+                _disconnect_replacement(old_right, self._replace_right)
+            if not isinstance(right, Constant):
+                _listen_for_replacement(right, self._replace_right)
+        self._left = left
+        self._right = right
+        self._len = len(left) + len(right)
+        self._height = 1 + max(_rope_height(left), _rope_height(right))
+
+    def _set_tree(self, tree):
+        """Make this Concat equivalent to the given tree"""
+        if tree is None:
+            self._len = 0
+            self._height = 0
+            self.replacement = Constant()
+        elif isinstance(tree, Concat):
+            self._set_children(tree._left, tree._right)
+        else:
+            for child, listener in ((self._left, self._replace_left),
+                                    (self._right, self._replace_right)):
+                if child is not None:
+                    _disconnect_replacement(child, listener)
+            self._left = tree
+            self._right = None
+            self._len = len(tree)
+            self._height = 0
+            self.replacement = tree
+
+    def _tree(self):
+        """Return the tree: None if empty, a piece, or self"""
+        if self._right is not None:
+            return self
+        else:
+            return self._left
+
+    def _compact(self):
+        for child, listener in ((self._left, self._replace_left),
+                                (self._right, self._replace_right)):
+            if child is not None:
+                _disconnect_replacement(child, listener)
+        self._left = self.replacement
+        self._right = None
+        self._height = 0
+
+    def _replace_left(self):
+        left = _replace_child(self._left, self._replace_left)
+        self._update_children(left, self._right)
+
+    def _replace_right(self):
+        right = _replace_child(self._right, self._replace_right)
+        self._update_children(self._left, right)
+
+    def _update_children(self, left, right):
+        if isinstance(left, Constant) and isinstance(right, Constant):
+            self._left, self._right = left, right
+            self.replacement = _new_constant(left.get() + right.get())
+        elif _merge_pieces(_rope_last(left), _rope_first(right)) is not None:
+            self._set_tree(_rope_join_merged(left, right))
+        else:
+            self._set_children(left, right)
+
+    def _leaves(self):
+        """Iterate over the pieces of this Concat"""
+        stack = [self._tree()]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Concat):
+                stack.append(node._right)
+                stack.append(node._left)
+            elif node is not None:
+                yield node
 
     @property
     def children(self):
-        return self._children
+        pieces = []
+        for piece in self._leaves():
+            piece = simplify(piece)
+            if pieces:
+                merged = _merge_pieces(pieces[-1], piece)
+                if merged is not None:
+                    pieces[-1] = merged
+                    continue
+            pieces.append(piece)
+        return tuple(pieces)
 
     def __len__(self):
         return self._len
 
-    def get(self):
-        return sum((c.get() for c in self._children), ())
+    get = _evaluate
 
-    def _simplify_children(self):
-        def gen_children(children):
-            for child in children:
-                if isinstance(child, Concat):
-                    yield from gen_children(child._children)
-                else:
-                    yield child
-        new_children = []
-        for child in gen_children(self._children):
-            child = simplify(child)
-            if (isinstance(child, Constant) and
-                    new_children and
-                    isinstance(new_children[-1], Constant)):
-                new_const = Constant(*new_children[-1].get() + child.get())
-                new_children[-1] = new_const
-            elif (isinstance(child, Slice) and
-                    new_children and
-                    isinstance(new_children[-1], Slice) and
-                    child._source is new_children[-1]._source and
-                    child._start == new_children[-1]._stop):
-                new_index = slice(new_children[-1]._start, child._stop)
-                new_children[-1] = simplify(Slice(child._source, new_index))
-            else:
-                new_children.append(child)
-        self._children = tuple(new_children)
-        if len(self._children) == 1:
-            [self.replacement] = self._children
+    def _eval_inputs(self):
+        return list(self._leaves())
+
+    def _eval_combine(self, values):
+        result = []
+        for value in values:
+            result.extend(value)
+        return tuple(result)
+
+    _bounds = _eval_combine
+
+    def _intern_key(self):
+        children = self._left, self._right
+        return (Concat, tuple(map(id, children))), children
 
     def __getitem__(self, index):
         start, end = get_slice_indices(len(self), index)
-        new_children = []
-        for child in self._children:
-            child_len = len(child)
-            if end <= 0:
-                break
-            elif start >= child_len:
-                pass
-            else:
-                if start <= 0 and end >= child_len:
-                    new_children.append(child)
-                else:
-                    new_children.append(child[start:end])
-            start -= child_len
-            if start < 0:
-                start = 0
-            end -= child_len
-        return Concat(*new_children)
+        if start >= end:
+            return Constant()
+        tree = self._tree()
+        _head, tree = _rope_split(tree, start)
+        tree, _tail = _rope_split(tree, end - start)
+        return tree
+
+
+def _rope_height(tree):
+    if isinstance(tree, Concat):
+        return tree._height
+    else:
+        return 0
+
+
+def _rope_first(tree):
+    while isinstance(tree, Concat):
+        tree = tree._left
+    return tree
+
+
+def _rope_last(tree):
+    while isinstance(tree, Concat):
+        tree = tree._right
+    return tree
+
+
+def _merge_pieces(first, second):
+    """Merge two adjacent pieces of a Concat into one, if possible
+
+    Returns None if the pieces can't be merged.
+    """
+    if isinstance(first, Constant) and isinstance(second, Constant):
+        return _new_constant(first.get() + second.get())
+    elif (isinstance(first, Slice) and isinstance(second, Slice) and
+            first._source is second._source and
+            first._stop == second._start):
+        new_index = slice(first._start, second._stop)
+        return simplify(Slice(first._source, new_index))
+    else:
+        return None
+
+
+def _rope_balance(left, right):
+    """Join two trees whose heights differ by at most 2"""
+    height_left = _rope_height(left)
+    height_right = _rope_height(right)
+    if height_left > height_right + 1:
+        if _rope_height(left._left) >= _rope_height(left._right):
+            return Concat._node(left._left,
+                                Concat._node(left._right, right))
+        else:
+            middle = left._right
+            return Concat._node(Concat._node(left._left, middle._left),
+                                Concat._node(middle._right, right))
+    elif height_right > height_left + 1:
+        if _rope_height(right._right) >= _rope_height(right._left):
+            return Concat._node(Concat._node(left, right._left),
+                                right._right)
+        else:
+            middle = right._left
+            return Concat._node(Concat._node(left, middle._left),
+                                Concat._node(middle._right, right._right))
+    else:
+        return Concat._node(left, right)
+
+
+def _rope_join(left, right):
+    """Concatenate two trees (each None, a piece, or a Concat node)"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    height_left = _rope_height(left)
+    height_right = _rope_height(right)
+    if height_left > height_right + 1:
+        return _rope_balance(left._left, _rope_join(left._right, right))
+    elif height_right > height_left + 1:
+        return _rope_balance(_rope_join(left, right._left), right._right)
+    else:
+        return Concat._node(left, right)
+
+
+def _rope_without_first(tree):
+    if isinstance(tree, Concat):
+        left = _rope_without_first(tree._left)
+        if left is None:
+            return tree._right
+        return _rope_balance(left, tree._right)
+    else:
+        return None
+
+
+def _rope_without_last(tree):
+    if isinstance(tree, Concat):
+        right = _rope_without_last(tree._right)
+        if right is None:
+            return tree._left
+        return _rope_balance(tree._left, right)
+    else:
+        return None
+
+
+def _rope_join_merged(left, right):
+    """Concatenate two trees, merging the pieces at the seam if possible"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    merged = _merge_pieces(_rope_last(left), _rope_first(right))
+    if merged is None:
+        return _rope_join(left, right)
+    left = _rope_without_last(left)
+    right = _rope_without_first(right)
+    return _rope_join(_rope_join(left, merged), right)
+
+
+def _rope_split(tree, index):
+    """Split a tree into two; the first will have *index* elements"""
+    if tree is None or index <= 0:
+        return None, tree
+    if index >= len(tree):
+        return tree, None
+    if not isinstance(tree, Concat):
+        return tree[:index], tree[index:]
+    left_len = len(tree._left)
+    if index < left_len:
+        head, tail = _rope_split(tree._left, index)
+        return head, _rope_join(tail, tree._right)
+    elif index == left_len:
+        return tree._left, tree._right
+    else:
+        head, tail = _rope_split(tree._right, index - left_len)
+        return _rope_join(tree._left, head), tail
 
 
 class Box(Expression):
@@ -1283,12 +3087,28 @@ class Box(Expression):
     Also useful to show structure of complicated expressions when debugging,
     see :func:`dump` for an example.
     """
+    __slots__ = ('_name', 'value')
+
     def __init__(self, name, value):
         self._name = name
         self.value = value
 
-    def get(self):
-        return self.value.get()
+    def __len__(self):
+        exp = self.value
+        while isinstance(exp, Box):
+            exp = exp.value
+        return len(exp)
+
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self.value,
+
+    def _eval_combine(self, values):
+        [value] = values
+        return value
+
+    _bounds = _eval_combine
 
     @property
     def pretty_name(self):
@@ -1310,22 +3130,57 @@ class Interpolation(Expression):
 
     Note that :token:`t` is not limited to [0..1]; extrapolation is possible.
     """
+    __slots__ = ('_start', '_end', '_t', '_size')
+
     def __init__(self, start, end, t):
         self._start, self._end = _coerce_all([start, end])
+        self._size = len(self._start)
         self._t = coerce(t, size=1)
         if len(self._t) != 1:
             raise ValueError('Interpolation coefficient must be '
                              'a single number')
-        self._start.replacement_available.connect(self._replace_start)
-        self._end.replacement_available.connect(self._replace_end)
-        self._t.replacement_available.connect(self._replace_t)
+        for child, listener in ((self._start, self._replace_start),
+                                (self._end, self._replace_end),
+                                (self._t, self._replace_t)):
+            if not isinstance(child, Constant):
+                _listen_for_replacement(child, listener)
         self._replace_t()
         self._replace_const_to_const()
 
-    def get(self):
-        t = float(self._t)
+    def __len__(self):
+        return self._size
+
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self._start, self._end, self._t
+
+    def _eval_combine(self, values):
+        start, end, [t] = values
         nt = 1 - t
-        return tuple(a * nt + b * t for a, b in zip(self._start, self._end))
+        return tuple(a * nt + b * t for a, b in zip(start, end))
+
+    def _bounds(self, input_bounds):
+        # The value is linear in each input, so the extremes are at
+        # the corners of the box given by the input bounds
+        start, end, [t] = input_bounds
+        result = []
+        for start_bounds, end_bounds in zip(start, end):
+            corners = [a * (1 - w) + b * w
+                       for a in start_bounds for b in end_bounds for w in t]
+            if any(math.isnan(c) for c in corners):
+                result.append(_UNBOUNDED[0])
+            else:
+                result.append((min(corners), max(corners)))
+        return tuple(result)
+
+    def _compact(self):
+        for child, listener in ((self._start, self._replace_start),
+                                (self._end, self._replace_end),
+                                (self._t, self._replace_t)):
+            _disconnect_replacement(child, listener)
+        self._start = self._end = self.replacement
+        self._t = _new_constant((0, ))
 
     def _replace_start(self):
         self._start = _replace_child(self._start, self._replace_start)
@@ -1349,6 +3204,10 @@ class Interpolation(Expression):
                 all(self._start == self._end)):
             self.replacement = self._start
 
+    def _intern_key(self):
+        children = self._start, self._end, self._t
+        return (Interpolation, tuple(map(id, children))), children
+
     @property
     def children(self):
         yield Box('start', self._start)
@@ -1356,18 +3215,204 @@ class Interpolation(Expression):
         yield Box('t', self._t)
 
 
+class _Spline(Expression):
+    """Base for paths made of cubic segments
+
+    Subclasses provide :meth:`_segment_points`, which gives the
+    polynomial coefficients of each segment.
+    """
+    __slots__ = ('_size', '_segments', '_t', '_arc_length_table')
+    # Number of samples per segment used for arc-length reparametrization
+    _arc_length_steps = 32
+
+    def __init__(self, points, t, *, arc_length=False):
+        points = [exp.get() for exp in _coerce_all(points)]
+        self._size = len(points[0]) if points else 0
+        self._segments = self._segment_points(points)
+        self._arc_length_table = None
+        if arc_length:
+            self._make_arc_length_table()
+        self._set_t(t)
+
+    def _set_t(self, t):
+        self._t = coerce(t, size=1)
+        if len(self._t) != 1:
+            raise ValueError('Path parameter must be a single number')
+        if not isinstance(self._t, Constant):
+            _listen_for_replacement(self._t, self._replace_t)
+        self._replace_t()
+
+    def __len__(self):
+        return self._size
+
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self._t,
+
+    def _eval_combine(self, values):
+        [[t]] = values
+        return self._value_at(t)
+
+    def _value_at(self, t):
+        if self._arc_length_table:
+            t = self._reparametrize(t)
+        segments = self._segments
+        position = t * len(segments)
+        index = min(max(int(position), 0), len(segments) - 1)
+        u = position - index
+        return tuple(((d * u + c) * u + b) * u + a
+                     for a, b, c, d in segments[index])
+
+    def _make_arc_length_table(self):
+        """Tabulate the (normalized) length of the path against t"""
+        count = len(self._segments) * self._arc_length_steps
+        params = [i / count for i in range(count + 1)]
+        lengths = [0]
+        previous = self._value_at(0)
+        for param in params[1:]:
+            point = self._value_at(param)
+            lengths.append(lengths[-1] + math.sqrt(sum(
+                (a - b) ** 2 for a, b in zip(point, previous))))
+            previous = point
+        total = lengths[-1]
+        if total:
+            self._arc_length_table = (
+                [length / total for length in lengths], params)
+
+    def _reparametrize(self, t):
+        lengths, params = self._arc_length_table
+        index = min(max(bisect.bisect_right(lengths, t), 1), len(lengths) - 1)
+        start, end = lengths[index - 1], lengths[index]
+        if start == end:
+            return params[index]
+        u = (t - start) / (end - start)
+        return params[index - 1] * (1 - u) + params[index] * u
+
+    def _replace_t(self):
+        self._t = t = _replace_child(self._t, self._replace_t)
+        if isinstance(t, Constant):
+            self.replacement = _new_constant(self._value_at(*t))
+
+    @property
+    def children(self):
+        yield Box('t', self._t)
+
+
+class CatmullRom(_Spline):
+    """A smooth path through a number of points
+
+    :param points: The points the path goes through.
+                   These are evaluated when the path is created.
+    :param t: The position on the path.
+              At 0 the value is the first point; at 1 it is the last one.
+    :param arc_length: If true, the path is reparametrized so that it is
+                       traversed at constant speed as :token:`t` changes
+                       linearly.
+                       This uses a precomputed table, so it is approximate.
+
+    The path is a uniform Catmull-Rom spline: between each two consecutive
+    points, it is a cubic curve whose tangents point from the previous
+    point to the next one.
+    Without :token:`arc_length`, each segment takes an equal share of
+    :token:`t`.
+
+    The :token:`t` parameter must be a scalar (single-element) expression.
+    Outside [0..1], the end segments are extrapolated.
+
+        >>> exp = CatmullRom([(0, 0), (1, 1), (2, 0)], 0.25)
+        >>> exp
+        <0.4375, 0.5625>
+    """
+    __slots__ = ()
+
+    def _segment_points(self, points):
+        if len(points) < 2:
+            raise ValueError('CatmullRom needs at least 2 points')
+        points = [points[0]] + points + [points[-1]]
+        return [
+            tuple((p1,
+                   (p2 - p0) / 2,
+                   p0 - 2.5 * p1 + 2 * p2 - 0.5 * p3,
+                   -0.5 * p0 + 1.5 * p1 - 1.5 * p2 + 0.5 * p3)
+                  for p0, p1, p2, p3 in zip(*points[i:i + 4]))
+            for i in range(len(points) - 3)]
+
+
+class Bezier(_Spline):
+    """A path made of cubic Bézier curves
+
+    :param points: The control points.
+                   These are evaluated when the path is created.
+                   There must be 3n + 1 points for n curves:
+                   each curve goes from a start point, is shaped by two
+                   control points, and ends at the start point of the
+                   next curve.
+    :param t: The position on the path.
+              At 0 the value is the first point; at 1 it is the last one.
+    :param arc_length: If true, the path is reparametrized so that it is
+                       traversed at constant speed as :token:`t` changes
+                       linearly.
+                       This uses a precomputed table, so it is approximate.
+
+    Without :token:`arc_length`, each curve takes an equal share of
+    :token:`t`.
+
+    The :token:`t` parameter must be a scalar (single-element) expression.
+    Outside [0..1], the end curves are extrapolated.
+
+        >>> exp = Bezier([(0, 0), (0, 1), (1, 1), (1, 0)], 0.5)
+        >>> exp
+        <0.5, 0.75>
+    """
+    __slots__ = ()
+
+    def _segment_points(self, points):
+        if len(points) < 4 or len(points) % 3 != 1:
+            raise ValueError('Bezier needs 3n + 1 points')
+        return [
+            tuple((p0,
+                   3 * (p1 - p0),
+                   3 * (p0 - 2 * p1 + p2),
+                   -p0 + 3 * p1 - 3 * p2 + p3)
+                  for p0, p1, p2, p3 in zip(*points[i:i + 4]))
+            for i in range(0, len(points) - 1, 3)]
+
+
 class Time(Expression):
     """Gives the time on a clock
 
     This is a monotonically increasing scalar Expression, i.e.,
     its value is a single number that can never decrease.
     """
+    __slots__ = ('_clock', )
+
     def __init__(self, clock):
         self._clock = clock
 
     def get(self):
         return (self._clock._time_value, )
 
+    def _sample(self, clock_times):
+        return [(t, ) for t in clock_times(self._clock)]
+
+    def _next_change(self, to_time):
+        return to_time(self._clock, self._clock._time_value)
+
+    def _time_bounds(self, clock_times):
+        return tuple(clock_times(self._clock)),
+
+
+def _next_change_between(clock, start, end, to_time):
+    """Next change time of a value that only changes from start to end"""
+    now = clock._time_value
+    if now < start:
+        return to_time(clock, start)
+    elif now < end:
+        return to_time(clock, now)
+    else:
+        return math.inf
+
 
 class Progress(Expression):
     """Gives linear progress according to a Clock
@@ -1388,12 +3433,13 @@ class Progress(Expression):
     at :token:`delay` time units in the future.
     In this case, :token:`clamp` must be true.
     """
+    __slots__ = ('_clock', '_start', '_duration', 'done', '_clamp')
+
     def __init__(self, clock, duration, *, delay=0, clamp=True):
         self._clock = clock
         self._start = float(clock.time) + float(delay)
         self._duration = float(duration)
-        self._done = asyncio.Future()
-        self.done = clock.wait_for(self._done)
+        self.done = gillcup.futures.Future(clock)
         if self._duration < 0:
             raise ValueError('negative duration')
         if not clamp and not duration:
@@ -1410,7 +3456,24 @@ class Progress(Expression):
         return 1
 
     def get(self):
-        progress_time = float(self._clock.time) - self._start
+        return self._value_at(float(self._clock.time))
+
+    def _sample(self, clock_times):
+        return [self._value_at(t) for t in clock_times(self._clock)]
+
+    def _next_change(self, to_time):
+        if not self._clamp:
+            return to_time(self._clock, self._clock._time_value)
+        return _next_change_between(self._clock, self._start,
+                                    self._start + self._duration, to_time)
+
+    def _time_bounds(self, clock_times):
+        # Progress never decreases
+        start, end = clock_times(self._clock)
+        return (self._value_at(start)[0], self._value_at(end)[0]),
+
+    def _value_at(self, time):
+        progress_time = time - self._start
         if self._duration:
             rv = progress_time / self._duration
             if self._clamp:
@@ -1427,3 +3490,146 @@ class Progress(Expression):
     def _fix(self):
         self.replacement = Constant(1)
         self.done.set_result(True)
+
+
+class Track(Expression):
+    """Replays a sequence of values according to a Clock
+
+    :param samples: A sequence of values (tuples of equal size)
+    :param duration: The time over which the samples are spread
+
+    The value is the first sample at the start
+    (:token:`clock`'s current time + :token:`delay`),
+    and the last sample at the end (:token:`duration` time units after start),
+    when the Track is replaced by a :class:`Constant`.
+    The rest of the samples are equally spaced in between;
+    the value is interpolated linearly between them.
+    Before the start, the value is the first sample.
+
+    Tracks are usually created with :func:`bake`.
+    The samples are stored in a compact array.
+    They can be serialized with :meth:`to_bytes` and loaded again with
+    :meth:`from_bytes`, so tracks can be computed ahead of time.
+
+    Methods:
+        .. automethod:: to_bytes
+        .. automethod:: from_bytes
+    """
+    __slots__ = ('_clock', '_size', '_samples', '_last', '_start',
+                 '_duration', '_scale')
+    _header = struct.Struct('<4sIId')
+    _magic = b'GTrk'
+
+    def __init__(self, clock, samples, duration, *, delay=0):
+        samples = [_nonexpression_as_tuple(s) for s in samples]
+        if not samples:
+            raise ValueError('no samples')
+        size = len(samples[0])
+        data = array.array('d')
+        for sample in samples:
+            _check_len(sample, size)
+            data.extend(sample)
+        self._setup(clock, size, data, duration, delay)
+
+    def _setup(self, clock, size, data, duration, delay):
+        self._clock = clock
+        self._size = size
+        self._samples = data
+        self._last = len(data) // size - 1 if size else 0
+        self._start = float(clock.time) + float(delay)
+        self._duration = float(duration)
+        if self._duration < 0:
+            raise ValueError('negative duration')
+        if self._last and not self._duration:
+            raise ValueError('zero duration for several samples')
+        if self._duration:
+            self._scale = self._last / self._duration
+        end_time = delay + duration
+        if end_time >= 0:
+            clock.schedule(end_time, self._fix)
+        else:
+            self._fix()
+
+    def __len__(self):
+        return self._size
+
+    def get(self):
+        return self._value_at(float(self._clock.time))
+
+    def _sample(self, clock_times):
+        return [self._value_at(t) for t in clock_times(self._clock)]
+
+    def _next_change(self, to_time):
+        if not self._last:
+            return math.inf
+        return _next_change_between(self._clock, self._start,
+                                    self._start + self._duration, to_time)
+
+    def _time_bounds(self, clock_times):
+        # Values are interpolated linearly, so the extremes are at the
+        # ends of the window or at samples inside it
+        start, end = clock_times(self._clock)
+        size = self._size
+        samples = self._samples
+        inner = []
+        if self._last and end > self._start:
+            first = max(0, math.floor((start - self._start) * self._scale) + 1)
+            last = min(self._last,
+                       math.ceil((end - self._start) * self._scale) - 1)
+            inner = [samples[i * size:(i + 1) * size]
+                     for i in range(first, last + 1)]
+        return _bounds_of_samples(inner, self._value_at(start),
+                                  self._value_at(end))
+
+    def _value_at(self, time):
+        size = self._size
+        samples = self._samples
+        if time <= self._start or not self._last:
+            return tuple(samples[:size])
+        position = (time - self._start) * self._scale
+        if position >= self._last:
+            return tuple(samples[-size:] if size else ())
+        index = int(position)
+        t = position - index
+        nt = 1 - t
+        start = index * size
+        return tuple(a * nt + b * t for a, b in zip(
+            samples[start:start + size],
+            samples[start + size:start + size * 2]))
+
+    def _fix(self):
+        self.replacement = Constant(*self._value_at(math.inf))
+
+    def to_bytes(self):
+        """Return the samples and duration of this track, as bytes
+
+        The result can be passed to :meth:`from_bytes`.
+        """
+        data = self._samples
+        if sys.byteorder != 'little':
+            data = array.array('d', data)
+            data.byteswap()
+        return self._header.pack(self._magic, self._size, self._last + 1,
+                                 self._duration) + data.tobytes()
+
+    @classmethod
+    def from_bytes(cls, clock, data, *, delay=0):
+        """Create a Track from the result of :meth:`to_bytes`
+
+        The track will play on *clock*, starting after *delay*.
+        """
+        header = cls._header
+        if len(data) < header.size:
+            raise ValueError('not a serialized Track')
+        magic, size, count, duration = header.unpack_from(data)
+        if magic != cls._magic:
+            raise ValueError('not a serialized Track')
+        samples = array.array('d')
+        samples.frombytes(data[header.size:])
+        if sys.byteorder != 'little':
+            samples.byteswap()
+        if len(samples) != size * count or not count:
+            raise ValueError('Track data has wrong length')
+        self = cls.__new__(cls)
+        self._setup(clock, size, samples, duration, delay)
+        return self
@@ -1,38 +1,151 @@
+import asyncio
+
 from gillcup.util.signature import fix_public_signature
 
+_PENDING = 'PENDING'
+_CANCELLED = 'CANCELLED'
+_FINISHED = 'FINISHED'
+
+# True while a coroutine is being run by a Clock task (see Clock.task).
+# Awaiting a Future then hands the Future itself to the task,
+# rather than going through asyncio.
+_in_clock_task = False
+
 
 class Future:
-    """Wraps a future; calbacks on the wrapper are scheduled on a given Clock
+    """A future whose callbacks are scheduled on a given Clock
 
     To be instantiated using
+    :meth:`Clock.sleep() <gillcup.clocks.Clock.sleep()>`,
+    :meth:`Clock.task() <gillcup.clocks.Clock.task()>` or
     :meth:`Clock.wait_for() <gillcup.clocks.Clock.wait_for()>`.
+    The latter wraps another future, sharing its state.
 
     See :class:`asyncio.Future` for API documentation.
+
+    A Future can be awaited both in coroutines run by
+    :meth:`Clock.task() <gillcup.clocks.Clock.task()>`,
+    and in asyncio tasks.
     """
     @fix_public_signature
-    def __init__(self, clock, wrapped_future, *, _category=0):
+    def __init__(self, clock, wrapped_future=None, *, _category=0):
         self.clock = clock
         self._wrapped = wrapped_future
-        self._callbacks = {}
         self._category = 0
-        self.cancel = wrapped_future.cancel
-        self.cancelled = wrapped_future.cancelled
-        self.done = wrapped_future.done
-        self.result = wrapped_future.result
-        self.exception = wrapped_future.exception
-        self.set_result = wrapped_future.set_result
-        self.set_exception = wrapped_future.set_exception
+        if wrapped_future is None:
+            self._state = _PENDING
+            self._result = None
+            self._exception = None
+            self._callbacks = []
+            # asyncio future for asyncio tasks awaiting this one
+            self._asyncio_future = None
+        else:
+            self._callbacks = {}
+            self.cancel = wrapped_future.cancel
+            self.cancelled = wrapped_future.cancelled
+            self.done = wrapped_future.done
+            self.result = wrapped_future.result
+            self.exception = wrapped_future.exception
+            self.set_result = wrapped_future.set_result
+            self.set_exception = wrapped_future.set_exception
+
+    def __await__(self):
+        if not self.done():
+            if _in_clock_task:
+                yield self
+            else:
+                yield from self._get_asyncio_future().__await__()
+        return self.result()
+
+    __iter__ = __await__
+
+    def _get_asyncio_future(self):
+        if self._wrapped is not None:
+            return self._wrapped
+        if self._asyncio_future is None:
+            self._asyncio_future = asyncio.get_event_loop().create_future()
+        return self._asyncio_future
+
+    def cancel(self):
+        if self._state != _PENDING:
+            return False
+        self._state = _CANCELLED
+        self._finish()
+        return True
 
-    def __iter__(self):
-        return iter(self._wrapped)
+    def cancelled(self):
+        return self._state == _CANCELLED
+
+    def done(self):
+        return self._state != _PENDING
+
+    def result(self):
+        if self._state == _CANCELLED:
+            raise asyncio.CancelledError()
+        if self._state == _PENDING:
+            raise asyncio.InvalidStateError('Result is not ready.')
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self):
+        if self._state == _CANCELLED:
+            raise asyncio.CancelledError()
+        if self._state == _PENDING:
+            raise asyncio.InvalidStateError('Exception is not set.')
+        return self._exception
+
+    def set_result(self, result):
+        if self._state != _PENDING:
+            raise asyncio.InvalidStateError('{}: {!r}'.format(
+                self._state, self))
+        self._result = result
+        self._state = _FINISHED
+        self._finish()
+
+    def set_exception(self, exception):
+        if self._state != _PENDING:
+            raise asyncio.InvalidStateError('{}: {!r}'.format(
+                self._state, self))
+        if isinstance(exception, type):
+            exception = exception()
+        self._exception = exception
+        self._state = _FINISHED
+        self._finish()
+
+    def _finish(self):
+        callbacks = self._callbacks
+        self._callbacks = []
+        for fn in callbacks:
+            self.clock.schedule(0, fn, self, _category=self._category)
+        aio_future = self._asyncio_future
+        if aio_future is not None and not aio_future.done():
+            if self._state == _CANCELLED:
+                aio_future.cancel()
+            elif self._exception is not None:
+                aio_future.set_exception(self._exception)
+            else:
+                aio_future.set_result(self._result)
 
     def add_done_callback(self, fn):
+        if self._wrapped is None:
+            if self._state == _PENDING:
+                self._callbacks.append(fn)
+            else:
+                self.clock.schedule(0, fn, self, _category=self._category)
+            return
+
         def wrapped_callback(future):
             self.clock.schedule(0, fn, self, _category=self._category)
         self._callbacks.setdefault(fn, []).append(wrapped_callback)
         self._wrapped.add_done_callback(wrapped_callback)
 
     def remove_done_callback(self, fn):
+        if self._wrapped is None:
+            callbacks = [f for f in self._callbacks if f != fn]
+            removed = len(self._callbacks) - len(callbacks)
+            self._callbacks = callbacks
+            return removed
         unwrapped_callbacks = self._callbacks[fn]
         return sum(self._wrapped.remove_done_callback(cb)
                    for cb in unwrapped_callbacks)
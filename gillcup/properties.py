@@ -328,6 +328,19 @@ for the new animation.
     <24.0>
     >>> # 24 is halfway between 6 (value of previous animation), and 42
 
+Starting animations this way builds up a chain of them, and all of its
+links are evaluated whenever the property is read.
+When the target changes many times during a single animation
+(for example, when following the mouse pointer),
+pass ``retarget=True`` to start from a snapshot of the current value instead.
+The superseded animation is then dropped::
+
+    >>> beeper.volume.anim(0, duration=2, retarget=True)
+    <...>
+    >>> clock.advance_sync(1)
+    >>> beeper.volume
+    <12.0>
+
 Of course, the target value passed to :meth:`~PropertyValue.anim` may be
 an arbitrary :class:`~gillcup.expressions.Expression`,
 so the end value can be changing in time as well.
@@ -345,8 +358,8 @@ are described in the documentation of the underlying function,
 
 The :meth:`~PropertyValue.anim` method returns a future that is done when
 the animation is finished.
-A :func:`coroutine <gillcup.clocks.coroutine>`
-could use ``yield from beeper.volume.anim(42, duration=2)``
+A coroutine run by :meth:`Clock.task <gillcup.clocks.Clock.task>`
+could use ``await beeper.volume.anim(42, duration=2)``
 to wait (suspend itself) until the end of the animation.
 
 
@@ -382,12 +395,15 @@ Reference
 .. autoclass:: PropertyValue
 .. autofunction:: link
 .. autofunction:: autoname
+.. autofunction:: census
 
 """
 
 import re
+import weakref
 
-from gillcup.expressions import Expression, coerce, simplify
+from gillcup.expressions import Expression, coerce, simplify, stats
+from gillcup.expressions import _evaluate
 from gillcup.animations import anim
 from gillcup.util.autoname import autoname as _autoname, autoname_property
 from gillcup.util.slice import get_slice_indices
@@ -406,6 +422,26 @@ def autoname(cls):
     return _autoname(cls)
 
 
+# All existing AnimatedProperty objects, for census()
+_all_properties = weakref.WeakSet()
+
+
+def census():
+    """Return statistics about expressions of all animated properties
+
+    Returns a :class:`~gillcup.expressions.GraphStats`
+    (see :func:`~gillcup.expressions.stats`) for the expressions
+    currently set on all instances of all :class:`AnimatedProperty`
+    descriptors in the process.
+    Default values that were never set or linked are not included.
+
+    This can help find objects that accumulate animation expressions.
+    """
+    return stats(exp
+                 for prop in list(_all_properties)
+                 for exp in list(prop._instance_expressions.values()))
+
+
 @autoname_property('name')
 class AnimatedProperty:
     """Descriptor for Expression-valued properties.
@@ -435,6 +471,8 @@ class AnimatedProperty:
     """
     def __init__(self, size=1, make_default=None, *, name=None, doc=None):
         self._instance_expressions = {}
+        self._instance_links = {}
+        _all_properties.add(self)
         if make_default:
             self._size = size
             self._factory = make_default
@@ -485,6 +523,13 @@ class AnimatedProperty:
                 exp = self._instance_expressions[id(instance)]
             except KeyError:
                 exp = coerce(self._factory(instance), size=self._size)
+            else:
+                replacement = exp.replacement
+                if replacement is not exp:
+                    # Drop the simplified expression (e.g. a finished
+                    # animation), so it can be garbage-collected
+                    exp = replacement
+                    self._instance_expressions[id(instance)] = exp
             return _PropertyValue(self, instance, exp)
 
     def __set__(self, instance, value):
@@ -492,7 +537,32 @@ class AnimatedProperty:
         if id(instance) not in self._instance_expressions:
             finalize(instance, self._instance_expressions.pop,
                      id(instance), None)
-        self._instance_expressions[id(instance)] = simplify(exp)
+        exp = self._instance_expressions[id(instance)] = simplify(exp)
+        links = self._instance_links.get(id(instance))
+        if links:
+            for linked in list(links.values()):
+                linked._set_source(exp)
+
+    def _register_link(self, instance, linked):
+        """Keep *linked* updated with this property's value on *instance*
+
+        The link's ``_set_source`` method is called with the current
+        expression now, and again whenever the property is set.
+        A default value is materialized, so the factory is called only once.
+        """
+        try:
+            exp = self._instance_expressions[id(instance)]
+        except KeyError:
+            self.__set__(instance, self._factory(instance))
+            exp = self._instance_expressions[id(instance)]
+        try:
+            links = self._instance_links[id(instance)]
+        except KeyError:
+            links = weakref.WeakValueDictionary()
+            self._instance_links[id(instance)] = links
+            finalize(instance, self._instance_links.pop, id(instance), None)
+        links[id(linked)] = linked
+        linked._set_source(exp)
 
 
 def _get_names(name, size):
@@ -548,9 +618,11 @@ class PropertyValue(Expression):
     # It is unusable by itself.
     # It's also used for documentation of the values' methods
     # (since their public API is the same).
+    __slots__ = ()
 
     def anim(self, target, duration=0, clock=None, *,
-             delay=0, easing=None, infinite=False, strength=1):
+             delay=0, easing=None, infinite=False, strength=1,
+             retarget=False):
         """Animate this property
 
         Causes this property's value to gradually become *target*
@@ -587,20 +659,32 @@ class PropertyValue(Expression):
             easing=easing,
             infinite=infinite,
             strength=strength,
+            retarget=retarget,
         )
         self._parent_property.__set__(instance, animation)
         return animation.done
 
-    def get(self):
-        return self.replacement.get()
+    get = _evaluate
+
+    def _eval_inputs(self):
+        return self.replacement,
+
+    def _eval_combine(self, values):
+        [value] = values
+        return value
 
 
 class _PropertyValue(PropertyValue):
+    __slots__ = ('_parent_property', '_instance')
+
     def __init__(self, parent_property, instance, expression):
         self._parent_property = parent_property
         self._instance = instance
         self.replacement = simplify(expression)
 
+    def __len__(self):
+        return len(self._parent_property)
+
     @property
     def pretty_name(self):
         return '{0!r}.{1} value'.format(self._instance,
@@ -624,12 +708,30 @@ class _PropertyValue(PropertyValue):
 
 
 class _Linked(Expression):
+    __slots__ = ('_parent_property', '_instance', '_source')
+
     def __init__(self, parent_property, instance):
         self._parent_property = parent_property
         self._instance = instance
+        parent_property._register_link(instance, self)
+
+    def _set_source(self, exp):
+        self._source = exp
+
+    def __len__(self):
+        return len(self._parent_property)
 
-    def get(self):
-        return self._parent_property.__get__(self._instance).get()
+    get = _evaluate
+
+    def _eval_inputs(self):
+        source = self._source = self._source.replacement
+        return source,
+
+    def _eval_combine(self, values):
+        [value] = values
+        return value
+
+    _bounds = _eval_combine
 
     @property
     def pretty_name(self):
@@ -638,7 +740,7 @@ class _Linked(Expression):
 
     @property
     def children(self):
-        yield simplify(self._parent_property.__get__(self._instance))
+        yield self._source.replacement
 
     def _gillcup_propexp_link(self):
         return self
@@ -694,6 +796,8 @@ def _component_repr(instance, name, vect_name, start, end):
 
 
 class _ComponentPropertyValue(PropertyValue):
+    __slots__ = ('_name', '_parent_property', '_instance', '_start', '_end')
+
     def __init__(self, name, parent_property, instance, expression,
                  start, end):
         self._name = name
@@ -703,6 +807,9 @@ class _ComponentPropertyValue(PropertyValue):
         self._end = end
         self.replacement = expression
 
+    def __len__(self):
+        return self._end - self._start
+
     @property
     def pretty_name(self):
         return _component_repr(
@@ -728,16 +835,34 @@ class _ComponentPropertyValue(PropertyValue):
 
 
 class _LinkedComponent(Expression):
+    __slots__ = ('_name', '_parent_property', '_instance', '_start', '_end',
+                 '_source')
+
     def __init__(self, name, parent_property, instance, start, end):
         self._name = name
         self._parent_property = parent_property
         self._instance = instance
         self._start = start
         self._end = end
+        parent_property._vector_property._register_link(instance, self)
+
+    def _set_source(self, exp):
+        self._source = simplify(exp[self._start:self._end])
+
+    def __len__(self):
+        return self._end - self._start
+
+    get = _evaluate
+
+    def _eval_inputs(self):
+        source = self._source = self._source.replacement
+        return source,
+
+    def _eval_combine(self, values):
+        [value] = values
+        return value
 
-    def get(self):
-        exp = self._parent_property._vector_property.__get__(self._instance)
-        return exp.get()[self._start:self._end]
+    _bounds = _eval_combine
 
     @property
     def pretty_name(self):
@@ -0,0 +1,426 @@
+"""Recording values of expressions to a file
+
+A :class:`Recorder` appends the values of several expressions to a
+file, either at a fixed rate of clock time, whenever the clock's time
+moves forward, or whenever its :meth:`~Recorder.record` method is called
+(for example, once for each rendered frame).
+The file can be opened with :class:`Recording`, which gives access to the
+recorded values without loading the whole file into memory:
+
+    >>> import os, tempfile
+    >>> from gillcup.clocks import Clock
+    >>> from gillcup.expressions import Progress
+    >>> directory = tempfile.TemporaryDirectory()
+    >>> path = os.path.join(directory.name, 'recording.grec')
+
+    >>> clock = Clock()
+    >>> progress = Progress(clock, 2)
+    >>> recorder = Recorder(clock, [progress, clock.time * 10], path,
+    ...                     names=['progress', 'time'], rate=2)
+    >>> clock.advance_sync(2)
+    >>> recorder.close()
+
+    >>> with Recording(path) as recording:
+    ...     print(recording.names, recording.sizes, len(recording))
+    ...     for i in range(len(recording)):
+    ...         print(recording.time(i), recording.get('progress', i))
+    ('progress', 'time') (1, 1) 5
+    0.0 (0.0,)
+    0.5 (0.25,)
+    1.0 (0.5,)
+    1.5 (0.75,)
+    2.0 (1.0,)
+
+    >>> directory.cleanup()
+
+Both the recorder and the reader use memory-mapped files (:mod:`mmap`),
+so long recordings do not need to fit in memory.
+
+File format
+-----------
+
+The file starts with a header, all in little-endian byte order:
+
+* the 4 bytes ``GRec``,
+* a 16-bit format version (currently 1),
+* the data type code (``d`` or ``f``, see :mod:`array`),
+  and a byte order mark (``<`` for little-endian data, ``>`` for big-endian),
+* a 32-bit number of expressions,
+* the recording rate as a double (0 if values were recorded manually),
+* a 64-bit number of recorded rows,
+* for each expression, its 32-bit size, the 32-bit length of its name,
+  and the name encoded in UTF-8,
+* zero bytes that pad the header to a multiple of 8 bytes.
+
+Then follow the rows, in native byte order and the given data type.
+Each row contains the clock time followed by the values of all the
+expressions in order.
+The file may be longer than the rows indicated in the header.
+
+
+Reference
+---------
+
+.. autoclass:: Recorder
+.. autoclass:: Recording
+
+"""
+
+import array
+import mmap
+import struct
+import sys
+
+import gillcup.expressions
+
+_header = struct.Struct('<4sHccIdQ')
+_count_offset = _header.size - 8
+_channel_header = struct.Struct('<II')
+_magic = b'GRec'
+_version = 1
+_byteorder_marks = {'little': b'<', 'big': b'>'}
+
+
+class Recorder:
+    """Records values of expressions into a file
+
+    :param clock: The clock whose time is recorded.
+    :param expressions: Expressions whose values are recorded.
+    :param path: Name of the file to write to. An existing file is replaced.
+    :param names: Names of the expressions, stored in the file.
+                  By default, the expressions are named ``'0'``, ``'1'``,
+                  and so on.
+    :param rate: If given, values are recorded *rate* times per time unit
+                 of *clock*, starting with the current time.
+                 The recording is done by a scheduled action,
+                 so ``advance(None)`` will not finish until the recorder
+                 is closed.
+                 If neither *rate* nor *every_tick* is given, values are
+                 only recorded when :meth:`record` is called.
+    :param every_tick: If true, values are recorded now and then each time
+                       the clock's time moves forward
+                       (see :attr:`~gillcup.clocks.Clock.ticked`).
+                       Can not be combined with *rate*.
+    :param dtype: The type code of the recorded numbers:
+                  ``'d'`` (double, the default) or ``'f'`` (float).
+                  Note that with ``'f'``, the recorded times lose
+                  precision as time goes on.
+
+    The file grows as needed, doubling in size.
+    Until the recorder is closed, the file may contain unused space at the
+    end.
+
+    The recorder can be used as a context manager, which closes it on exit.
+
+    Attributes:
+
+        .. attribute:: names
+
+            A tuple with the names of the recorded expressions.
+
+        .. attribute:: sizes
+
+            A tuple with the sizes of the recorded expressions.
+
+    Methods:
+
+        .. automethod:: record
+        .. automethod:: flush
+        .. automethod:: close
+    """
+    def __init__(self, clock, expressions, path, *, names=None, rate=None,
+                 every_tick=False, dtype='d'):
+        exps = [gillcup.expressions.coerce(e) for e in expressions]
+        if names is None:
+            names = [str(i) for i in range(len(exps))]
+        self.names = tuple(str(n) for n in names)
+        if len(self.names) != len(exps):
+            raise ValueError('number of names does not match expressions')
+        if len(set(self.names)) != len(self.names):
+            raise ValueError('duplicate names')
+        if dtype not in ('d', 'f'):
+            raise ValueError('dtype must be "d" or "f"')
+        if rate is not None and rate <= 0:
+            raise ValueError('rate must be positive')
+        if rate is not None and every_tick:
+            raise ValueError('rate and every_tick can not be combined')
+        self.sizes = tuple(len(e) for e in exps)
+        self._clock = clock
+        self._expressions = exps
+        self._dtype = dtype
+        self._width = 1 + sum(self.sizes)
+        self._row_bytes = self._width * array.array(dtype).itemsize
+        self._count = 0
+
+        header = bytearray(_header.pack(
+            _magic, _version, dtype.encode('ascii'),
+            _byteorder_marks[sys.byteorder], len(exps), rate or 0, 0))
+        for name, size in zip(self.names, self.sizes):
+            encoded = name.encode('utf-8')
+            header += _channel_header.pack(size, len(encoded)) + encoded
+        header += bytes(-len(header) % 8)
+        self._data_offset = len(header)
+
+        self._file = open(path, 'w+b')
+        self._file.write(header)
+        self._mmap = None
+        self._view = None
+        self._capacity = 0
+        self._grow(64)
+
+        self._rate = rate
+        if rate is not None:
+            self._start = clock._time_value
+            self._ticks = 0
+            self._record_scheduled()
+        self._every_tick = every_tick
+        if every_tick:
+            self.record()
+            clock.ticked.connect(self.record)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _grow(self, capacity):
+        """Make room for *capacity* rows, and map the file"""
+        self._release()
+        self._file.truncate(self._data_offset + capacity * self._row_bytes)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._view = memoryview(self._mmap)[self._data_offset:].cast(
+            self._dtype)
+        self._capacity = capacity
+
+    def _release(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def record(self):
+        """Append the current time and values of the expressions
+        """
+        if self._file is None:
+            raise ValueError('recorder is closed')
+        row = array.array(self._dtype, [self._clock._time_value])
+        for exp in self._expressions:
+            row.extend(exp.get())
+        if self._count >= self._capacity:
+            self._grow(self._capacity * 2)
+        start = self._count * self._width
+        self._view[start:start + self._width] = row
+        self._count += 1
+        struct.pack_into('<Q', self._mmap, _count_offset, self._count)
+
+    def _record_scheduled(self):
+        if self._file is None:
+            return
+        self.record()
+        # Compute the next time from the start to avoid accumulating errors
+        self._ticks += 1
+        next_time = self._start + self._ticks / self._rate
+        self._clock.schedule(max(0, next_time - self._clock._time_value),
+                             self._record_scheduled)
+
+    def flush(self):
+        """Flush recorded values to the file"""
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self):
+        """Stop recording, and trim the file to the recorded values
+
+        Closing an already closed recorder has no effect.
+        """
+        if self._file is None:
+            return
+        if self._every_tick:
+            self._clock.ticked.disconnect(self.record)
+        self.flush()
+        self._release()
+        self._file.truncate(self._data_offset + self._count * self._row_bytes)
+        self._file.close()
+        self._file = None
+
+
+class Recording:
+    """Read-only access to a file written by :class:`Recorder`
+
+    :param path: Name of the file to open.
+
+    The file is memory-mapped; values are read from it as they are
+    accessed.
+
+    The recording can be used as a context manager, which closes it on exit.
+    It can not be closed while memoryviews obtained from it
+    (:attr:`data` or rows) are still in use.
+
+    Attributes:
+
+        .. attribute:: names
+
+            A tuple with the names of the recorded expressions.
+
+        .. attribute:: sizes
+
+            A tuple with the sizes of the recorded expressions.
+
+        .. attribute:: rate
+
+            The recording rate, or None if values were recorded manually.
+
+        .. attribute:: dtype
+
+            The type code of the recorded numbers (``'d'`` or ``'f'``).
+
+        .. attribute:: width
+
+            The number of values in each row:
+            the time followed by values of all the expressions.
+
+        .. attribute:: data
+
+            A :class:`memoryview` of all recorded numbers,
+            row after row.
+            For example, with NumPy, a 2-D array of the recording can be
+            obtained without copying the data using
+            ``numpy.frombuffer(rec.data, rec.dtype).reshape(-1, rec.width)``.
+
+    Indexing a Recording gives a memoryview of a single row.
+
+    Methods:
+
+        .. automethod:: time
+        .. automethod:: get
+        .. automethod:: columns
+        .. automethod:: track
+        .. automethod:: close
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_header(self):
+        buf = self._mmap
+        try:
+            (magic, version, dtype, byteorder, num_channels, rate,
+             count) = _header.unpack_from(buf)
+        except struct.error:
+            raise ValueError('not a Gillcup recording')
+        if magic != _magic:
+            raise ValueError('not a Gillcup recording')
+        if version != _version:
+            raise ValueError('unsupported recording version')
+        if byteorder != _byteorder_marks[sys.byteorder]:
+            raise ValueError('recording has different byte order')
+        self.dtype = dtype.decode('ascii')
+        if self.dtype not in ('d', 'f'):
+            raise ValueError('unsupported data type')
+        self.rate = rate or None
+        offset = _header.size
+        names = []
+        sizes = []
+        for i in range(num_channels):
+            try:
+                size, name_length = _channel_header.unpack_from(buf, offset)
+            except struct.error:
+                raise ValueError('recording is truncated')
+            offset += _channel_header.size
+            if offset + name_length > len(buf):
+                raise ValueError('recording is truncated')
+            names.append(bytes(buf[offset:offset + name_length]).decode(
+                'utf-8'))
+            offset += name_length
+            sizes.append(size)
+        offset += -offset % 8
+        self.names = tuple(names)
+        self.sizes = tuple(sizes)
+        self.width = 1 + sum(sizes)
+        self._count = count
+        end = offset + count * self.width * array.array(self.dtype).itemsize
+        if end > len(buf):
+            raise ValueError('recording is truncated')
+        self.data = memoryview(buf)[offset:end].cast(self.dtype)
+        self._columns = {}
+        column = 1
+        for name, size in zip(self.names, self.sizes):
+            self._columns[name] = column, column + size
+            column += size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        start = index * self.width
+        return self.data[start:start + self.width]
+
+    def time(self, index):
+        """Return the clock time of the given row"""
+        return self[index][0]
+
+    def columns(self, name):
+        """Return the range of columns with values of the named expression
+
+        The first column has the time, so the first expression's values
+        start at column 1.
+        """
+        try:
+            start, stop = self._columns[name]
+        except KeyError:
+            raise KeyError('no expression named {!r}'.format(name))
+        return range(start, stop)
+
+    def get(self, name, index):
+        """Return the value of the named expression in the given row
+
+        The value is a tuple, as with :meth:`Expression.get`.
+        """
+        columns = self.columns(name)
+        return tuple(self[index][columns.start:columns.stop])
+
+    def track(self, clock, name, *, delay=0):
+        """Return a :class:`~gillcup.expressions.Track` that replays an
+        expression's values
+
+        The track plays on *clock*, starting after *delay*.
+        Only recordings made at a fixed rate can be replayed this way.
+        The values are copied into the track.
+        """
+        if self.rate is None or not self._count:
+            raise ValueError('only non-empty recordings made at a fixed '
+                             'rate can be replayed')
+        columns = self.columns(name)
+        samples = [tuple(self[i][columns.start:columns.stop])
+                   for i in range(self._count)]
+        duration = (self._count - 1) / self.rate
+        return gillcup.expressions.Track(clock, samples, duration,
+                                         delay=delay)
+
+    def close(self):
+        """Release the memory-mapped file"""
+        if self._mmap is not None:
+            self.data.release()
+            self._mmap.close()
+            self._mmap = None
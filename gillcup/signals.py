@@ -52,6 +52,11 @@ keyword argument added.
 This argument is added to the signature of class-bound signals,
 and cannot be used for other purposes.
 
+For speed, signals do not check the arguments they are called with
+against their signature.
+Set :attr:`Signal.check_signatures` to true to enable this check
+while debugging.
+
 .. rubric:: footnotes
 
 .. [#weakmeth] Technically, the function wrapped by the method
@@ -74,6 +79,12 @@ from gillcup.backports.weakref import finalize, WeakMethod
 
 def _hashable_identity(obj):
     # Adapted from the Blinker project
+    try:
+        # Transient objects (such as expressions' replacement_available
+        # signals) can provide a stable identity
+        return obj._gillcup_hashable_identity
+    except AttributeError:
+        pass
     if inspect.ismethod(obj):
         return (id(obj.__func__), id(obj.__self__))
     else:
@@ -119,6 +130,12 @@ def signal(func):
 class Signal:
     """A broadcasting device.
 
+    .. attribute:: check_signatures
+
+        If true, arguments passed to signals are checked against
+        the signal's signature, and :exc:`TypeError` is raised on mismatch.
+        This is a class attribute; it is false by default.
+
     Methods:
 
         .. automethod:: connect
@@ -127,12 +144,14 @@ class Signal:
         .. autospecialmethod:: __bool__
     """
     _is_gillcup_signal = True
+    check_signatures = False
 
     @fix_public_signature
     def __init__(self, name=None, *, doc=None, signature=None,
                  _owner=None):
         self._weak_listeners = {}
         self._strong_listeners = {}
+        self._dispatch = None
         self._instance_signals = {}
         self._waiting_connections = []
 
@@ -239,6 +258,8 @@ class Signal:
 
         def discard_the_weak(ref=None):
             self._weak_listeners.pop(key, None)
+            self._dispatch = None
+        self._dispatch = None
         if weak:
             if key in self._strong_listeners:
                 return
@@ -260,18 +281,29 @@ class Signal:
         """
         key = (_hashable_identity(listener), arg_adapter)
         if self._weak_listeners.pop(key, None) is not None:
+            self._dispatch = None
             return
         if self._strong_listeners.pop(key, None) is not None:
+            self._dispatch = None
             return
         raise LookupError(listener)
 
     def __call__(self, *args, **kwargs):
         """Call all of this signal's listeners with the given arguments
         """
-        self.signature.bind(*args, **kwargs)
+        if self.check_signatures:
+            self.signature.bind(*args, **kwargs)
+        dispatch = self._dispatch
+        if dispatch is None:
+            dispatch = self._dispatch = self._make_dispatch()
+        if not dispatch:
+            return []
         result = []
-        for (_h, arg_adapter), listener in self._listeners:
-            is_signal = getattr(listener, '_is_gillcup_signal', None)
+        for listener, is_weak, arg_adapter, is_signal in dispatch:
+            if is_weak:
+                listener = listener()
+                if listener is None:
+                    continue
             if is_signal and not listener:
                 # TODO: Disconnect & go back to _waiting_connections?
                 continue
@@ -301,12 +333,20 @@ class Signal:
             self._waiting_connections.append((signal, weak, arg_adapter))
             return True
 
-    @property
-    def _listeners(self):
-        weaklings = list(self._weak_listeners.items())
-        stronglings = list(self._strong_listeners.items())
-        for key, listener in weaklings:
-            listener = listener()
-            if listener:
-                yield key, listener
-        yield from stronglings
+    def _make_dispatch(self):
+        """Return a tuple of listeners for :meth:`__call__`
+
+        Each entry is a ``(listener, is_weak, arg_adapter, is_signal)`` tuple;
+        for weak listeners, the first item is the weak reference.
+        The result is cached until a listener is added or removed.
+        """
+        dispatch = []
+        for (_h, arg_adapter), ref in self._weak_listeners.items():
+            listener = ref()
+            if listener is not None:
+                is_signal = getattr(listener, '_is_gillcup_signal', False)
+                dispatch.append((ref, True, arg_adapter, is_signal))
+        for (_h, arg_adapter), listener in self._strong_listeners.items():
+            is_signal = getattr(listener, '_is_gillcup_signal', False)
+            dispatch.append((listener, False, arg_adapter, is_signal))
+        return tuple(dispatch)
@@ -0,0 +1,324 @@
+"""Saving and restoring the state of clocks and expressions
+
+A long-running simulation can be checkpointed with :func:`dumps`,
+which turns clocks, expressions, and other objects into bytes,
+and restored with :func:`loads`:
+
+    >>> from gillcup.clocks import Clock
+    >>> from gillcup.expressions import Value, Progress
+    >>> clock = Clock()
+    >>> exp = Value(10) * Progress(clock, 4)
+    >>> clock.advance_sync(1)
+    >>> data = dumps([clock, exp])
+
+    >>> new_clock, new_exp = loads(data)
+    >>> new_exp
+    <2.5>
+    >>> new_clock.advance_sync(1)
+    >>> new_exp
+    <5.0>
+
+The snapshot is a :mod:`pickle`, so any picklable objects can be included
+along with clocks and expressions.
+Like all pickles, it must not be loaded from an untrusted source.
+
+What is saved:
+
+* A clock's time, its speed, and its :class:`~gillcup.clocks.Subclock`\\ s.
+* The time-related state of expressions like
+  :class:`~gillcup.expressions.Progress`,
+  :class:`~gillcup.expressions.Track` and
+  :class:`~gillcup.animations.Keyframes`.
+  Their end-of-animation actions are scheduled again on restore.
+* The contents of :class:`~gillcup.expressions.Value` objects.
+* The structure of expression graphs.
+  Expressions are saved in their simplified form
+  (see :func:`~gillcup.expressions.simplify`).
+  Shared expressions stay shared.
+* Actions scheduled on the clocks, if their callbacks are registered with
+  :func:`serializable`, and they can be pickled along with their arguments.
+  Other scheduled actions are dropped.
+  This includes the futures of :meth:`~gillcup.clocks.Clock.sleep` and
+  :attr:`~gillcup.expressions.Progress.done`;
+  coroutines waiting on them can not be saved.
+
+Restored actions are scheduled after the expressions' own
+end-of-animation actions; actions scheduled for the same time might
+not run in their original order.
+
+Custom expression classes are pickled using the usual pickle rules
+(e.g. their ``__reduce__`` method).
+Links between animated properties (:func:`~gillcup.properties.link`)
+are saved as the expression they currently follow.
+Values of animated properties are not stored on the objects they
+belong to, so they are not saved with them.
+
+
+Reference
+---------
+
+.. autofunction:: dumps
+.. autofunction:: loads
+.. autofunction:: serializable
+
+"""
+
+import io
+import pickle
+import copyreg
+
+from gillcup import expressions
+from gillcup import animations
+from gillcup import properties
+from gillcup import easings
+from gillcup.clocks import Clock, Subclock
+
+# Functions registered by serializable()
+_serializable_callbacks = set()
+
+
+def serializable(callback):
+    """Mark a function as safe to save in a snapshot
+
+    Actions scheduled on a clock are only saved if their callback
+    was registered with this function.
+    For methods, register the function (usually by using this as a
+    decorator in the class body); any bound method of it will be saved.
+
+    Returns *callback* unchanged, so it can be used as a decorator.
+
+        >>> from gillcup.expressions import Value
+        >>> serializable(Value.set)  # doctest: +ELLIPSIS
+        <function Value.set at ...>
+        >>> clock = Clock()
+        >>> value = Value(0)
+        >>> clock.schedule(2, value.set, 3)
+        >>> new_clock, new_value = loads(dumps([clock, value]))
+        >>> new_clock.advance_sync(2)
+        >>> new_value
+        <3.0>
+
+    The callback and its arguments must be picklable.
+    """
+    _serializable_callbacks.add(callback)
+    return callback
+
+
+def dumps(obj):
+    """Return a snapshot of *obj* as bytes
+
+    *obj* can be a clock, an expression, or any picklable object that
+    references them, such as a list or a dict.
+    """
+    file = io.BytesIO()
+    pickler = _Pickler(file)
+    pickler.dump(obj)
+    pickler.dump_clocks()
+    return file.getvalue()
+
+
+def loads(data):
+    """Restore an object from the result of :func:`dumps`"""
+    file = io.BytesIO(data)
+    unpickler = pickle.Unpickler(file)
+    result = unpickler.load()
+    while file.tell() < len(data):
+        for clock, subclocks, events in unpickler.load():
+            clock._subclocks.update(subclocks)
+            for time, category, callback, args in events:
+                clock.schedule(time - clock._time_value, callback, *args,
+                               _category=category)
+    return result
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler that handles clocks and expressions
+
+    After the main object, call :meth:`dump_clocks`, which pickles
+    a list of ``(clock, subclocks, events)`` records for clocks that
+    were encountered (repeatedly, since the records can reference
+    more clocks).
+    The memo is shared, so the records refer to the same clocks.
+    """
+    def __init__(self, file):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._clocks = []
+        self.dispatch_table = dict(copyreg.dispatch_table)
+        for cls, reducer in _reducers.items():
+            self.dispatch_table[cls] = _simplified(reducer)
+        self.dispatch_table[Clock] = self._reduce_clock
+        self.dispatch_table[Subclock] = self._reduce_clock
+
+    def _reduce_clock(self, clock):
+        self._clocks.append(clock)
+        return _restore_clock, (type(clock), clock._time_value, clock.speed,
+                                clock.coalesce_replacements)
+
+    def dump_clocks(self):
+        done = 0
+        while done < len(self._clocks):
+            clocks = self._clocks[done:]
+            done = len(self._clocks)
+            self.dump([(clock, list(clock._subclocks), [
+                (event.time, event.category, event.callback, event.args)
+                for event in sorted(clock.events)
+                if _is_serializable(event.callback)
+            ]) for clock in clocks])
+
+
+def _is_serializable(callback):
+    try:
+        return (getattr(callback, '__func__', callback) in
+                _serializable_callbacks)
+    except TypeError:
+        # unhashable
+        return False
+
+
+def _simplified(reducer):
+    """Wrap a reducer so that replaced expressions are saved as replacements
+    """
+    def reduce_simplified(exp):
+        replacement = exp.replacement
+        if replacement is not exp:
+            return _restore_same, (replacement, )
+        return reducer(exp)
+    return reduce_simplified
+
+
+def _restore_same(obj):
+    return obj
+
+
+def _restore_clock(cls, time, speed, coalesce_replacements):
+    clock = cls.__new__(cls)
+    Clock.__init__(clock)
+    clock._time_value = time
+    if speed != cls.speed:
+        clock.speed = speed
+    if coalesce_replacements != cls.coalesce_replacements:
+        clock.coalesce_replacements = coalesce_replacements
+    return clock
+
+
+# Standard easing functions are saved by name
+_easing_names = {func: name for name, func in easings.standard_easings.items()}
+
+
+def _reduce_reduce(exp):
+    cls = type(exp)
+    operands = list(exp._operands)
+    if cls is expressions.Reduce:
+        return cls, (exp._op, operands)
+    elif cls is expressions._Compare:
+        return cls, (exp._symbol, exp._op, operands)
+    else:
+        return cls, (operands, )
+
+
+def _reduce_map(exp):
+    if type(exp) is not expressions.Map:
+        return type(exp), tuple(exp._operands)
+    easing_name = _easing_names.get(exp._op)
+    if easing_name is not None:
+        return _restore_easing_map, (easing_name, ) + tuple(exp._operands)
+    return expressions.Map, (exp._op, ) + tuple(exp._operands)
+
+
+def _restore_easing_map(easing_name, *operands):
+    return expressions.Map(easings.get(easing_name), *operands)
+
+
+def _reduce_spline(exp):
+    return _restore_spline, (type(exp), exp._size, exp._segments,
+                             exp._arc_length_table, exp._t)
+
+
+def _restore_spline(cls, size, segments, arc_length_table, t):
+    exp = cls.__new__(cls)
+    exp._size = size
+    exp._segments = segments
+    exp._arc_length_table = arc_length_table
+    exp._set_t(t)
+    return exp
+
+
+def _restore_time(clock):
+    return clock.time
+
+
+def _reduce_progress(exp):
+    return _restore_progress, (exp._clock, exp._start, exp._duration,
+                               exp._clamp)
+
+
+def _restore_progress(clock, start, duration, clamp):
+    exp = expressions.Progress(clock, duration,
+                               delay=start - clock._time_value, clamp=clamp)
+    exp._start = start
+    return exp
+
+
+def _reduce_track(exp):
+    return _restore_track, (exp._clock, exp.to_bytes(), exp._start)
+
+
+def _restore_track(clock, data, start):
+    exp = expressions.Track.from_bytes(clock, data,
+                                       delay=start - clock._time_value)
+    exp._start = start
+    return exp
+
+
+def _reduce_keyframes(exp):
+    keyframes = [
+        (time, value, _easing_names.get(easing, easing))
+        for time, value, easing in zip(exp._times, exp._values, exp._easings)]
+    return _restore_keyframes, (exp._clock, keyframes)
+
+
+def _restore_keyframes(clock, keyframes):
+    now = clock._time_value
+    return animations.Keyframes(clock, [
+        (time - now, value, easing) for time, value, easing in keyframes])
+
+
+def _reduce_linked(exp):
+    return _restore_same, (exp._source.replacement, )
+
+
+def _reduce_replaced(exp):
+    # Only reached for expressions without a replacement
+    raise pickle.PicklingError('cannot save {!r}'.format(exp))
+
+
+_reducers = {
+    expressions.Constant: lambda exp: (expressions.Constant, exp._value),
+    expressions.Value: lambda exp: (expressions.Value, exp._value),
+    expressions.Slice: lambda exp: (
+        expressions.Slice, (exp._source, slice(exp._start, exp._stop))),
+    expressions.Concat: lambda exp: (
+        expressions.Concat, tuple(exp._leaves())),
+    expressions.Box: lambda exp: (expressions.Box, (exp._name, exp.value)),
+    expressions.Interpolation: lambda exp: (
+        expressions.Interpolation, (exp._start, exp._end, exp._t)),
+    expressions.Time: lambda exp: (_restore_time, (exp._clock, )),
+    expressions.Progress: _reduce_progress,
+    expressions.Track: _reduce_track,
+    expressions.CatmullRom: _reduce_spline,
+    expressions.Bezier: _reduce_spline,
+    expressions.Map: _reduce_map,
+    expressions.Neg: _reduce_map,
+    animations.Keyframes: _reduce_keyframes,
+    animations._Anim: _reduce_replaced,
+    properties._PropertyValue: _reduce_replaced,
+    properties._ComponentPropertyValue: _reduce_replaced,
+    properties._Linked: _reduce_linked,
+    properties._LinkedComponent: _reduce_linked,
+}
+for _cls in (expressions.Reduce, expressions.Sum, expressions.Product,
+             expressions.Difference, expressions.Quotient,
+             expressions.FloorQuotient, expressions.Modulus,
+             expressions.Power, expressions._Compare):
+    _reducers[_cls] = _reduce_reduce
+del _cls
@@ -1,8 +1,13 @@
+import gc
 import math
+import weakref
 
 import pytest
 
-from gillcup.animations import anim
+from gillcup.animations import anim, Keyframes
+from gillcup.clocks import Clock
+from gillcup.expressions import Constant, Value, simplify, compact, dump
+from gillcup.expressions import sample, next_change, bounds
 
 τ = math.pi * 2
 ε = 0.00000001
@@ -163,3 +168,144 @@ def test_done(clock):
     assert lst == ['done']
     clock.advance_sync(1)
     assert lst == ['done']
+
+
+def test_shared_progress(clock):
+    animations = [anim(i, i + 10, 2, clock, delay=1) for i in range(100)]
+    assert len(clock.events) == 1
+    clock.advance_sync(2)
+    assert [float(a) for a in animations] == [i + 5 for i in range(100)]
+    clock.advance_sync(1)
+    assert all(a.done.done() for a in animations)
+    assert [float(a) for a in animations] == [i + 10 for i in range(100)]
+
+
+def test_shared_progress_timing(clock):
+    first = anim(0, 10, 2, clock)
+    same = anim(0, 10, 2, clock, easing='quad', strength=0.5)
+    other_delay = anim(0, 10, 2, clock, delay=1)
+    reversed_ = anim(0, 10, -2, clock, delay=2)
+    infinite = anim(0, 10, 2, clock, infinite=True)
+    assert len(clock.events) == 3
+    clock.advance_sync(1)
+    later = anim(0, 10, 2, clock, delay=-1)
+    assert len(clock.events) == 4
+    assert later == first == 5
+    assert same == 1.25
+    assert reversed_ == 5
+    assert infinite == 5
+    clock.advance_sync(1.5)
+    assert infinite == 12.5
+    assert first.done.done() and later.done.done()
+    assert not other_delay.done.done()
+
+
+def test_shared_progress_cancel(clock):
+    animations = [anim(0, 10, 2, clock) for i in range(3)]
+    assert animations[0].done.cancel()
+    clock.advance_sync(2)
+    assert animations[0].done.cancelled()
+    assert [a.done.done() for a in animations] == [True, True, True]
+    assert [a.done.result() for a in animations[1:]] == [True, True]
+
+
+def test_shared_progress_clock_collected():
+    clock = Clock()
+    anim(0, 1, 1, clock)
+    clock_ref = weakref.ref(clock)
+    del clock
+    gc.collect()
+    assert clock_ref() is None
+
+
+def test_anim_retarget(clock):
+    animation = anim(0, 10, 2, clock)
+    clock.advance_sync(1)
+    retargeted = anim(animation, 20, 2, clock, retarget=True)
+    assert retargeted == 5
+    clock.advance_sync(1)
+    assert retargeted == 12.5
+    clock.advance_sync(1)
+    assert retargeted == 20
+
+
+def test_anim_retarget_depth(clock):
+    animation = anim(0, 10, 2, clock)
+    for i in range(100):
+        animation = anim(animation, i, 2, clock, retarget=True)
+        clock.advance_sync(0.01)
+    assert isinstance(simplify(animation)._start, Constant)
+
+
+def test_compact_finished_anim(clock):
+    animation = anim(Value(1), 3, 2, clock, easing='quad')
+    interpolation = weakref.ref(simplify(animation))
+    clock.advance_sync(3)
+    assert compact(animation) == 3
+    gc.collect()
+    assert interpolation() is None
+    assert len(dump(animation).splitlines()) == 2
+    assert animation == 3
+
+
+def test_keyframes(clock):
+    exp = Keyframes(clock, [(1, (0, 10)), (3, (4, 0), 'quad.out'),
+                            (2, 2), (3, (2, 2)), (4, (0, 0))])
+    assert len(exp) == 2
+    assert sample(exp, [0, 1, 1.5, 2, 2.5, 3, 3.5, 4, 5]) == (
+        (0, 10), (0, 10), (1, 6), (2, 2), (3.5, 0.5), (2, 2), (1, 1),
+        (0, 0), (0, 0))
+    assert len(clock.events) == 1
+    clock.advance_sync(2.5)
+    assert exp.get() == (3.5, 0.5)
+    assert not exp.done.done()
+    clock.advance_sync(1.5)
+    assert exp.done.done()
+    assert isinstance(simplify(exp), Constant)
+    assert simplify(exp).get() == (0, 0)
+
+
+def test_keyframes_next_change(clock):
+    exp = Keyframes(clock, [(1, 0), (2, 0), (3, 5), (4, 5), (4, 6), (5, 6)])
+    changes = []
+    for i in range(7):
+        changes.append(next_change(exp))
+        clock.advance_sync(0.5)
+    assert changes == [2, 2, 2, 2, 2, 2.5, 4]
+    clock.advance_sync(0.5)
+    assert next_change(exp) == math.inf
+
+
+def test_keyframes_bounds(clock):
+    exp = Keyframes(clock, [(0, 0), (1, 10), (2, -3, 'cubic'), (3, 4)])
+    assert bounds(exp, 0.5, 2.5) == ((-3, 10), )
+    assert bounds(exp, 0.5, 1) == ((5, 10), )
+    assert bounds(exp, 1.5, 1.5) == ((8.375, 8.375), )
+    assert bounds(exp, 2.5, 5) == ((0.5, 4), )
+    exp = Keyframes(clock, [(0, 0), (1, 10), (2, -3, 'back'), (3, 4)])
+    assert bounds(exp, 0.5, 1) == ((5, 10), )
+    assert bounds(exp, 0.5, 2.5) == ((-math.inf, math.inf), )
+
+
+def test_anim_bounds(clock):
+    exp = anim(0, 10, 4, clock, easing='quad.out')
+    assert bounds(exp, 1, 2) == ((4.375, 7.5), )
+    exp = anim(0, 10, 4, clock, easing='elastic')
+    assert bounds(exp, 1, 2) == ((-math.inf, math.inf), )
+
+
+def test_keyframes_past(clock):
+    exp = Keyframes(clock, [(-2, 0), (-1, 1)])
+    assert exp.done.done()
+    assert simplify(exp).get() == (1, )
+
+
+def test_keyframes_errors(clock):
+    with pytest.raises(ValueError):
+        Keyframes(clock, [])
+    with pytest.raises(ValueError):
+        Keyframes(clock, [(0, (1, 2)), (1, (1, 2, 3))])
+    with pytest.raises(ValueError):
+        Keyframes(clock, [(0, 0, 'quad', 'extra')])
+    with pytest.raises(KeyError):
+        Keyframes(clock, [(0, 0), (1, 1, 'no such easing')])
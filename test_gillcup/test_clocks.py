@@ -5,6 +5,7 @@ import asyncio
 import pytest
 
 from gillcup.clocks import Subclock, coroutine
+from gillcup.expressions import Progress, Sum, Constant, simplify
 
 
 def dummy_function():
@@ -150,6 +151,47 @@ def test_end_category(clock):
     assert lst == ['done']
 
 
+def test_schedule_many(clock):
+    lst = []
+    clock.schedule(1, append_const(lst, 'a'))
+    clock.schedule_many([
+        (2, lst.append, ['b']),
+        (1, lst.append, ['c']),
+        (0, lst.append, ['d']),
+        (1, lst.append, ('e', )),
+    ])
+    clock.schedule(1, append_const(lst, 'f'))
+    clock.advance_sync(0)
+    assert lst == ['d']
+    clock.advance_sync(1)
+    assert lst == ['d', 'a', 'c', 'e', 'f']
+    clock.advance_sync(1)
+    assert lst == ['d', 'a', 'c', 'e', 'f', 'b']
+
+
+@pytest.mark.parametrize('num_existing', [0, 1, 10, 1000])
+@pytest.mark.parametrize('num_new', [0, 1, 10, 1000])
+def test_schedule_many_order(clock, num_existing, num_new):
+    lst = []
+    expected = []
+    for i in range(num_existing):
+        clock.schedule(i % 7, lst.append, ('old', i))
+        expected.append((i % 7, 0, i))
+    clock.schedule_many(((i % 5, lst.append, [('new', i)])
+                         for i in range(num_new)))
+    expected.extend((i % 5, 1, i) for i in range(num_new))
+    clock.advance_sync(None)
+    assert lst == [('old', i) if which == 0 else ('new', i)
+                   for t, which, i in sorted(expected)]
+
+
+def test_schedule_many_negative(clock):
+    lst = []
+    with pytest.raises(ValueError):
+        clock.schedule_many([(1, lst.append, [1]), (-1, lst.append, [2])])
+    assert not clock.events
+
+
 def test_integer_times(clock):
     """Test that we keep to int arithmetic as much as we can
 
@@ -237,6 +279,40 @@ def test_subclock_speed_arg(clock):
     assert subclock.time == 2
 
 
+def test_ticked(clock):
+    subclock = Subclock(clock, speed=2)
+    lst = []
+    clock.ticked.connect(lambda: lst.append(('clock', float(clock.time))))
+    subclock.ticked.connect(lambda: lst.append(('sub', float(subclock.time))))
+    clock.schedule(0.5, lst.append, 'event')
+    clock.schedule(0.5, lst.append, 'event')
+    clock.advance_sync(0)
+    assert lst == []
+    clock.advance_sync(1)
+    assert lst == ['event', 'event', ('clock', 0.5), ('sub', 1),
+                   ('clock', 1), ('sub', 2)]
+    del lst[:]
+    for frame in clock.frames(4, [clock.time], end=1.5):
+        pass
+    assert lst == [('clock', 1.25), ('sub', 2.5), ('clock', 1.5), ('sub', 3)]
+
+
+def test_ticked_schedule(clock):
+    """Test actions scheduled by tick listeners are run at the right time"""
+    lst = []
+
+    def tick():
+        lst.append(float(clock.time))
+        if clock.time < 2:
+            clock.schedule(0, lst.append, 'now')
+            clock.schedule(1, lst.append, 'later')
+
+    clock.ticked.connect(tick)
+    clock.schedule(1, lst.append, 'start')
+    clock.advance_sync(None)
+    assert lst == ['start', 1, 'now', 'later', 2]
+
+
 @coroutine
 def appending_task(lst):
     lst.append(0)
@@ -336,3 +412,250 @@ def test_delaying_task(clock):
     clock.task(delaying_task(lst))
     clock.advance_sync(1)
     assert lst == [0, 'X', 1]
+
+
+async def native_task(clock, lst):
+    for i in range(3):
+        lst.append(i)
+        await clock.sleep(1)
+    lst.append(3)
+    return 'ok'
+
+
+def test_native_task(clock):
+    lst = []
+    future = clock.task(native_task(clock, lst))
+    assert lst == []
+    clock.advance_sync(0)
+    assert lst == [0]
+    clock.advance_sync(1.5)
+    assert lst == [0, 1]
+    assert not future.done()
+    clock.advance_sync(1.5)
+    assert lst == [0, 1, 2, 3]
+    assert future.result() == 'ok'
+
+
+def test_native_task_awaits_tasks(clock):
+    lst = []
+
+    async def outer():
+        first = clock.task(native_task(clock, lst))
+        second = clock.task(appending_task(lst))
+        return (await first), (await second), float(clock.time)
+
+    future = clock.task(outer())
+    clock.advance_sync(None)
+    assert future.result() == ('ok', 'ok', 3)
+    assert lst == [0, 0, 1, 1, 2, 2, 3, 3]
+
+
+def test_native_task_error(clock):
+    async def failing():
+        await clock.sleep(1)
+        raise RuntimeError('bad')
+
+    async def catching():
+        try:
+            await clock.task(failing())
+        except RuntimeError as e:
+            return str(e)
+
+    future = clock.task(catching())
+    clock.advance_sync(1)
+    assert future.result() == 'bad'
+
+
+def test_native_task_asyncio_future(clock):
+    aio_future = asyncio.Future()
+
+    async def waiting():
+        return await aio_future
+
+    future = clock.task(waiting())
+    clock.schedule(1, aio_future.set_result, 'ok')
+    clock.advance_sync(1)
+    assert future.result() == 'ok'
+    assert clock.time == 1
+
+
+def test_asyncio_task_awaits_clock(clock):
+    async def waiting():
+        await clock.sleep(1)
+        return float(clock.time)
+
+    task = asyncio.ensure_future(waiting())
+    clock.advance_sync(5)
+    assert task.result() == 1
+
+
+def test_task_cancel(clock):
+    lst = []
+
+    async def cancellable():
+        try:
+            await clock.sleep(1)
+        except asyncio.CancelledError:
+            lst.append('cancelled')
+            raise
+        lst.append('not cancelled')
+
+    future = clock.task(cancellable())
+    clock.advance_sync(0.5)
+    assert future.cancel()
+    clock.advance_sync(1)
+    assert lst == ['cancelled']
+    assert future.cancelled()
+
+
+def test_task_bad_yield(clock):
+    @coroutine
+    def bad():
+        try:
+            yield 'bad'
+        except TypeError:
+            return 'caught'
+
+    future = clock.task(bad())
+    clock.advance_sync(0)
+    assert future.result() == 'caught'
+
+
+def test_coalesce_replacements(clock):
+    clock.coalesce_replacements = True
+    progresses = [Progress(clock, 1) for i in range(10)]
+    replacements = []
+    total = Sum(progresses)
+
+    def record():
+        replacements.append(float(clock.time))
+
+    for progress in progresses:
+        progress.replacement_available.connect(record)
+    clock.advance_sync(0.5)
+    assert total == 5
+    clock.advance_sync(1)
+    assert replacements == [1]
+    assert isinstance(simplify(total), Constant)
+    assert total == 10
+    assert not clock._coalescing
+
+
+def test_coalesce_replacements_error(clock):
+    def fail():
+        raise ZeroDivisionError()
+
+    clock.coalesce_replacements = True
+    progress = Progress(clock, 1)
+    clock.schedule(1, fail)
+    with pytest.raises(ZeroDivisionError):
+        clock.advance_sync(2)
+    assert not clock._coalescing
+    assert isinstance(simplify(progress), Constant)
+
+
+def test_coalesce_replacements_cancel(clock):
+    clock.coalesce_replacements = True
+    progress = Progress(clock, 1)
+    other_clock = type(clock)()
+    other_progress = Progress(other_clock, 1)
+    replacements = []
+    other_progress.replacement_available.connect(
+        lambda: replacements.append('other'))
+
+    advance = clock.advance(1)
+    advance.send(None)  # yields before moving time forward
+    advance.send(None)  # runs the Progress's end, yields before the target
+    assert not clock._coalescing
+    assert isinstance(simplify(progress), Constant)
+    advance.close()
+    assert not clock.advancing
+
+    other_clock.advance_sync(1)
+    assert replacements == ['other']
+    assert isinstance(simplify(other_progress), Constant)
+
+
+def test_frames(clock):
+    exps = [Progress(clock, 2), clock.time, Constant(1, 2), clock.time * 2]
+    frames = list(clock.frames(2, exps, copy=True))
+    assert [list(f) for f in frames] == [
+        [0, 0, 1, 2, 0],
+        [0.25, 0.5, 1, 2, 1],
+        [0.5, 1, 1, 2, 2],
+        [0.75, 1.5, 1, 2, 3],
+        [1, 2, 1, 2, 4],
+    ]
+    assert clock.time == 2
+
+
+def test_frames_reuse_buffer(clock):
+    buffers = []
+    for buffer in clock.frames(10, [clock.time], end=0.5):
+        buffers.append(buffer)
+        assert list(buffer) == [float(clock.time)]
+    assert len(buffers) == 6
+    assert all(b is buffers[0] for b in buffers)
+    assert clock.time == 0.5
+
+
+@pytest.mark.parametrize(['fps', 'start', 'end', 'num_frames'], [
+    (10, None, 0.3, 4),
+    (10, 0.1, 0.7, 7),
+    (3, None, 1, 4),
+    (60, 0.7, 1.7, 61),
+])
+def test_frames_inexact_step(clock, fps, start, end, num_frames):
+    frames = clock.frames(fps, [clock.time], start=start, end=end)
+    times = [buffer[0] for buffer in frames]
+    assert len(times) == num_frames
+    assert times[-1] == end
+    assert clock.time == end
+
+
+def test_frames_start_end(clock):
+    times = [list(b) for b in clock.frames(4, [clock.time], start=1, end=2)]
+    assert times == [[1], [1.25], [1.5], [1.75], [2]]
+    with pytest.raises(ValueError):
+        next(clock.frames(4, [clock.time], start=0))
+
+
+def test_frames_events(clock):
+    lst = []
+    clock.schedule(0.5, append_time(lst, clock))
+    clock.schedule(0.6, append_time(lst, clock))
+    clock.schedule(1, append_time(lst, clock))
+    frames = [list(b) for b in clock.frames(4, [clock.time])]
+    assert lst == [0.5, 0.6, 1]
+    assert frames == [[0], [0.25], [0.5], [0.75], [1]]
+
+
+def test_frames_task(clock):
+    lst = []
+    clock.task(appending_task(lst))
+    values = [(b[0], list(lst)) for b in clock.frames(2, [clock.time], end=3)]
+    assert values == [
+        (0, []), (0.5, [0]), (1, [0, 1]), (1.5, [0, 1]), (2, [0, 1, 2]),
+        (2.5, [0, 1, 2]), (3, [0, 1, 2, 3])]
+
+
+def test_frames_no_loop_without_events(clock, monkeypatch):
+    frames = clock.frames(10, [clock.time], end=100)
+    next(frames)
+    next(frames)
+
+    def fail(delay):
+        raise AssertionError('event loop used')
+
+    monkeypatch.setattr(clock, 'advance_sync', fail)
+    assert sum(1 for f in frames) == 999
+    assert clock.time == 100
+
+
+def test_frames_subclock(clock):
+    subclock = Subclock(clock, speed=2)
+    lst = []
+    subclock.schedule(1, append_time(lst, clock))
+    frames = [list(b) for b in clock.frames(4, [clock.time, subclock.time])]
+    assert lst == [0.5]
+    assert frames == [[0, 0], [0.25, 0.5], [0.5, 1]]
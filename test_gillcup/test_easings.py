@@ -1,9 +1,12 @@
 import collections
 import inspect
+import math
 
 import pytest
 
 from gillcup import easings
+from gillcup.clocks import Clock
+from gillcup.expressions import Progress, Map, bounds
 
 ε = 0.00000001
 
@@ -63,6 +66,50 @@ def test_combo_midpoints(combo_easing):
     assert abs(combo_easing(0.5) - 0.5) < ε
 
 
+def test_monotonic(any_easing):
+    if any_easing.monotonic:
+        values = [any_easing(i / 100) for i in range(101)]
+        assert all(a <= b + ε for a, b in zip(values, values[1:]))
+
+
+def test_monotonic_flags():
+    monotonic = {n for n in std_easing_names
+                 if easings.standard_easings[n].monotonic}
+    assert monotonic == {'linear', 'quad', 'cubic', 'quart', 'quint',
+                         'power', 'sine', 'expo', 'circ'}
+    assert easings.get('quad.in_out').monotonic
+    assert easings.power.p(3).out.monotonic
+    assert not easings.get('back.out').monotonic
+
+    @easings.easing(monotonic=True)
+    def root(t):
+        return t ** 0.5
+
+    assert root.monotonic
+    assert root.out_in.monotonic
+
+
+def test_monotonic_parameters():
+    assert easings.power.monotonic
+    assert easings.power.p(0.5).in_out.monotonic
+
+    @easings.easing(monotonic=lambda amount: abs(amount) <= 1 / (2 * math.pi))
+    def wobble(t, amount=0):
+        return t + amount * math.sin(t * (2 * math.pi))
+
+    assert wobble.monotonic
+    assert wobble.p(0.1).monotonic
+    assert not wobble.p(0.5).monotonic
+    assert not wobble.p(amount=0.5).out.monotonic
+    assert wobble.p(0.5).p(amount=-0.1).monotonic
+
+    clock = Clock()
+    progress = Progress(clock, 1)
+    assert bounds(Map(wobble.p(0.1), progress), 0, 1) == ((0, 1), )
+    low, high = bounds(Map(wobble.p(0.5), progress), 0, 1)[0]
+    assert low < -0.1 and high > 1.1
+
+
 def test_self_is_in(easing):
     assert easing is easing.in_
 
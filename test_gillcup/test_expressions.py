@@ -1,15 +1,21 @@
+import gc
 import sys
 import itertools
 import inspect
 import math
 import contextlib
+import tracemalloc
+import weakref
 
 import pytest
 
 from gillcup.expressions import Constant, Value, Concat, Interpolation, Slice
 from gillcup.expressions import Sum, Difference, Product, Quotient, Neg, Box
-from gillcup.expressions import Map, Progress, dump, simplify
+from gillcup.expressions import Map, Progress, Expression, dump, simplify
+from gillcup.signals import Signal
+from gillcup.clocks import Clock, Subclock
 from gillcup import expressions
+from gillcup import easings
 
 
 try:
@@ -879,3 +885,893 @@ def test_neg(check_dump):
         Neg <-1.0, -2.0, 3.0>:
           Value <1.0, 2.0, -3.0>
     """)
+
+
+def test_replacement_signal_connect_disconnect():
+    exp = Value(1)
+    flag = Flag()
+    exp.replacement_available.connect(flag.set)
+    assert exp.replacement_available
+    exp.replacement_available.disconnect(flag.set)
+    assert not exp.replacement_available
+    with pytest.raises(LookupError):
+        exp.replacement_available.disconnect(flag.set)
+    exp.fix()
+    assert not flag
+
+
+def test_replacement_signal_weak_listener():
+    exp = Value(1)
+    flag = Flag()
+    exp.replacement_available.connect(flag.set)
+    del flag
+    gc.collect()
+    exp.fix()
+    assert not exp._replacement_listeners
+
+
+def test_replacement_signal_class_listener():
+    senders = []
+
+    def listener(sender):
+        senders.append(sender)
+
+    Value.replacement_available.connect(listener)
+    try:
+        exp = Value(1)
+        exp.fix()
+    finally:
+        Value.replacement_available.disconnect(listener)
+    assert senders == [exp]
+
+
+def test_replacement_signal_chaining():
+    exp = Value(1)
+    sig = Signal()
+    exp.replacement_available.connect(sig)
+    flag = Flag()
+    sig.connect(flag.set)
+    exp.fix()
+    assert flag
+
+
+def test_replacement_listener_memory():
+    num_nodes = 1000
+    values = [Value(1) for i in range(num_nodes)]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        nodes = [Neg(v) for v in values]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(nodes) == num_nodes
+    assert (after - before) / num_nodes < 2000
+
+
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    def increment(self):
+        self.count += 1
+
+
+def test_deferred_replacements_coalesce():
+    values = [Value(i) for i in range(10)]
+    counter = Counter()
+    for value in values:
+        value.replacement_available.connect(counter.increment)
+    total = Sum(values)
+    with expressions.deferred_replacements():
+        for value in values:
+            value.fix()
+        assert counter.count == 0
+        assert total == 45
+        assert not isinstance(simplify(total), Constant)
+    assert counter.count == 1
+    assert isinstance(simplify(total), Constant)
+    assert total == 45
+
+
+def test_deferred_replacements_nested():
+    value = Value(1)
+    exp = -value
+    with expressions.deferred_replacements():
+        with expressions.deferred_replacements():
+            value.fix()
+        assert not isinstance(simplify(exp), Constant)
+    assert isinstance(simplify(exp), Constant)
+
+
+def fail():
+    raise ZeroDivisionError()
+
+
+def test_deferred_replacements_listener_error():
+    values = [Value(i) for i in range(3)]
+    counter = Counter()
+    values[0].replacement_available.connect(fail)
+    values[2].replacement_available.connect(counter.increment)
+    total = Sum(values)
+    with pytest.raises(ZeroDivisionError):
+        with expressions.deferred_replacements():
+            for value in values:
+                value.fix()
+    assert counter.count == 1
+    assert isinstance(simplify(total), Constant)
+    assert total == 3
+    assert not expressions._pending_listeners
+    assert not expressions._deferral_depth
+
+
+def test_cascade_listener_error():
+    value = Value(1)
+    exp = -(-value)
+    value.replacement_available.connect(fail)
+    with pytest.raises(ZeroDivisionError):
+        value.fix()
+    assert isinstance(simplify(exp), Constant)
+    assert exp == 1
+    assert expressions._notification_queue is None
+
+
+@pytest.mark.parametrize('deferred', [False, True])
+def test_wide_sum_incremental(monkeypatch, deferred):
+    full_passes = []
+    original = expressions.Reduce._replace_operands
+
+    def counting_replace_operands(self):
+        full_passes.append(self)
+        return original(self)
+
+    monkeypatch.setattr(expressions.Reduce, '_replace_operands',
+                        counting_replace_operands)
+    values = [Value(i) for i in range(200)]
+    total = Sum(values)
+    if deferred:
+        context = expressions.deferred_replacements()
+    else:
+        context = contextlib.ExitStack()
+    with context:
+        for i, value in enumerate(values):
+            value.fix()
+            assert total == sum(range(200))
+            if not deferred:
+                assert len(total.children) == 199 - i + (i > 0)
+    assert isinstance(simplify(total), Constant)
+    assert total == sum(range(200))
+    assert not any(node is total for node in full_passes)
+
+
+@pytest.mark.parametrize('cls', [Sum, Product])
+@pytest.mark.parametrize('order', [
+    (1, 3, 0, 2), (0, 1, 2, 3), (3, 2, 1, 0), (2, 0, 3, 1), (1, 2, 0, 3),
+])
+def test_reduce_keeps_value_when_operands_fixed(cls, order):
+    # Floating-point operations are not associative; simplification
+    # must not change the order in which they are done
+    if cls is Sum:
+        values = [Value(1e16), Value(1), Value(-1e16), Value(1)]
+    else:
+        values = [Value(1e308), Value(10), Value(1e-308), Value(0.1)]
+    exp = cls(values)
+    expected = exp.get()
+    for i in order:
+        values[i].fix()
+        assert exp.get() == expected
+    assert isinstance(simplify(exp), Constant)
+    assert simplify(exp).get() == expected
+
+
+def test_reduce_keeps_value_with_constants():
+    a = Value(1e16)
+    b = Value(1)
+    exp = Sum([a, b, 1])
+    assert exp.get() == (1e16, )
+    b.fix()
+    assert exp.get() == (1e16, )
+    assert simplify(Sum([a, 1, 1])).get() == (1e16, )
+
+
+def test_wide_sum_operand_replaced_by_expression():
+    values = [Value(i) for i in range(5)]
+    other = Value(10)
+    total = Sum(values)
+    values[2].replacement = other
+    assert total == 0 + 1 + 10 + 3 + 4
+    other.set(20)
+    assert total == 0 + 1 + 20 + 3 + 4
+    other.fix()
+    for value in values:
+        value.fix()
+    assert isinstance(simplify(total), Constant)
+    assert total == 0 + 1 + 20 + 3 + 4
+
+
+def test_interning_shares_subexpressions():
+    a = Value(1)
+    b = Value(2)
+    with expressions.interning():
+        first = a * 2 + b
+        second = a * 2 + b
+        different = a * 3 + b
+    assert first is second
+    assert first is not different
+    assert first == 4
+    a.set(3)
+    assert second == 8
+
+
+def test_interning_off_by_default():
+    a = Value(1)
+    assert (a * 2) is not (a * 2)
+
+
+def test_interning_keeps_values_separate():
+    with expressions.interning():
+        a = Value(1)
+        b = Value(1)
+        assert simplify(a) is not simplify(b)
+        assert (a + 1) is not (b + 1)
+
+
+def test_interning_constants():
+    with expressions.interning():
+        assert expressions.coerce(0) is expressions.coerce(0)
+        assert expressions.coerce(0, size=3) is expressions.coerce((0, 0, 0))
+        assert expressions.coerce(1) is expressions.coerce(1.0)
+        assert expressions.coerce(1) is not expressions.coerce(0)
+
+
+def test_interning_signed_zero():
+    negative = expressions.intern(Constant(-0.0, 0.0))
+    positive = expressions.intern(Constant(0.0, 0.0))
+    assert negative is not positive
+    assert [math.copysign(1, v) for v in positive.get()] == [1, 1]
+    assert [math.copysign(1, v) for v in negative.get()] == [-1, 1]
+    assert expressions.intern(Constant(-0.0, 0.0)) is negative
+
+
+def test_intern_weak():
+    a = Value(1)
+    exp = expressions.intern(a + 5)
+    num_entries = len(expressions._intern_table)
+    del exp
+    gc.collect()
+    assert len(expressions._intern_table) < num_entries
+
+
+# Depth of expressions that would overflow the stack if evaluated recursively
+DEEP = sys.getrecursionlimit() * 10
+
+
+def test_deep_map_chain():
+    leaf = Value(1)
+    exp = leaf
+    for i in range(100000):
+        exp = Neg(exp)
+    assert len(exp) == 1
+    assert exp == 1
+    leaf.set(-3)
+    assert exp == -3
+    leaf.fix()
+    assert isinstance(simplify(exp), Constant)
+    assert exp == -3
+
+
+def test_deep_interpolation_chain():
+    leaf = Value(2, 4)
+    exp = leaf
+    for i in range(DEEP):
+        exp = Interpolation(exp, (2, 4), 0.5)
+    assert exp.get() == (2, 4)
+    leaf.fix()
+    assert isinstance(simplify(exp), Constant)
+    assert exp.get() == (2, 4)
+
+
+def test_deep_box_chain():
+    exp = Value(1, 2)
+    for i in range(DEEP):
+        exp = Box('box', exp)
+    assert len(exp) == 2
+    assert exp.get() == (1, 2)
+
+
+def test_deep_difference_chain():
+    leaf = Value(0)
+    exp = leaf
+    for i in range(DEEP):
+        exp = Difference((1, exp))
+    assert exp == DEEP % 2
+    leaf.fix()
+    assert isinstance(simplify(exp), Constant)
+    assert exp == DEEP % 2
+
+
+def test_deep_cycle():
+    box = Box('cycle', Value(1))
+    exp = box
+    for i in range(DEEP):
+        exp = Neg(exp)
+    box.value = exp
+    with pytest.raises(RecursionError):
+        exp.get()
+
+
+@pytest.mark.parametrize('func', [
+    lambda exp: expressions.sample(exp, [0, 1]),
+    lambda exp: expressions.next_change(exp),
+    lambda exp: expressions.bounds(exp, 0, 1),
+])
+@pytest.mark.parametrize('depth', [1, DEEP])
+def test_cycle_graph_walks(func, depth):
+    box = Box('cycle', Value(1))
+    exp = box
+    for i in range(depth):
+        exp = Neg(exp)
+    box.value = exp
+    with pytest.raises(RecursionError):
+        func(exp)
+
+
+@pytest.mark.parametrize('func', [
+    lambda exp: expressions.sample(exp, [0, 1]),
+    lambda exp: expressions.next_change(exp),
+    lambda exp: expressions.bounds(exp, 0, 1),
+])
+def test_shared_nodes_graph_walks(func):
+    # Diamond-shaped graphs are not cycles
+    exp = Value(1)
+    for i in range(100):
+        exp = Interpolation(exp, Neg(exp), 0.5)
+    func(exp)
+
+
+def test_deep_dump():
+    depth = sys.getrecursionlimit() * 2
+    exp = Value(1)
+    for i in range(depth):
+        exp = Neg(exp)
+    lines = dump(exp).splitlines()
+    assert len(lines) == depth + 1
+    assert lines[-1].strip() == 'Value <1.0>'
+
+
+def test_compact_releases_inputs():
+    start = Value(1)
+    end = Value(3)
+    t = Value(0.5)
+    exp = Interpolation(start, end, t)
+    start_ref = weakref.ref(start)
+    del start
+    t.fix(1)
+    assert start_ref() is not None
+    assert expressions.compact(exp) is end
+    gc.collect()
+    assert start_ref() is None
+    assert not end._replacement_listeners
+    assert exp == 3
+    end.set(5)
+    assert exp == 5
+
+
+@pytest.mark.parametrize('make_exp', [
+    lambda v: Sum([v, 2]),
+    lambda v: Difference([2, v]),
+    lambda v: Neg(v),
+    lambda v: Slice(Neg(Concat(v, (2, 3))), slice(1, 2)),
+    lambda v: Concat(v, (2, 3)),
+])
+def test_compact_replaced_nodes(make_exp):
+    value = Value(1)
+    exp = make_exp(value)
+    expected = exp.get()
+    dependents = [exp + 1, exp[0] * 2, Concat(exp, (1, 2))]
+    dependent_values = [d.get() for d in dependents]
+    value.fix()
+    assert isinstance(simplify(exp), Constant)
+    expressions.compact(exp)
+    for dependent in dependents:
+        expressions.compact(dependent)
+    assert list(exp._eval_inputs()) == [simplify(exp)]
+    assert exp.get() == expected
+    assert [d.get() for d in dependents] == dependent_values
+    assert not value._replacement_listeners
+
+
+def test_compact_shortens_replacement_chains():
+    values = [Value(i) for i in range(5)]
+    for value, next_value in zip(values, values[1:]):
+        value.replacement = next_value
+    assert expressions.compact(values[0]) is values[-1]
+    refs = [weakref.ref(v) for v in values[1:-1]]
+    del value, next_value
+    del values[1:-1]
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+    assert values[0] == 4
+
+
+def make_sampled_exp(clock):
+    start = Value(1, 2)
+    progress = Map(lambda t: t * t, Progress(clock, 4, delay=1))
+    exp = Interpolation(start, (5, 6), progress)
+    return Concat(exp, clock.time, Progress(clock, 2, clamp=False) * 3)
+
+
+def test_sample(clock):
+    times = [0, 0.5, 1, 2, 3.5, 5, 7]
+    exp = make_sampled_exp(clock)
+    sampled = expressions.sample(exp, times)
+    assert clock.time == 0
+    assert clock.events
+    assert len(sampled) == len(times)
+
+    other_clock = Clock()
+    other_exp = make_sampled_exp(other_clock)
+    for time, value in zip(times, sampled):
+        other_clock.advance_sync(time - float(other_clock.time))
+        assert value == other_exp.get()
+
+
+def test_sample_constant(clock):
+    exp = Value(1) + Value(2)
+    assert expressions.sample(exp, [0, 1, 2]) == ((3,), (3,), (3,))
+    assert expressions.sample(exp, []) == ()
+
+
+def test_sample_subclock(clock):
+    subclock = Subclock(clock, speed=2)
+    exp = Progress(subclock, 4) + clock.time
+    clock.advance_sync(1)
+    assert expressions.sample(exp, [1, 2, 3, 4], clock=clock) == (
+        (1.5,), (3.0,), (4.0,), (5.0,))
+
+
+def test_sample_bad_clock(clock):
+    other_clock = Clock()
+    exp = Progress(clock, 4) + Progress(other_clock, 4)
+    with pytest.raises(ValueError):
+        expressions.sample(exp, [1, 2])
+
+
+def test_sample_past(clock):
+    exp = Progress(clock, 4)
+    clock.advance_sync(1)
+    with pytest.raises(ValueError):
+        expressions.sample(exp, [0, 2])
+
+
+def test_bake(clock):
+    exp = make_sampled_exp(clock)
+    track = expressions.bake(exp, clock, 0, 7, rate=8)
+    assert len(track) == len(exp)
+    for i in range(14):
+        assert all(a == pytest.approx(b, abs=0.1)
+                   for a, b in zip(track.get(), exp.get()))
+        clock.advance_sync(0.5)
+    assert track.get() == exp.get()
+    assert isinstance(simplify(track), Constant)
+
+
+def test_bake_delayed(clock):
+    exp = Progress(clock, 2, delay=1)
+    track = expressions.bake(exp, clock, 1, 3, rate=1)
+    assert track.get() == (0, )
+    clock.advance_sync(2)
+    assert track.get() == (0.5, )
+    clock.advance_sync(1)
+    assert track.get() == (1, )
+    assert isinstance(simplify(track), Constant)
+
+
+@pytest.mark.parametrize('rate', [0, -1, math.inf, math.nan])
+def test_bake_bad_rate(clock, rate):
+    with pytest.raises(ValueError):
+        expressions.bake(Progress(clock, 1), clock, 0, 1, rate=rate)
+
+
+def test_bake_relative_times(clock):
+    clock.advance_sync(10)
+    exp = Progress(clock, 2)
+    track = expressions.bake(exp, clock, 0, 2, rate=2)
+    assert expressions.sample(track, [10, 11, 12]) == expressions.sample(
+        exp, [10, 11, 12])
+
+
+def test_track_interpolation(clock):
+    track = expressions.Track(clock, [(0, 10), (4, 20), (6, 60)], 2)
+    assert expressions.sample(track, [0, 0.5, 1, 1.25, 2, 3]) == (
+        (0, 10), (2, 15), (4, 20), (4.5, 30), (6, 60), (6, 60))
+
+
+def test_track_bad_samples(clock):
+    with pytest.raises(ValueError):
+        expressions.Track(clock, [], 2)
+    with pytest.raises(ValueError):
+        expressions.Track(clock, [(1, 2), (3, )], 2)
+    with pytest.raises(ValueError):
+        expressions.Track(clock, [1, 2], 0)
+
+
+def test_track_serialization(clock):
+    track = expressions.Track(clock, [(0, 10), (4, 20), (6, 60)], 2)
+    data = track.to_bytes()
+    loaded = expressions.Track.from_bytes(clock, data, delay=1)
+    assert len(loaded) == 2
+    times = [1, 1.5, 2, 2.25, 3, 4]
+    assert expressions.sample(loaded, times) == expressions.sample(
+        track, [t - 1 for t in times])
+    with pytest.raises(ValueError):
+        expressions.Track.from_bytes(clock, b'x' + data[1:])
+    with pytest.raises(ValueError):
+        expressions.Track.from_bytes(clock, data[:-1])
+    for length in (0, 5, 19):
+        with pytest.raises(ValueError):
+            expressions.Track.from_bytes(clock, data[:length])
+
+
+def test_next_change(clock):
+    next_change = expressions.next_change
+    progress = Progress(clock, 2, delay=1)
+    assert next_change(Constant(1, 2)) == math.inf
+    assert next_change(Constant(1) + 2 * Constant(3)) == math.inf
+    assert next_change(progress) == 1
+    assert next_change(progress * 3 + Progress(clock, 1, delay=5)) == 1
+    assert next_change(clock.time) == 0
+    assert next_change(Progress(clock, 2, delay=1, clamp=False)) == 0
+    assert next_change(Value(1)) is None
+    assert next_change(Value(1) * progress) is None
+    assert next_change(Value(1) * clock.time) == 0
+    clock.advance_sync(1.5)
+    assert next_change(progress) == 1.5
+    assert next_change(Value(1) * progress) == 1.5
+    clock.advance_sync(2)
+    assert next_change(progress) == math.inf
+    assert next_change(clock.time) == 3.5
+
+
+def test_next_change_progress_end(clock):
+    progress = Progress(clock, 0, delay=2)
+    assert next_change_at(clock, progress, [0, 1, 2, 3]) == [
+        2, 2, math.inf, math.inf]
+    clock = Clock()
+    progress = Progress(clock, 2, delay=2)
+    assert next_change_at(clock, progress, [3, 0.5, 0.5]) == [3, 3.5, math.inf]
+
+
+def next_change_at(clock, exp, delays):
+    """Return next_change of exp after each of the delays"""
+    result = []
+    for delay in delays:
+        clock.advance_sync(delay)
+        result.append(expressions.next_change(exp))
+    return result
+
+
+def test_next_change_track(clock):
+    track = expressions.Track(clock, [1, 2, 3], 2, delay=1)
+    assert next_change_at(clock, track, [0, 1, 1, 1]) == [1, 1, 2, math.inf]
+    single = expressions.Track(clock, [1], 0)
+    assert expressions.next_change(single) == math.inf
+
+
+def test_next_change_replaced(clock):
+    value = Value(1)
+    exp = value * 2
+    assert expressions.next_change(exp) is None
+    value.fix(3)
+    assert expressions.next_change(exp) == math.inf
+
+
+def test_next_change_subclock(clock):
+    subclock = Subclock(clock, speed=2)
+    stopped = Subclock(clock, speed=0)
+    clock.advance_sync(1)
+    exp = Progress(subclock, 1, delay=4) + clock.time
+    assert expressions.next_change(Progress(subclock, 1, delay=4),
+                                   clock=clock) == 3
+    assert expressions.next_change(exp) == 1
+    exp = Progress(subclock, 1, delay=4) + Progress(stopped, 1, delay=1)
+    assert expressions.next_change(exp, clock=clock) == 3
+    assert expressions.next_change(Progress(stopped, 1, delay=1),
+                                   clock=clock) == math.inf
+    assert expressions.next_change(Progress(subclock, 1, delay=4),
+                                   clock=subclock) == 6
+
+
+def test_next_change_bad_clock(clock):
+    other_clock = Clock()
+    exp = Progress(clock, 4) + Progress(other_clock, 4)
+    with pytest.raises(ValueError):
+        expressions.next_change(exp)
+
+
+def make_bounded_exp(clock):
+    progress = Progress(clock, 4, delay=1)
+    value = Value(2, -3)
+    return Concat(
+        progress * 3 + clock.time,
+        (Constant(3) - progress) / (progress + 1),
+        Interpolation(value, -value, progress * 2 - 0.5),
+        -Map(easings.cubic.in_out, progress),
+        expressions.Track(clock, [1, 5, -2, 8], 3, delay=0.5),
+        Progress(clock, 2, clamp=False)[0],
+    )
+
+
+@pytest.mark.parametrize('window', [(0, 0), (0, 1), (0.5, 1.5), (1, 4),
+                                    (2, 3), (3, 7), (6, 7)])
+def test_bounds(clock, window):
+    exp = make_bounded_exp(clock)
+    start, end = window
+    bnds = expressions.bounds(exp, start, end)
+    assert len(bnds) == len(exp)
+    times = [start + (end - start) * i / 100 for i in range(101)]
+    for value in expressions.sample(exp, times):
+        for v, (low, high) in zip(value, bnds):
+            assert low - 1e-9 <= v <= high + 1e-9
+    for low, high in bnds:
+        assert math.isfinite(low) and math.isfinite(high)
+
+
+def test_bounds_exact(clock):
+    progress = Progress(clock, 4)
+    assert expressions.bounds(progress, 1, 2) == ((0.25, 0.5), )
+    assert expressions.bounds(progress * 4 - 1, 1, 2) == ((0, 1), )
+    assert expressions.bounds(clock.time * -2, 1, 2) == ((-4, -2), )
+    assert expressions.bounds(Value(1, 2), 1, 2) == ((1, 1), (2, 2))
+    assert expressions.bounds(Constant(3) * Constant(2), 0, 1) == ((6, 6), )
+
+
+def test_bounds_unknown(clock):
+    progress = Progress(clock, 4)
+    assert expressions.bounds(progress ** 2, 1, 2) == ((-math.inf, math.inf),)
+    assert expressions.bounds(Value(2) ** 2, 1, 2) == ((4, 4), )
+    assert expressions.bounds(1 / (progress - 0.5), 1, 3) == (
+        (-math.inf, math.inf), )
+    assert expressions.bounds(1 / (progress - 0.5), 3, 4) == ((2, 4), )
+
+
+def test_bounds_track(clock):
+    track = expressions.Track(clock, [0, 5, -2, 8], 3)
+    assert expressions.bounds(track, 0, 3) == ((-2, 8), )
+    assert expressions.bounds(track, 0.5, 1.5) == ((1.5, 5), )
+    assert expressions.bounds(track, 1, 2) == ((-2, 5), )
+    assert expressions.bounds(track, 5, 6) == ((8, 8), )
+
+
+def test_bounds_subclock(clock):
+    subclock = Subclock(clock, speed=2)
+    exp = Progress(subclock, 4) + clock.time
+    clock.advance_sync(1)
+    assert expressions.bounds(exp, 1, 2, clock=clock) == ((1.5, 3), )
+
+
+def test_bounds_errors(clock):
+    exp = Progress(clock, 4) + Progress(Clock(), 4)
+    with pytest.raises(ValueError):
+        expressions.bounds(exp, 1, 2)
+    with pytest.raises(ValueError):
+        expressions.bounds(Progress(clock, 4), 2, 1)
+    clock.advance_sync(1)
+    with pytest.raises(ValueError):
+        expressions.bounds(Progress(clock, 4), 0, 2)
+
+
+@pytest.mark.parametrize('cls', [expressions.CatmullRom, expressions.Bezier])
+def test_spline_endpoints(cls):
+    points = [(0, 0, 1), (1, 2, 3), (4, -1, 0), (2, 2, 2)]
+    t = Value(0)
+    exp = cls(points, t)
+    assert len(exp) == 3
+    assert exp.get() == points[0]
+    t.set(1)
+    assert exp.get() == points[-1]
+
+
+def test_catmull_rom_passes_through_points():
+    points = [0, 1, 5, 2, 3]
+    t = Value(0)
+    exp = expressions.CatmullRom(points, t)
+    for i, point in enumerate(points):
+        t.set(i / 4)
+        assert exp.get() == pytest.approx((point, ))
+
+
+def test_catmull_rom_linear():
+    t = Value(0)
+    exp = expressions.CatmullRom([0, 1, 2, 3], t)
+    for i in range(11):
+        # The middle segment of evenly spaced points is straight
+        t.set((1 + i / 10) / 3)
+        assert exp.get() == pytest.approx((1 + i / 10, ))
+
+
+def test_bezier_segments():
+    t = Value(0)
+    exp = expressions.Bezier([0, 0, 1, 1, 1, 2, 2], t)
+    t.set(0.25)
+    assert exp.get() == (0.5, )
+    t.set(0.5)
+    assert exp.get() == (1, )
+    t.set(0.75)
+    assert exp.get() == (1.5, )
+
+
+@pytest.mark.parametrize('cls', [expressions.CatmullRom, expressions.Bezier])
+def test_spline_arc_length(cls):
+    points = [(0, 0), (1, 2), (4, 3), (10, 0)]
+    t = Value(0)
+    exp = cls(points, t, arc_length=True)
+    values = []
+    for i in range(21):
+        t.set(i / 20)
+        values.append(exp.get())
+    steps = [math.hypot(x2 - x1, y2 - y1)
+             for (x1, y1), (x2, y2) in zip(values, values[1:])]
+    assert max(steps) < min(steps) * 1.05
+    assert values[0] == pytest.approx(points[0])
+    assert values[-1] == pytest.approx(points[-1])
+
+
+def test_spline_simplification():
+    t = Value(0.5)
+    exp = expressions.Bezier([0, 0, 1, 1], t)
+    with reduce_to_const(exp):
+        t.fix()
+    assert exp.replacement.get() == (0.5, )
+
+
+@pytest.mark.parametrize('points', [[], [1], [(1, 2), (1, 2, 3)]])
+def test_catmull_rom_bad_points(points):
+    with pytest.raises(ValueError):
+        expressions.CatmullRom(points, 0)
+
+
+@pytest.mark.parametrize('points', [[1, 2], [1, 2, 3, 4, 5]])
+def test_bezier_bad_points(points):
+    with pytest.raises(ValueError):
+        expressions.Bezier(points, 0)
+
+
+def test_spline_bad_t():
+    with pytest.raises(ValueError):
+        expressions.Bezier([1, 2, 3, 4], (0, 1))
+
+
+def test_profiling():
+    a, b = Value(1), Value(2)
+    shared = a * b
+    exp = shared + shared / 2
+    with expressions.profiling() as profile:
+        for i in range(3):
+            assert exp.get() == (3, )
+    assert profile.calls(exp) == 3
+    assert profile.calls(shared) == 6
+    assert profile.calls(a) == 6
+    assert profile.calls(Value(1)) == 0
+    assert profile.time(exp) >= profile.time(shared) > 0
+    assert profile.time(Value(1)) == 0
+    by_type = profile.by_type()
+    assert by_type[Value][0] == 12
+    assert by_type[Sum][0] == 3
+    assert by_type[Sum][1] == profile.time(exp)
+    # Not recording outside the block
+    exp.get()
+    assert profile.calls(exp) == 3
+
+
+def test_profiling_nested():
+    exp = Value(1) + Value(2)
+    with expressions.profiling() as outer:
+        exp.get()
+        with expressions.profiling() as inner:
+            exp.get()
+        exp.get()
+    assert outer.calls(exp) == 2
+    assert inner.calls(exp) == 1
+
+
+def test_profiling_deep():
+    exp = Value(1)
+    for i in range(DEEP):
+        exp = -exp
+    with expressions.profiling() as profile:
+        assert exp.get() == (1, )
+    assert profile.calls(exp) == 1
+
+
+def test_dump_profile():
+    exp = Value(1) + Value(2) * Value(3)
+    with expressions.profiling() as profile:
+        exp.get()
+        exp.get()
+    lines = dump(exp, profile=profile).splitlines()
+    assert len(lines) == 5
+    assert all('[2 calls, ' in line for line in lines)
+    assert '[1 call, ' in dump(exp, profile=True)
+
+
+def test_stats():
+    a = Value(1)
+    exp = a * 2 + a
+    info = expressions.stats(exp)
+    assert info.nodes == 4
+    assert info.types == {Sum: 1, Product: 1, Value: 1, Constant: 1}
+    assert info.max_depth == 3
+    assert info.shared == 1
+    assert info.listeners == 3
+    assert info.bytes > 4 * sys.getsizeof(a)
+
+
+def test_stats_multiple_roots():
+    a, b = Value(1), Value(2)
+    first = a + b
+    second = -a
+    info = expressions.stats([first, second, first])
+    assert info.nodes == 4
+    assert info.shared == 2
+    assert expressions.stats([]) == (0, {}, 0, 0, 0, 0)
+
+
+def test_stats_replaced():
+    a = Value(1)
+    exp = -a
+    a.fix()
+    info = expressions.stats(exp)
+    assert info.types == {Neg: 1, Constant: 2}
+    assert info.max_depth == 2
+    expressions.compact(exp)
+    assert expressions.stats(exp).types == {Neg: 1, Constant: 1}
+
+
+def test_stats_deep():
+    exp = Value(1)
+    for i in range(DEEP):
+        exp = -exp
+    info = expressions.stats(exp)
+    assert info.nodes == info.max_depth == DEEP + 1
+    assert info.types[Neg] == DEEP
+
+
+@pytest.mark.parametrize('factory', [
+    lambda clock: Constant(1),
+    lambda clock: Value(1),
+    lambda clock: Value(1) + Value(2),
+    lambda clock: Value(1) * Value(2),
+    lambda clock: Value(1) < Value(2),
+    lambda clock: -Value(1),
+    lambda clock: Value(1, 2)[0],
+    lambda clock: Concat(Value(1), Value(2)),
+    lambda clock: Box('box', Value(1)),
+    lambda clock: Interpolation(Value(1), Value(2), Value(0.5)),
+    lambda clock: expressions.Bezier([0, 1, 2, 3], Value(0.5)),
+    lambda clock: clock.time,
+    lambda clock: Progress(clock, 1),
+    lambda clock: expressions.Track(clock, [1, 2], 1),
+])
+def test_no_instance_dict(factory, clock):
+    exp = factory(clock)
+    assert not hasattr(exp, '__dict__')
+    assert weakref.ref(exp)() is exp
+
+
+def test_subclass_with_dict():
+    class Custom(Expression):
+        def __init__(self, value):
+            self.value = value
+
+        def get(self):
+            return self.value,
+
+    exp = Custom(3)
+    exp.extra = 'attribute'
+    assert exp.get() == (3, )
+    assert (exp + 1).get() == (4, )
+    exp.replacement = Constant(3)
+    assert simplify(exp).get() == (3, )
+    assert expressions.stats(exp).nodes == 2
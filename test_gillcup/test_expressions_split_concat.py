@@ -1,6 +1,6 @@
 """Brute-force check that a Slice of a Concat simplifies correctly"""
 
-from gillcup.expressions import Value, Concat, simplify
+from gillcup.expressions import Value, Concat, Constant, simplify
 
 
 def generate_splits(n, _start=0):
@@ -62,3 +62,31 @@ def test_slice_of_concat_simplification(start, stop, tuples):
     exp = Concat(*(Value(*t) for t in tuples))[start:stop]
     assert exp.get() == expected
     assert simplify(exp).get() == expected
+
+
+def test_many_replacements():
+    size = 1000
+    expected = [float(i) for i in range(size)]
+    exp = Value(*expected)
+    for i in range(0, size, 7):
+        exp = exp.replace(i, Value(-i))
+        expected[i] = -i
+    for i in range(0, size, 3):
+        exp = exp.replace(i, exp[i] + 1)
+        expected[i] += 1
+    assert exp.get() == tuple(expected)
+    assert exp[123:456].get() == tuple(expected[123:456])
+    assert simplify(exp)._height < 30
+
+
+def test_replaced_pieces_merge():
+    values = [Value(i) for i in range(10)]
+    exp = Concat(*values)
+    for value in values[:5]:
+        value.fix()
+    assert len(exp.children) == 6
+    assert exp.get() == tuple(float(i) for i in range(10))
+    for value in values[5:]:
+        value.fix()
+    assert isinstance(simplify(exp), Constant)
+    assert exp.get() == tuple(float(i) for i in range(10))
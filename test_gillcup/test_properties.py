@@ -1,9 +1,12 @@
 import contextlib
+import gc
+import sys
+import weakref
 
 import pytest
 
-from gillcup.properties import AnimatedProperty, link
-from gillcup.expressions import Progress, Constant
+from gillcup.properties import AnimatedProperty, link, census
+from gillcup.expressions import Progress, Constant, Value, Sum, stats
 
 
 class BeeperBase:
@@ -343,6 +346,93 @@ def test_link_function_idempotent(beeper, clock):
         assert linked is link(linked)
 
 
+def test_link_follows_reassignment():
+    class Foo:
+        bar = AnimatedProperty()
+        baz = AnimatedProperty(3)
+        x, y, z = baz
+
+    source = Foo()
+    linked = link(source.bar)
+    linked_component = link(source.y)
+    assert linked == 0
+    assert linked_component == 0
+    source.bar = 5
+    assert linked == 5
+    source.baz = 1, 2, 3
+    assert linked_component == 2
+    source.y = 7
+    assert linked_component == 7
+    assert linked._source.replacement.get() == (5,)
+
+
+def test_long_link_chain():
+    class Foo:
+        bar = AnimatedProperty()
+        baz = AnimatedProperty(3)
+        x, y, z = baz
+
+    foos = [Foo() for i in range(sys.getrecursionlimit() * 10)]
+    for prev, foo in zip(foos, foos[1:]):
+        foo.bar = link(prev.bar)
+        foo.y = link(prev.y)
+    foos[0].bar = 5
+    foos[0].y = 7
+    assert foos[-1].bar == 5
+    assert foos[-1].y == 7
+    assert all(foos[-1].baz == (0, 7, 0))
+
+
+def test_sequential_anims_memory(clock):
+    class Foo:
+        bar = AnimatedProperty()
+
+    source = Foo()
+    source.clock = clock
+    dependent = Foo()
+    dependent.bar = link(source.bar) * 2
+
+    def advance(delay):
+        # Drive advance() directly, without spinning the event loop
+        coro = clock.advance(delay)
+        with pytest.raises(StopIteration):
+            while True:
+                coro.send(None)
+
+    def run(num_anims):
+        done_refs = []
+        for i in range(num_anims):
+            done_refs.append(weakref.ref(
+                source.bar.anim(i, 1, easing='quad')))
+            advance(2)
+            assert dependent.bar == i * 2
+        return done_refs
+
+    run(10)
+    gc.collect()
+    nodes_before = census().nodes
+    graph_before = stats(dependent.bar).nodes
+    done_refs = run(300)
+    gc.collect()
+    assert not any(ref() for ref in done_refs)
+    assert census().nodes == nodes_before
+    assert stats(dependent.bar).nodes == graph_before
+
+
+def test_link_default_factory_not_called_on_get():
+    calls = []
+
+    class Foo:
+        bar = AnimatedProperty(1, lambda inst: calls.append(inst) or 3)
+
+    source = Foo()
+    linked = link(source.bar)
+    num_calls = len(calls)
+    assert linked == 3
+    assert linked == 3
+    assert len(calls) == num_calls
+
+
 def test_default_naming():
     class Foo:
         bar = b, a, r = AnimatedProperty(3)
@@ -494,6 +584,20 @@ def test_anim_strength(beeper, clock):
         assert beeper.volume == 50
 
 
+def test_anim_retarget(beeper, clock):
+    beeper.clock = clock
+    with beeper.extra_behavior('anim method'):
+        beeper.volume.anim(100, 2)
+        clock.advance_sync(1)
+        beeper.volume.anim(0, 2, retarget=True)
+        assert beeper.volume == 50
+        assert isinstance(beeper.volume.replacement._start, Constant)
+        clock.advance_sync(1)
+        assert beeper.volume == 25
+        clock.advance_sync(1)
+        assert beeper.volume == 0
+
+
 def test_anim_no_clock(beeper):
     with beeper.extra_behavior('anim method'):
         with pytest.raises(TypeError):
@@ -590,3 +694,22 @@ def test_sliced_sliced_property():
     foo.xyz = 1, 2, 3
     foo.m = 47
     assert all(foo.bar == (0, 1, 47, 3, 0))
+
+
+def test_census():
+    class Foo:
+        bar = AnimatedProperty()
+        baz = AnimatedProperty(3)
+
+    gc.collect()
+    before = census()
+    foos = [Foo() for i in range(10)]
+    for foo in foos:
+        foo.bar = Value(1) + Value(2)
+        foo.baz = 1, 2, 3
+    after = census()
+    assert after.nodes - before.nodes == 10 * 4
+    assert after.types[Sum] - before.types.get(Sum, 0) == 10
+    del foo, foos
+    gc.collect()
+    assert census().nodes == before.nodes
@@ -0,0 +1,188 @@
+import pytest
+
+from gillcup.clocks import Clock, Subclock
+from gillcup.expressions import Constant, Value, Progress
+from gillcup.recording import Recorder, Recording
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('recording.grec'))
+
+
+def test_manual_recording(clock, path):
+    value = Value(1, 2)
+    with Recorder(clock, [value, clock.time, 3], path) as recorder:
+        assert recorder.names == ('0', '1', '2')
+        assert recorder.sizes == (2, 1, 1)
+        recorder.record()
+        clock.advance_sync(1.5)
+        value.set(3, 4)
+        recorder.record()
+        assert len(recorder) == 2
+    with Recording(path) as recording:
+        assert recording.rate is None
+        assert recording.dtype == 'd'
+        assert recording.width == 5
+        assert len(recording) == 2
+        assert list(recording[0]) == [0, 1, 2, 0, 3]
+        assert list(recording[-1]) == [1.5, 3, 4, 1.5, 3]
+        assert list(recording.data) == [0, 1, 2, 0, 3, 1.5, 3, 4, 1.5, 3]
+        assert recording.time(1) == 1.5
+        assert recording.get('0', 1) == (3, 4)
+        assert recording.columns('1') == range(3, 4)
+        with pytest.raises(IndexError):
+            recording[2]
+        with pytest.raises(KeyError):
+            recording.get('nonexistent', 0)
+
+
+def test_rate_recording(clock, path):
+    exp = Progress(clock, 10) * 100
+    recorder = Recorder(clock, [exp], path, names=['exp'], rate=10)
+    clock.advance_sync(20)
+    recorder.close()
+    clock.advance_sync(1)
+    assert not clock.events
+    with Recording(path) as recording:
+        assert recording.rate == 10
+        assert len(recording) == 201
+        for i in range(201):
+            assert recording.time(i) == pytest.approx(i / 10)
+            assert recording.get('exp', i) == pytest.approx(
+                (min(i, 100), ))
+
+
+def test_rate_recording_subclock(clock, path):
+    subclock = Subclock(clock, speed=2)
+    clock.advance_sync(1)
+    recorder = Recorder(subclock, [subclock.time], path, rate=1)
+    clock.advance_sync(2)
+    recorder.close()
+    with Recording(path) as recording:
+        assert [tuple(row) for row in recording] == [
+            (2, 2), (3, 3), (4, 4), (5, 5), (6, 6)]
+
+
+def test_tick_recording(clock, path):
+    subclock = Subclock(clock, speed=2)
+    recorder = Recorder(subclock, [subclock.time * 10], path,
+                        every_tick=True)
+    clock.schedule(0.25, lambda: None)
+    clock.advance_sync(1)
+    for frame in clock.frames(2, [], end=2):
+        pass
+    recorder.close()
+    clock.advance_sync(1)
+    assert not subclock.ticked
+    with Recording(path) as recording:
+        assert recording.rate is None
+        assert [tuple(row) for row in recording] == [
+            (0, 0), (0.5, 5), (2, 20), (3, 30), (4, 40)]
+
+
+def test_growth(clock, path):
+    value = Value(0)
+    with Recorder(clock, [value], path) as recorder:
+        for i in range(1000):
+            value.set(i)
+            recorder.record()
+    with Recording(path) as recording:
+        assert len(recording) == 1000
+        assert [recording.get('0', i) for i in range(1000)] == [
+            (i, ) for i in range(1000)]
+
+
+def test_float_dtype(clock, path):
+    with Recorder(clock, [Constant(0.1)], path, dtype='f') as recorder:
+        recorder.record()
+    with Recording(path) as recording:
+        assert recording.dtype == 'f'
+        assert recording.get('0', 0) != (0.1, )
+        assert recording.get('0', 0) == pytest.approx((0.1, ))
+
+
+def test_read_while_recording(clock, path):
+    recorder = Recorder(clock, [clock.time], path)
+    recorder.record()
+    recorder.flush()
+    with Recording(path) as recording:
+        assert len(recording) == 1
+    recorder.record()
+    recorder.close()
+    with Recording(path) as recording:
+        assert len(recording) == 2
+    recorder.close()
+    with pytest.raises(ValueError):
+        recorder.record()
+
+
+def test_unicode_names(clock, path):
+    names = ['x', 'čas', 'a' * 13]
+    with Recorder(clock, [1, 2, (3, 4)], path, names=names) as recorder:
+        recorder.record()
+    with Recording(path) as recording:
+        assert recording.names == tuple(names)
+        assert recording.sizes == (1, 1, 2)
+        assert recording.get('a' * 13, 0) == (3, 4)
+
+
+def test_track(clock, path):
+    exp = Progress(clock, 4) * 8
+    recorder = Recorder(clock, [exp], path, names=['exp'], rate=2)
+    clock.advance_sync(4)
+    recorder.close()
+
+    new_clock = Clock()
+    with Recording(path) as recording:
+        track = recording.track(new_clock, 'exp', delay=1)
+    for t in range(6):
+        assert track.get() == (max(0, t - 1) * 2, )
+        new_clock.advance_sync(1)
+
+
+def test_track_needs_rate(clock, path):
+    with Recorder(clock, [1], path) as recorder:
+        recorder.record()
+    with Recording(path) as recording:
+        with pytest.raises(ValueError):
+            recording.track(clock, '0')
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(names=['a']),
+    dict(names=['a', 'a']),
+    dict(dtype='i'),
+    dict(rate=0),
+    dict(rate=1, every_tick=True),
+])
+def test_bad_arguments(clock, path, kwargs):
+    with pytest.raises(ValueError):
+        Recorder(clock, [1, 2], path, **kwargs)
+
+
+def test_bad_file(path):
+    with open(path, 'wb') as file:
+        file.write(b'not a recording')
+    with pytest.raises(ValueError):
+        Recording(path)
+
+
+def test_truncated_file(clock, path):
+    with Recorder(clock, [1, 2], path) as recorder:
+        recorder.record()
+        recorder.record()
+    with open(path, 'r+b') as file:
+        file.truncate(file.seek(0, 2) - 1)
+    with pytest.raises(ValueError):
+        Recording(path)
+
+
+@pytest.mark.parametrize('length', [32, 38, 42, 48])
+def test_truncated_header(clock, path, length):
+    with Recorder(clock, [1, 2], path, names=['one', 'two']):
+        pass
+    with open(path, 'r+b') as file:
+        file.truncate(length)
+    with pytest.raises(ValueError):
+        Recording(path)
@@ -349,7 +349,8 @@ def test_decorator_on_instance():
         'of {owner!r}>'.format(owner=foo))
 
 
-def test_signature_checking():
+def test_signature_checking(monkeypatch):
+    monkeypatch.setattr(Signal, 'check_signatures', True)
 
     @signal
     def value_changed(old_value, new_value):
@@ -365,6 +366,27 @@ def test_signature_checking():
         value_changed(1, 2, foo=5)
 
 
+def test_no_signature_checking_by_default(collector):
+
+    @signal
+    def value_changed(old_value, new_value):
+        """Notifies of a value change"""
+
+    value_changed.connect(collector.collect_all_args)
+    value_changed(1, 2, 3)
+    collector.check(((1, 2, 3), ()))
+
+
+def test_dispatch_cache_invalidation(sig, collector):
+    sig(1)
+    sig.connect(collector.collect)
+    sig(2)
+    collector.check(2)
+    sig.disconnect(collector.collect)
+    sig(3)
+    collector.check(2)
+
+
 @pytest.mark.skipif(sys.version_info >= (3, 5),
                     reason="Builtin methods are not weak referencable pre 3.5")
 def test_no_weak_builtin_method(sig):
@@ -0,0 +1,152 @@
+import operator
+
+import pytest
+
+from gillcup.clocks import Clock, Subclock
+from gillcup.expressions import Constant, Value, Box, Concat, Interpolation
+from gillcup.expressions import Progress, Track, Bezier, CatmullRom, Map
+from gillcup.expressions import simplify
+from gillcup.animations import anim, Keyframes
+from gillcup.properties import AnimatedProperty, link
+from gillcup.snapshots import dumps, loads, serializable
+
+
+def make_scene(clock):
+    value = Value(1, 2)
+    progress = Progress(clock, 4, delay=1)
+    t = progress * 1
+    return [
+        value,
+        value * 2 + value,
+        value - value / 3,
+        value // 2 % 3,
+        (value ** 2)[1],
+        Concat(value, -value, Constant(5)),
+        value < 2,
+        Map(abs, -value),
+        Box('box', value),
+        Interpolation(value, (10, 20), t),
+        Bezier([0, 1, 3, 4], t),
+        CatmullRom([(0, 0), (1, 1), (2, 4)], t, arc_length=True),
+        clock.time + 1,
+        Progress(clock, 2, clamp=False),
+        Track(clock, [1, 5, 2], 3, delay=0.5),
+        Keyframes(clock, [(0, 0), (1, 1, 'quad.out'), (6, 3, 'bounce')]),
+        anim(0, 10, 3, clock, easing='cubic'),
+    ]
+
+
+def test_restored_scene():
+    clock = Clock()
+    scene = make_scene(clock)
+    clock.advance_sync(1.5)
+    new_clock, new_scene = loads(dumps([clock, scene]))
+    assert new_clock is not clock
+    assert new_clock.time == 1.5
+    for i in range(10):
+        assert [e.get() for e in new_scene] == [e.get() for e in scene]
+        clock.advance_sync(0.75)
+        new_clock.advance_sync(0.75)
+    assert not clock.events
+    assert not new_clock.events
+
+
+def test_values_stay_shared():
+    value = Value(1, 2)
+    exp = value * 2 + value
+    new_value, new_exp = loads(dumps([value, exp]))
+    assert new_exp.get() == (3, 6)
+    new_value.set(3, 4)
+    assert new_exp.get() == (9, 12)
+    assert value.get() == (1, 2)
+
+
+def test_simplified_form():
+    value = Value(1)
+    exp = -(value + 1)
+    value.fix()
+    new_exp = loads(dumps(exp))
+    assert isinstance(new_exp, Constant)
+    assert new_exp.get() == (-2, )
+
+
+def test_progress_done():
+    clock = Clock()
+    progress = Progress(clock, 2)
+    new_clock, new_progress = loads(dumps([clock, progress]))
+    assert len(new_clock.events) == 1
+    new_clock.advance_sync(2)
+    assert new_progress.done.done()
+    assert isinstance(simplify(new_progress), Constant)
+
+
+def test_subclock():
+    clock = Clock()
+    subclock = Subclock(clock, speed=2)
+    exp = Progress(subclock, 4)
+    clock.advance_sync(1)
+    new_clock, new_exp = loads(dumps([clock, exp]))
+    [new_subclock] = new_clock._subclocks
+    assert new_subclock.speed == 2
+    assert new_subclock.time == 2
+    assert new_exp.get() == (0.5, )
+    new_clock.advance_sync(0.5)
+    assert new_exp.get() == (0.75, )
+
+
+def test_clock_attributes():
+    clock = Clock()
+    clock.speed = 3
+    clock.coalesce_replacements = True
+    new_clock = loads(dumps(clock))
+    assert new_clock.speed == 3
+    assert new_clock.coalesce_replacements
+
+
+@serializable
+def record_call(log, value):
+    log.append(value)
+
+
+def test_serializable_events():
+    clock = Clock()
+    log = []
+    clock.schedule(1, record_call, log, 'a')
+    clock.schedule(2, log.append, 'unregistered')
+    clock.schedule(2, record_call, log, 'b')
+    clock.sleep(3)
+    new_clock, new_log = loads(dumps([clock, log]))
+    assert len(new_clock.events) == 2
+    new_clock.advance_sync(5)
+    assert new_log == ['a', 'b']
+    assert log == []
+
+
+def test_unregistered_events_dropped():
+    clock = Clock()
+    clock.schedule(1, print, 'not saved')
+    new_clock = loads(dumps(clock))
+    assert not new_clock.events
+
+
+def test_properties():
+    class Foo:
+        bar = AnimatedProperty()
+
+    source = Foo()
+    source.bar = Value(3)
+    dependent = Foo()
+    dependent.bar = link(source.bar) * 2
+    new_exp = loads(dumps(dependent.bar))
+    assert new_exp.get() == (6, )
+
+
+def test_compare_op():
+    value = Value(1, 5)
+    new_exp = loads(dumps(operator.ge(value, 3)))
+    assert new_exp.get() == (0, 1)
+
+
+def test_unpicklable():
+    with pytest.raises(Exception):
+        dumps(Map(lambda x: x, Value(1)))